@@ -1,7 +1,6 @@
 import importlib
 import multiprocessing
 import os
-import shutil
 import sys
 import traceback
 from datetime import datetime
@@ -126,9 +125,11 @@ def go(bot_name: str, subprocess: bool = False, binary_mode: bool = False):
 
 
 def run_bot():
-    from core.constants.path import cache_path  # noqa
+    from core.utils.cache import purge_cache_path  # noqa
     from core.config import Config, CFGManager  # noqa
     from core.logger import Logger  # noqa
+    from core.queue_transport import start_broker  # noqa
+    from core.utils.info import RUNNING_BOTS_ENV  # noqa
 
     def restart_process(bot_name: str):
         if (
@@ -158,9 +159,11 @@ def run_bot():
         p.start()
         processes.append(p)
 
-    if os.path.exists(cache_path):
-        shutil.rmtree(cache_path)
-    os.makedirs(cache_path, exist_ok=True)
+    purge_cache_path()
+    try:
+        Logger.info(f"Job queue broker listening on {start_broker()}.")
+    except OSError:
+        Logger.warning("Failed to start job queue broker, bots will fall back to polling the database.")
     envs = os.environ.copy()
     envs["PYTHONIOENCODING"] = "UTF-8"
     envs["PYTHONPATH"] = os.path.abspath(".")
@@ -174,6 +177,7 @@ def run_bot():
             else:
                 Logger.warning(f"Bot {t} cannot found config \"enable\".")
 
+    running_bots = []
     for bl in lst:
         if bl in disabled_bots:
             continue
@@ -188,6 +192,10 @@ def run_bot():
                     break
             if abort:
                 continue
+        running_bots.append(bl)
+    os.environ[RUNNING_BOTS_ENV] = ",".join(running_bots)
+
+    for bl in running_bots:
         p = multiprocessing.Process(
             target=go, args=(bl, True, bool(not sys.argv[0].endswith(".py"))), name=bl, daemon=True
         )
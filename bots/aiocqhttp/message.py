@@ -1,11 +1,10 @@
 import asyncio
 import datetime
 import html
-import random
 import re
 import traceback
 from pathlib import Path
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Set
 
 import aiocqhttp.exceptions
 from aiocqhttp import MessageSegment
@@ -18,6 +17,7 @@ from core.builtins import (
     I18NContext,
     Temp,
     MessageTaskManager,
+    BroadcastLimits,
     FetchTarget as FetchTargetT,
     FinishedSession as FinishedSessionT,
     Mention,
@@ -30,7 +30,6 @@ from core.builtins.message.chain import MessageChain
 from core.builtins.message.elements import MentionElement, PlainElement, ImageElement, VoiceElement
 from core.config import Config
 from core.constants.exceptions import SendMessageFailed
-from core.database.models import AnalyticsData, TargetInfo
 from core.logger import Logger
 from core.utils.image import msgchain2image
 from core.utils.storedata import get_stored_list
@@ -38,8 +37,8 @@ from .client import bot
 from .info import *
 from .utils import CQCodeHandler, get_onebot_implementation
 
-enable_analytics = Config("enable_analytics", False)
 qq_typing_emoji = str(Config("qq_typing_emoji", 181, (str, int), table_name="bot_aiocqhttp"))
+noise_pool_size = 8
 
 
 class FinishedSession(FinishedSessionT):
@@ -361,7 +360,7 @@ class MessageSession(MessageSessionT):
                 if isinstance(x, PlainElement):
                     content += x.text + "\n"
                 elif isinstance(x, ImageElement):
-                    content += f"[CQ:image,file=base64://{x.get_base64()}]\n"
+                    content += f"[CQ:image,file=base64://{await x.get_base64()}]\n"
 
             template = {
                 "type": "node",
@@ -500,6 +499,10 @@ class MessageSession(MessageSessionT):
 
 class FetchTarget(FetchTargetT):
     name = client_name
+    broadcast_limits = {
+        "whitelist": BroadcastLimits(rate=1, jitter=5),
+        "default": BroadcastLimits(rate=1 / 15, jitter=30),
+    }
 
     @staticmethod
     async def fetch_target(target_id, sender_id=None) -> Union[Bot.FetchedSession]:
@@ -559,169 +562,82 @@ class FetchTarget(FetchTargetT):
         return lst
 
     @staticmethod
-    async def post_message(module_name, message, user_list=None, i18n=False, **kwargs):
-        _tsk = []
-        blocked = False
-        module_name = None if module_name == "*" else module_name
-
-        async def post_(fetch_: Bot.FetchedSession):
-            nonlocal _tsk
-            nonlocal blocked
-            try:
-                if (
-                    Temp.data["is_group_message_blocked"]
-                    and fetch_.target.target_from == target_group_prefix
-                ):
-                    Temp.data["waiting_for_send_group_message"].append(
-                        {
-                            "fetch": fetch_,
-                            "message": message,
-                            "i18n": i18n,
-                            "kwargs": kwargs,
-                        }
-                    )
-                else:
-                    msgchain = message
-                    if isinstance(message, str):
-                        if i18n:
-                            msgchain = MessageChain([I18NContext(message, **kwargs)])
-                        else:
-                            msgchain = MessageChain([Plain(message)])
-                    msgchain = MessageChain(msgchain)
-                    new_msgchain = []
-                    for v in msgchain.value:
-                        if isinstance(v, ImageElement):
-                            new_msgchain.append(await v.add_random_noise())
-                        else:
-                            new_msgchain.append(v)
-                    await fetch_.send_direct_message(new_msgchain)
-                    if _tsk:
-                        _tsk = []
-                if enable_analytics and module_name:
-                    await AnalyticsData.create(target_id=fetch_.target.target_id,
-                                               sender_id=fetch_.target.sender_id,
-                                               command="",
-                                               module_name=module_name,
-                                               module_type="schedule")
-                await asyncio.sleep(0.5)
-            except SendMessageFailed as e:
-                if str(e).startswith("send group message failed: blocked by server"):
-                    if len(_tsk) >= 3:
-                        blocked = True
-                    if not blocked:
-                        _tsk.append(
-                            {
-                                "fetch": fetch_,
-                                "message": message,
-                                "i18n": i18n,
-                                "kwargs": kwargs,
-                            }
-                        )
-                    else:
-                        Temp.data["is_group_message_blocked"] = True
-                        Temp.data["waiting_for_send_group_message"].append(
-                            {
-                                "fetch": fetch_,
-                                "message": message,
-                                "i18n": i18n,
-                                "kwargs": kwargs,
-                            }
-                        )
-                        if _tsk:
-                            for t in _tsk:
-                                Temp.data["waiting_for_send_group_message"].append(t)
-                            _tsk = []
-                        for bu in base_superuser_list:
-                            fetch_base_superuser = await FetchTarget.fetch_target(bu)
-                            if fetch_base_superuser:
-                                await fetch_base_superuser.send_direct_message(
-                                    I18NContext("error.message.paused", disable_joke=True, prefix=command_prefix[0])
-                                )
-            except Exception:
-                Logger.error(traceback.format_exc())
+    async def get_broadcast_eligible() -> Set[str]:
+        group_list_raw = await bot.call_action("get_group_list")
+        eligible = {f"{target_group_prefix}|{g["group_id"]}" for g in group_list_raw}
+        friend_list_raw = await bot.call_action("get_friend_list")
+        eligible.update(f"{target_private_prefix}|{f["user_id"]}" for f in friend_list_raw)
 
-        if user_list:
-            for x in user_list:
-                await post_(x)
-        else:
-            get_target_id = await TargetInfo.get_target_list_by_module(
-                module_name, client_name
-            )
-            group_list_raw = await bot.call_action("get_group_list")
-            group_list = [g["group_id"] for g in group_list_raw]
-            friend_list_raw = await bot.call_action("get_friend_list")
-            friend_list = [f["user_id"] for f in friend_list_raw]
-
-            guild_list = []
-            obi = await get_onebot_implementation()
-            if obi == "go-cqhttp":
-                guild_list_raw = await bot.call_action("get_guild_list")
-                for g in guild_list_raw:
-                    try:
-                        get_channel_list = await bot.call_action(
-                            "get_guild_channel_list",
-                            guild_id=g["guild_id"],
-                            no_cache=True,
-                        )
-                        for channel in get_channel_list:
-                            if channel["channel_type"] == 1:
-                                guild_list.append(
-                                    f"{str(g["guild_id"])}|{str(channel["channel_id"])}"
-                                )
-                    except Exception:
-                        traceback.print_exc()
-                        continue
+        obi = await get_onebot_implementation()
+        if obi == "go-cqhttp":
+            guild_list_raw = await bot.call_action("get_guild_list")
+            for g in guild_list_raw:
+                try:
+                    get_channel_list = await bot.call_action(
+                        "get_guild_channel_list",
+                        guild_id=g["guild_id"],
+                        no_cache=True,
+                    )
+                    for channel in get_channel_list:
+                        if channel["channel_type"] == 1:
+                            eligible.add(
+                                f"{target_guild_prefix}|{str(g["guild_id"])}|{str(channel["channel_id"])}"
+                            )
+                except Exception:
+                    traceback.print_exc()
+                    continue
+        return eligible
 
-            in_whitelist = []
-            else_ = []
-            for x in get_target_id:
-                fetch = await FetchTarget.fetch_target(x.target_id)
-                Logger.debug(fetch)
-                if fetch:
-                    if fetch.target.target_from == target_group_prefix:
-                        if int(fetch.session.target) not in group_list:
-                            continue
-                    if fetch.target.target_from == target_private_prefix:
-                        if int(fetch.session.target) not in friend_list:
-                            continue
-                    if fetch.target.target_from == target_guild_prefix:
-                        if fetch.session.target not in guild_list:
-                            continue
-                    if x.muted:
-                        continue
+    @staticmethod
+    def get_broadcast_lane(target_id, target_info) -> str:
+        if not target_info or not target_id.startswith(f"{target_group_prefix}|") \
+                or target_info.target_data.get("in_post_whitelist", False):
+            return "whitelist"
+        return "default"
 
-                    if fetch.target.target_from in [
-                        target_private_prefix,
-                        target_guild_prefix,
-                    ]:
-                        in_whitelist.append(post_(fetch))
-                    else:
-                        load_options: dict = x.target_data
-                        if load_options.get("in_post_whitelist", False):
-                            in_whitelist.append(post_(fetch))
-                        else:
-                            else_.append(post_(fetch))
-
-            async def post_in_whitelist(lst):
-                for f in lst:
-                    await f
-                    await asyncio.sleep(random.randint(1, 5))
-
-            if in_whitelist:
-                asyncio.create_task(post_in_whitelist(in_whitelist))
-
-            async def post_not_in_whitelist(lst):
-                for f in lst:
-                    await f
-                    await asyncio.sleep(random.randint(15, 30))
-
-            if else_:
-                asyncio.create_task(post_not_in_whitelist(else_))
-                Logger.info(
-                    f"The task of posting messages to whitelisted groups is complete. "
-                    f"Posting message to {len(else_)} groups not in whitelist."
-                )
+    @staticmethod
+    async def send_broadcast(job, fetch, message_chain) -> Optional[bool]:
+        if (
+            Temp.data["is_group_message_blocked"]
+            and fetch.target.target_from == target_group_prefix
+        ):
+            Temp.data["waiting_for_send_group_message"].append(
+                {"fetch": fetch, "message": message_chain, "i18n": False, "kwargs": {}}
+            )
+            return False
 
+        # 每条消息只生成一组加噪图片，各会话轮流使用
+        noised_images = job.data.setdefault("noised_images", {})
+        sent_count = job.data.get("sent_count", 0)
+        job.data["sent_count"] = sent_count + 1
+        new_msgchain = []
+        for idx, v in enumerate(message_chain.value):
+            if isinstance(v, ImageElement):
+                if idx not in noised_images:
+                    noised_images[idx] = asyncio.ensure_future(v.add_random_noise_variants(noise_pool_size))
+                new_msgchain.append((await noised_images[idx])[sent_count % noise_pool_size])
+            else:
+                new_msgchain.append(v)
+
+        blocked_list = job.data.setdefault("blocked_list", [])
+        try:
+            await fetch.send_direct_message(new_msgchain)
+            blocked_list.clear()
+        except SendMessageFailed as e:
+            if not str(e).startswith("send group message failed: blocked by server"):
+                raise
+            blocked_list.append({"fetch": fetch, "message": message_chain, "i18n": False, "kwargs": {}})
+            if len(blocked_list) > 3:
+                Temp.data["is_group_message_blocked"] = True
+                Temp.data["waiting_for_send_group_message"].extend(blocked_list)
+                blocked_list.clear()
+                for bu in base_superuser_list:
+                    fetch_base_superuser = await FetchTarget.fetch_target(bu)
+                    if fetch_base_superuser:
+                        await fetch_base_superuser.send_direct_message(
+                            I18NContext("error.message.paused", disable_joke=True, prefix=command_prefix[0])
+                        )
+            return False
 
 Bot.MessageSession = MessageSession
 Bot.FetchTarget = FetchTarget
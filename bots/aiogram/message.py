@@ -2,7 +2,7 @@ import re
 import traceback
 from typing import List, Union
 
-from aiogram.types import FSInputFile
+from aiogram.types import BufferedInputFile, FSInputFile
 
 from core.builtins import (
     Bot,
@@ -12,21 +12,18 @@ from core.builtins import (
     MessageSession as MessageSessionT,
     I18NContext,
     MessageTaskManager,
+    BroadcastLimits,
     FetchTarget as FetchTargetT,
     FinishedSession as FinishedSessionT,
 )
 from core.builtins.message.chain import MessageChain
 from core.builtins.message.elements import PlainElement, ImageElement, VoiceElement, MentionElement
-from core.config import Config
-from core.database.models import AnalyticsData, TargetInfo
 from core.logger import Logger
 from core.utils.http import download
 from core.utils.image import image_split
 from .client import bot, token
 from .info import *
 
-enable_analytics = Config("enable_analytics", False)
-
 
 class FinishedSession(FinishedSessionT):
     async def delete(self):
@@ -86,7 +83,7 @@ class MessageSession(MessageSessionT):
                     for xs in split:
                         send_ = await bot.send_photo(
                             self.session.target,
-                            FSInputFile(await xs.get()),
+                            BufferedInputFile(await xs.get_bytes(), await xs.get_filename()),
                             reply_to_message_id=(
                                 self.session.message.message_id
                                 if quote and count == 0 and self.session.message
@@ -101,7 +98,7 @@ class MessageSession(MessageSessionT):
                 else:
                     send_ = await bot.send_photo(
                         self.session.target,
-                        FSInputFile(await x.get()),
+                        BufferedInputFile(await x.get_bytes(), await x.get_filename()),
                         reply_to_message_id=(
                             self.session.message.message_id
                             if quote and count == 0 and self.session.message
@@ -223,6 +220,7 @@ class MessageSession(MessageSessionT):
 
 class FetchTarget(FetchTargetT):
     name = client_name
+    broadcast_limits = {"default": BroadcastLimits(rate=20, burst=20, concurrency=10)}
 
     @staticmethod
     async def fetch_target(target_id, sender_id=None) -> Union[Bot.FetchedSession]:
@@ -254,55 +252,6 @@ class FetchTarget(FetchTargetT):
                 lst.append(fet)
         return lst
 
-    @staticmethod
-    async def post_message(module_name, message, user_list=None, i18n=False, **kwargs):
-        module_name = None if module_name == "*" else module_name
-        if user_list:
-            for x in user_list:
-                try:
-                    msgchain = message
-                    if isinstance(message, str):
-                        if i18n:
-                            msgchain = MessageChain([I18NContext(message, **kwargs)])
-                        else:
-                            msgchain = MessageChain([Plain(message)])
-                    msgchain = MessageChain(msgchain)
-                    await x.send_direct_message(msgchain)
-                    if enable_analytics and module_name:
-                        await AnalyticsData.create(target_id=x.target.target_id,
-                                                   sender_id=x.target.sender_id,
-                                                   command="",
-                                                   module_name=module_name,
-                                                   module_type="schedule")
-                except Exception:
-                    Logger.error(traceback.format_exc())
-        else:
-            get_target_id = await TargetInfo.get_target_list_by_module(
-                module_name, client_name
-            )
-            for x in get_target_id:
-                fetch = await FetchTarget.fetch_target(x.target_id)
-                if fetch:
-                    if x.muted:
-                        continue
-                    try:
-                        msgchain = message
-                        if isinstance(message, str):
-                            if i18n:
-                                msgchain = MessageChain([I18NContext(message, **kwargs)])
-                            else:
-                                msgchain = MessageChain([Plain(message)])
-                        msgchain = MessageChain(msgchain)
-                        await fetch.send_direct_message(msgchain)
-                        if enable_analytics and module_name:
-                            await AnalyticsData.create(target_id=fetch.target.target_id,
-                                                       sender_id=fetch.target.sender_id,
-                                                       command="",
-                                                       module_name=module_name,
-                                                       module_type="schedule")
-                    except Exception:
-                        Logger.error(traceback.format_exc())
-
 
 Bot.MessageSession = MessageSession
 Bot.FetchTarget = FetchTarget
@@ -1,6 +1,7 @@
 import datetime
 import re
 import traceback
+from io import BytesIO
 from typing import List, Union
 
 import discord
@@ -12,6 +13,7 @@ from core.builtins import (
     Image,
     MessageSession as MessageSessionT,
     MessageTaskManager,
+    BroadcastLimits,
     FetchTarget as FetchTargetT,
     FinishedSession as FinishedSessionT,
 )
@@ -24,15 +26,11 @@ from core.builtins.message.elements import (
     EmbedElement,
 )
 from core.builtins.message.internal import I18NContext, Voice
-from core.config import Config
-from core.database.models import AnalyticsData, TargetInfo
 from core.logger import Logger
 from core.utils.http import download
 from .client import client
 from .info import *
 
-enable_analytics = Config("enable_analytics", False)
-
 
 async def convert_embed(embed: EmbedElement, msg: MessageSessionT):
     if isinstance(embed, EmbedElement):
@@ -45,11 +43,11 @@ async def convert_embed(embed: EmbedElement, msg: MessageSessionT):
             timestamp=datetime.datetime.fromtimestamp(embed.timestamp) if embed.timestamp else None
         )
         if embed.image:
-            upload = discord.File(await embed.image.get(), filename="image.png")
+            upload = discord.File(BytesIO(await embed.image.get_bytes()), filename="image.png")
             files.append(upload)
             embeds.set_image(url="attachment://image.png")
         if embed.thumbnail:
-            upload = discord.File(await embed.thumbnail.get(), filename="thumbnail.png")
+            upload = discord.File(BytesIO(await embed.thumbnail.get_bytes()), filename="thumbnail.png")
             files.append(upload)
             embeds.set_thumbnail(url="attachment://thumbnail.png")
         if embed.author:
@@ -117,7 +115,7 @@ class MessageSession(MessageSessionT):
                 Logger.info(f"[Bot] -> [{self.target.target_id}]: {x.text}")
             elif isinstance(x, ImageElement):
                 send_ = await self.session.target.send(
-                    file=discord.File(await x.get()),
+                    file=discord.File(BytesIO(await x.get_bytes()), filename=await x.get_filename()),
                     reference=(
                         self.session.message
                         if quote and count == 0 and self.session.message
@@ -263,6 +261,7 @@ Bot.FetchedSession = FetchedSession
 
 class FetchTarget(FetchTargetT):
     name = client_name
+    broadcast_limits = {"default": BroadcastLimits(rate=5, burst=5, concurrency=5)}
 
     @staticmethod
     async def fetch_target(target_id, sender_id=None) -> Union[Bot.FetchedSession]:
@@ -293,55 +292,6 @@ class FetchTarget(FetchTargetT):
                 lst.append(fet)
         return lst
 
-    @staticmethod
-    async def post_message(module_name, message, user_list=None, i18n=False, **kwargs):
-        module_name = None if module_name == "*" else module_name
-        if user_list:
-            for x in user_list:
-                try:
-                    msgchain = message
-                    if isinstance(message, str):
-                        if i18n:
-                            msgchain = MessageChain([I18NContext(message, **kwargs)])
-                        else:
-                            msgchain = MessageChain([Plain(message)])
-                    msgchain = MessageChain(msgchain)
-                    await x.send_direct_message(msgchain)
-                    if enable_analytics and module_name:
-                        await AnalyticsData.create(target_id=x.target.target_id,
-                                                   sender_id=x.target.sender_id,
-                                                   command="",
-                                                   module_name=module_name,
-                                                   module_type="schedule")
-                except Exception:
-                    Logger.error(traceback.format_exc())
-        else:
-            get_target_id = await TargetInfo.get_target_list_by_module(
-                module_name, client_name
-            )
-            for x in get_target_id:
-                fetch = await FetchTarget.fetch_target(x.target_id)
-                if fetch:
-                    if x.muted:
-                        continue
-                    try:
-                        msgchain = message
-                        if isinstance(message, str):
-                            if i18n:
-                                msgchain = MessageChain([I18NContext(message, **kwargs)])
-                            else:
-                                msgchain = MessageChain([Plain(message)])
-                        msgchain = MessageChain(msgchain)
-                        await fetch.send_direct_message(msgchain)
-                        if enable_analytics and module_name:
-                            await AnalyticsData.create(target_id=fetch.target.target_id,
-                                                       sender_id=fetch.target.sender_id,
-                                                       command="",
-                                                       module_name=module_name,
-                                                       module_type="schedule")
-                    except Exception:
-                        Logger.error(traceback.format_exc())
-
 
 Bot.MessageSession = MessageSession
 Bot.FetchTarget = FetchTarget
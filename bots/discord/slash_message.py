@@ -1,4 +1,5 @@
 import traceback
+from io import BytesIO
 
 import discord
 
@@ -70,11 +71,11 @@ class MessageSession(MessageSessionT):
             elif isinstance(x, ImageElement):
                 if first_send:
                     send_ = await self.session.message.respond(
-                        file=discord.File(await x.get())
+                        file=discord.File(BytesIO(await x.get_bytes()), filename=await x.get_filename())
                     )
                 else:
                     send_ = await self.session.message.send(
-                        file=discord.File(await x.get())
+                        file=discord.File(BytesIO(await x.get_bytes()), filename=await x.get_filename())
                     )
                 Logger.info(
                     f"[Bot] -> [{self.target.target_id}]: Image: {str(x.__dict__)}"
@@ -15,18 +15,17 @@ from core.builtins import (
     I18NContext,
     Mention,
     MessageTaskManager,
+    BroadcastLimits,
     FetchTarget as FetchTargetT,
     FinishedSession as FinishedSessionT,
 )
 from core.builtins.message.chain import MessageChain
 from core.builtins.message.elements import MentionElement, PlainElement, ImageElement, VoiceElement
 from core.config import Config
-from core.database.models import AnalyticsData, TargetInfo
 from core.logger import Logger
 from .client import bot
 from .info import *
 
-enable_analytics = Config("enable_analytics", False)
 kook_base = "https://www.kookapp.cn"
 kook_token = Config("kook_token", cfg_type=str, secret=True, table_name="bot_kook")
 kook_headers = {
@@ -276,6 +275,7 @@ Bot.FetchedSession = FetchedSession
 
 class FetchTarget(FetchTargetT):
     name = client_name
+    broadcast_limits = {"default": BroadcastLimits(rate=2, burst=2, concurrency=2)}
 
     @staticmethod
     async def fetch_target(target_id, sender_id=None) -> Union[Bot.FetchedSession]:
@@ -306,55 +306,6 @@ class FetchTarget(FetchTargetT):
                 lst.append(fet)
         return lst
 
-    @staticmethod
-    async def post_message(module_name, message, user_list=None, i18n=False, **kwargs):
-        module_name = None if module_name == "*" else module_name
-        if user_list:
-            for x in user_list:
-                try:
-                    msgchain = message
-                    if isinstance(message, str):
-                        if i18n:
-                            msgchain = MessageChain([I18NContext(message, **kwargs)])
-                        else:
-                            msgchain = MessageChain([Plain(message)])
-                    msgchain = MessageChain(msgchain)
-                    await x.send_direct_message(msgchain)
-                    if enable_analytics and module_name:
-                        await AnalyticsData.create(target_id=x.target.target_id,
-                                                   sender_id=x.target.sender_id,
-                                                   command="",
-                                                   module_name=module_name,
-                                                   module_type="schedule")
-                except Exception:
-                    Logger.error(traceback.format_exc())
-        else:
-            get_target_id = await TargetInfo.get_target_list_by_module(
-                module_name, client_name
-            )
-            for x in get_target_id:
-                fetch = await FetchTarget.fetch_target(x.target_id)
-                if fetch:
-                    if x.muted:
-                        continue
-                    try:
-                        msgchain = message
-                        if isinstance(message, str):
-                            if i18n:
-                                msgchain = MessageChain([I18NContext(message, **kwargs)])
-                            else:
-                                msgchain = MessageChain([Plain(message)])
-                        msgchain = MessageChain(msgchain)
-                        await fetch.send_direct_message(msgchain)
-                        if enable_analytics and module_name:
-                            await AnalyticsData.create(target_id=fetch.target.target_id,
-                                                       sender_id=fetch.target.sender_id,
-                                                       command="",
-                                                       module_name=module_name,
-                                                       module_type="schedule")
-                    except Exception:
-                        Logger.error(traceback.format_exc())
-
 
 Bot.MessageSession = MessageSession
 Bot.FetchTarget = FetchTarget
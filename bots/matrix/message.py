@@ -2,23 +2,20 @@ import mimetypes
 import os
 import re
 import traceback
+from io import BytesIO
 from typing import List, Union
 
 import nio
 
 from core.builtins import Bot, Plain, Image, Voice, MessageSession as MessageSessionT, I18NContext, MessageTaskManager, \
-    FetchTarget as FetchedTargetT, FinishedSession as FinishedSessionT
+    BroadcastLimits, FetchTarget as FetchedTargetT, FinishedSession as FinishedSessionT
 from core.builtins.message.chain import MessageChain
 from core.builtins.message.elements import PlainElement, ImageElement, VoiceElement, MentionElement
-from core.config import Config
-from core.database.models import AnalyticsData, TargetInfo
 from core.logger import Logger
 from core.utils.image import image_split
 from .client import bot, homeserver_host
 from .info import *
 
-enable_analytics = Config("enable_analytics", False)
-
 
 class FinishedSession(FinishedSessionT):
     async def delete(self):
@@ -140,53 +137,48 @@ class MessageSession(MessageSessionT):
                     Logger.info(f"Split image: {str(x.__dict__)}")
                     split = await image_split(x)
                 for xs in split:
-                    path = await xs.get()
-                    with open(path, "rb") as image:
-                        filename = os.path.basename(path)
-                        filesize = os.path.getsize(path)
-                        (content_type, content_encoding) = mimetypes.guess_type(path)
-                        if not content_type or not content_encoding:
-                            content_type = "image"
-                            content_encoding = "png"
-                        mimetype = f"{content_type}/{content_encoding}"
-
-                        encrypted = self.session.target in bot.encrypted_rooms
-                        (upload, upload_encryption) = await bot.upload(
-                            image,
-                            content_type=mimetype,
-                            filename=filename,
-                            encrypt=encrypted,
-                            filesize=filesize,
-                        )
-                        Logger.info(
-                            f"Uploaded image {filename} to media repo, uri: {
-                                upload.content_uri}, mime: {mimetype}, encrypted: {encrypted}")
-                        # todo: provide more image info
-                        if not encrypted:
-                            content = {
-                                "msgtype": "m.image",
-                                "url": upload.content_uri,
-                                "body": filename,
-                                "info": {
-                                    "size": filesize,
-                                    "mimetype": mimetype,
-                                },
-                            }
-                        else:
-                            upload_encryption["url"] = upload.content_uri
-                            content = {
-                                "msgtype": "m.image",
-                                "body": filename,
-                                "file": upload_encryption,
-                                "info": {
-                                    "size": filesize,
-                                    "mimetype": mimetype,
-                                },
-                            }
-                        Logger.info(
-                            f"[Bot] -> [{self.target.target_id}]: Image: {str(xs.__dict__)}"
-                        )
-                        await sendMsg(content)
+                    payload = await xs.get_bytes()
+                    filename = await xs.get_filename()
+                    filesize = len(payload)
+                    mimetype = await xs.get_mime()
+
+                    encrypted = self.session.target in bot.encrypted_rooms
+                    (upload, upload_encryption) = await bot.upload(
+                        BytesIO(payload),
+                        content_type=mimetype,
+                        filename=filename,
+                        encrypt=encrypted,
+                        filesize=filesize,
+                    )
+                    Logger.info(
+                        f"Uploaded image {filename} to media repo, uri: {
+                            upload.content_uri}, mime: {mimetype}, encrypted: {encrypted}")
+                    # todo: provide more image info
+                    if not encrypted:
+                        content = {
+                            "msgtype": "m.image",
+                            "url": upload.content_uri,
+                            "body": filename,
+                            "info": {
+                                "size": filesize,
+                                "mimetype": mimetype,
+                            },
+                        }
+                    else:
+                        upload_encryption["url"] = upload.content_uri
+                        content = {
+                            "msgtype": "m.image",
+                            "body": filename,
+                            "file": upload_encryption,
+                            "info": {
+                                "size": filesize,
+                                "mimetype": mimetype,
+                            },
+                        }
+                    Logger.info(
+                        f"[Bot] -> [{self.target.target_id}]: Image: {str(xs.__dict__)}"
+                    )
+                    await sendMsg(content)
             elif isinstance(x, VoiceElement):
                 path = x.path
                 filename = os.path.basename(path)
@@ -372,6 +364,7 @@ Bot.FetchedSession = FetchedSession
 
 class FetchTarget(FetchedTargetT):
     name = client_name
+    broadcast_limits = {"default": BroadcastLimits(rate=1, burst=5, concurrency=1)}
 
     @staticmethod
     async def fetch_target(target_id, sender_id=None) -> Union[Bot.FetchedSession]:
@@ -401,53 +394,6 @@ class FetchTarget(FetchedTargetT):
                 lst.append(fet)
         return lst
 
-    @staticmethod
-    async def post_message(module_name, message, user_list=None, i18n=False, **kwargs):
-        module_name = None if module_name == "*" else module_name
-        if user_list:
-            for x in user_list:
-                try:
-                    msgchain = message
-                    if isinstance(message, str):
-                        if i18n:
-                            msgchain = MessageChain([I18NContext(message, **kwargs)])
-                        else:
-                            msgchain = MessageChain([Plain(message)])
-                    msgchain = MessageChain(msgchain)
-                    await x.send_direct_message(msgchain)
-                    if enable_analytics and module_name:
-                        await AnalyticsData.create(target_id=x.target.target_id,
-                                                   sender_id=x.target.sender_id,
-                                                   command="",
-                                                   module_name=module_name,
-                                                   module_type="schedule")
-                except Exception:
-                    Logger.error(traceback.format_exc())
-        else:
-            get_target_id = await TargetInfo.get_target_list_by_module(module_name, client_name)
-            for x in get_target_id:
-                fetch = await FetchTarget.fetch_target(x.target_id)
-                if fetch:
-                    if x.muted:
-                        continue
-                    try:
-                        msgchain = message
-                        if isinstance(message, str):
-                            if i18n:
-                                msgchain = MessageChain([I18NContext(message, **kwargs)])
-                            else:
-                                msgchain = MessageChain([Plain(message)])
-                        msgchain = MessageChain(msgchain)
-                        await fetch.send_direct_message(msgchain)
-                        if enable_analytics and module_name:
-                            await AnalyticsData.create(target_id=fetch.target.target_id,
-                                                       sender_id=fetch.target.sender_id,
-                                                       command="",
-                                                       module_name=module_name,
-                                                       module_type="schedule")
-                    except Exception:
-                        Logger.error(traceback.format_exc())
-
 
 Bot.MessageSession = MessageSession
 Bot.FetchTarget = FetchTarget
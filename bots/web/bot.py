@@ -1,8 +1,6 @@
 import asyncio
-import glob
 import os
 import platform
-import re
 import sys
 import traceback
 from collections import defaultdict
@@ -29,14 +27,15 @@ from tortoise.expressions import Q
 sys.path.append(os.getcwd())
 
 from bots.web.info import *  # noqa: E402
+from bots.web.log_stream import log_stream  # noqa: E402
 from bots.web.message import MessageSession  # noqa: E402
 from bots.web.utils import find_available_port, generate_webui_config  # noqa: E402
 from core.bot_init import init_async  # noqa: E402
 from core.builtins import PrivateAssets, Temp  # noqa: E402
 from core.config import Config  # noqa: E402
 from core.constants import config_filename  # noqa: E402
-from core.constants.path import assets_path, config_path, logs_path, webui_path  # noqa: E402
-from core.database.models import AnalyticsData, SenderInfo, TargetInfo, MaliciousLoginRecords  # noqa: E402
+from core.constants.path import assets_path, config_path, webui_path  # noqa: E402
+from core.database.models import AnalyticsData, AnalyticsRollup, BroadcastProgress, SenderInfo, TargetInfo, MaliciousLoginRecords  # noqa: E402
 from core.database.local import CSRF_TOKEN_EXPIRY, CSRFTokenRecords  # noqa: E402
 from core.extra.scheduler import load_extra_schedulers  # noqa: E402
 from core.i18n import Locale  # noqa: E402
@@ -48,6 +47,7 @@ from core.scheduler import Scheduler  # noqa: E402
 from core.terminate import cleanup_sessions  # noqa: E402
 from core.types import MsgInfo, Session  # noqa: E402
 from core.utils.info import Info  # noqa: E402
+from core.utils.web_render import render_cache, web_render_client  # noqa: E402
 
 started_time = datetime.now()
 webui_index = os.path.join(webui_path, "index.html")
@@ -64,7 +64,6 @@ JWT_SECRET = Config("jwt_secret", cfg_type=str, secret=True, table_name="bot_web
 LOGIN_MAX_ATTEMPTS = Config("login_max_attempts", default=5, table_name="bot_web")
 PASSWORD_PATH = os.path.join(PrivateAssets.path, ".password")
 LOGIN_BLOCK_DURATION = 3600
-MAX_LOG_HISTORY = 1000
 
 web_port = find_available_port(WEB_PORT, host=WEB_HOST)
 protocol = "https" if enable_https else "http"
@@ -81,6 +80,7 @@ async def lifespan(app: FastAPI):
     if os.path.exists(webui_index):
         Logger.info(f"Visit AkariBot WebUI: {protocol}://{WEB_HOST}:{web_port}/webui")
     yield
+    log_stream.stop()
     await cleanup_sessions()
     sys.exit()
 
@@ -89,8 +89,6 @@ limiter = Limiter(key_func=get_remote_address)
 ph = PasswordHasher()
 
 login_failed_attempts = defaultdict(list)
-last_file_line_count = {}
-logs_history = []
 
 
 async def verify_csrf_token(request: Request):
@@ -348,23 +346,59 @@ async def server_info(request: Request):
     }
 
 
+@app.get("/api/http-cache")
+@limiter.limit("10/minute")
+async def http_cache_stats(request: Request):
+    verify_jwt(request)
+    clients = await JobQueue.get_http_cache_stats()
+    total = {}
+    for stats in clients.values():
+        for k, v in stats.items():
+            total[k] = total.get(k, 0) + v
+    return {"message": "Success", "stats": total, "clients": clients}
+
+
+@app.get("/api/web-render")
+@limiter.limit("10/minute")
+async def web_render_stats(request: Request):
+    verify_jwt(request)
+    return {"message": "Success", "stats": web_render_client.stats, "cache": render_cache.stats}
+
+
+@app.get("/api/broadcasts")
+@limiter.limit("10/minute")
+async def get_broadcasts(request: Request, limit: int = Query(20)):
+    verify_jwt(request)
+    broadcasts = await BroadcastProgress.all().order_by("-timestamp").limit(limit).values(
+        "job_id", "client_name", "module_name", "status", "total", "succeeded", "failed", "skipped",
+        "timestamp", "updated_at")
+    for b in broadcasts:
+        b["elapsed"] = (b["updated_at"] - b["timestamp"]).total_seconds()
+    return {"message": "Success", "broadcasts": broadcasts}
+
+
 @app.get("/api/analytics")
 @limiter.limit("2/second")
-async def get_analytics(request: Request, days: int = Query(1)):
+async def get_analytics(request: Request, days: int = Query(1), raw: bool = Query(True)):
     verify_jwt(request)
     try:
         now = datetime.now()
         past = now - timedelta(days=days)
-        data = await AnalyticsData.get_values_by_times(now, past)
-        count = await AnalyticsData.get_count_by_times(now, past)
+        count = await AnalyticsRollup.get_count_by_times(now, past)
         past_past = now - timedelta(days=2 * days)
-        past_count = await AnalyticsData.get_count_by_times(past, past_past)
+        past_count = await AnalyticsRollup.get_count_by_times(past, past_past)
         try:
             change_rate = round((count - past_count) / past_count, 2)
         except ZeroDivisionError:
             change_rate = 0.00
+        buckets = await AnalyticsRollup.get_grouped_count("bucket", now, past)
+        trend = [{"timestamp": bucket, "count": c} for bucket, c in sorted(buckets.items())]
+        targets = await AnalyticsRollup.get_grouped_count("target_prefix", now, past)
 
-        return {"count": count, "change_rate": change_rate, "data": data}
+        result = {"count": count, "change_rate": change_rate, "trend": trend, "targets": targets}
+        if raw:
+            result["data"] = await AnalyticsData.get_values_by_times(now, past)
+        return result
 
     except Exception:
         Logger.error(traceback.format_exc())
@@ -790,82 +824,24 @@ async def websocket_chat(websocket: WebSocket):
 async def websocket_logs(websocket: WebSocket):
     await websocket.accept()
 
+    history = list(log_stream.history)
+    queue = log_stream.subscribe()
     try:
-        if logs_history:
-            expanded_history = ["\n".join(item) if isinstance(item, list) else item for item in logs_history]
-            await websocket.send_text("\n".join(expanded_history))
+        if history:
+            await websocket.send_text("\n".join(history))
 
         while True:
-            today_logs = glob.glob(f"{logs_path}/*_{datetime.today().strftime("%Y-%m-%d")}.log")
-            today_logs = [log for log in today_logs if "console" not in os.path.basename(log)]
-            today_logs.sort(
-                key=lambda line: (
-                    extract_timestamp(
-                        line[0]) if isinstance(
-                        line,
-                        list) else extract_timestamp(line)) or datetime.min)
-            if today_logs:
-                for log_file in today_logs:
-                    current_line_count = 0
-                    new_lines = []
-
-                    with open(log_file, "r", encoding="utf-8") as f:
-                        for i, line in enumerate(f):
-                            if i >= last_file_line_count.get(log_file, 0):
-                                if line:
-                                    new_lines.append(line.rstrip())
-                            current_line_count = i + 1
-
-                    if new_lines:
-                        processed_lines = []
-                        for line in new_lines:
-                            if is_log_line_valid(line):
-                                logs_history.append(line)
-                            else:
-                                if logs_history and isinstance(
-                                        logs_history[-1], str) and is_log_line_valid(logs_history[-1]):
-                                    logs_history.append([logs_history.pop(), line])
-                                elif logs_history and isinstance(logs_history[-1], list):
-                                    logs_history[-1].append(line)
-                                else:
-                                    logs_history.append(line)
-                            processed_lines.append(line)
-
-                        logs_history.sort(
-                            key=lambda line: (
-                                extract_timestamp(
-                                    line[0]) if isinstance(
-                                    line,
-                                    list) else extract_timestamp(line)) or datetime.min)
-                        expanded_logs = [
-                            "\n".join(item) if isinstance(
-                                item, list) else item for item in processed_lines]
-                        await websocket.send_text("\n".join(expanded_logs))
-
-                        while len(logs_history) > MAX_LOG_HISTORY:
-                            logs_history.pop(0)
-
-                    last_file_line_count[log_file] = current_line_count
-
-            await asyncio.sleep(0.1)
+            entries = [await queue.get()]
+            while not queue.empty():
+                entries.append(queue.get_nowait())
+            await websocket.send_text("\n".join(entries))
     except WebSocketDisconnect:
         pass
     except Exception:
         Logger.error(traceback.format_exc())
         await websocket.close()
-
-
-def is_log_line_valid(line: str) -> bool:
-    log_pattern = r"^\[.+\]\[[a-zA-Z0-9\._]+:[a-zA-Z0-9\._]+:\d+\]\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\]\[[A-Z]+\]:"
-    return bool(re.match(log_pattern, line))
-
-
-def extract_timestamp(log_line: str):
-    log_time_pattern = r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]"
-    match = re.search(log_time_pattern, log_line)
-    if match:
-        return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
-    return None
+    finally:
+        log_stream.unsubscribe(queue)
 
 
 @app.post("/api/restart")
@@ -0,0 +1,182 @@
+import asyncio
+import glob
+import os
+import re
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.constants.path import logs_path
+from core.logger import Logger, basic_logger_format
+
+log_line_pattern = re.compile(
+    r"^\[.+\]\[[a-zA-Z0-9\._]+:[a-zA-Z0-9\._]+:\d+\]\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\]\[[A-Z]+\]:")
+log_time_pattern = re.compile(r"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]")
+
+
+def is_log_line_valid(line: str) -> bool:
+    return bool(log_line_pattern.match(line))
+
+
+def extract_timestamp(log_line: str) -> Optional[datetime]:
+    match = log_time_pattern.search(log_line)
+    if match:
+        return datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+    return None
+
+
+class LogStream:
+    """
+    将日志实时推送至网页控制台。本进程的日志通过 loguru sink 获取，其他进程的日志通过记录偏移量追踪日志文件获取。
+
+    :param history_size: 保存的历史日志条数。
+    :param queue_size: 每个订阅者最多积压的日志条数，超出时丢弃最旧的日志。
+    :param interval: 检查日志文件的间隔（秒）。
+    :param catch_up_bytes: 首次读取日志文件时最多读取的字节数。
+    """
+
+    def __init__(self,
+                 history_size: int = 1000,
+                 queue_size: int = 1000,
+                 interval: float = 0.5,
+                 catch_up_bytes: int = 256 * 1024):
+        self.history: deque[str] = deque(maxlen=history_size)
+        self.queue_size = queue_size
+        self.interval = interval
+        self.catch_up_bytes = catch_up_bytes
+        self._subscribers: set[asyncio.Queue] = set()
+        self._offsets: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sink_id: Optional[int] = None
+        self._last_error: Optional[str] = None
+
+    def start(self):
+        """
+        开始收集日志。
+        """
+        if self._task and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._poll_files(catch_up=True)
+        self._sink_id = Logger.log.add(self._sink,
+                                       format=basic_logger_format(Logger.name),
+                                       colorize=False)
+        self._task = asyncio.create_task(self._tail_loop())
+
+    def stop(self):
+        """
+        停止收集日志。
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._sink_id is not None:
+            try:
+                Logger.log.remove(self._sink_id)
+            except ValueError:
+                pass
+            self._sink_id = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        订阅新日志。
+
+        :return: 接收新日志的队列。
+        """
+        self.start()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """
+        取消订阅。
+        """
+        self._subscribers.discard(queue)
+
+    def publish(self, entries: List[str]):
+        """
+        向历史记录与所有订阅者推送日志。
+        """
+        for entry in entries:
+            self.history.append(entry)
+            for queue in self._subscribers:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(entry)
+
+    def _sink(self, message):
+        entry = str(message).rstrip("\n")
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self.publish([entry])
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.publish, [entry])
+
+    async def _tail_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self._poll_files()
+                self._last_error = None
+            except Exception:
+                error = traceback.format_exc()
+                if error != self._last_error:
+                    # 同一错误只记录一次，避免每次轮询都刷屏
+                    Logger.error(error)
+                    self._last_error = error
+
+    def _poll_files(self, catch_up: bool = False):
+        today = datetime.today().strftime("%Y-%m-%d")
+        entries = []
+        for log_file in glob.glob(os.path.join(logs_path, f"*_{today}.log")):
+            name = os.path.basename(log_file).removesuffix(f"_{today}.log")
+            if name == "console" or (name == Logger.name and not catch_up):
+                # 本进程的新日志由 sink 获取
+                continue
+            entries += self._read_new_lines(log_file, catch_up)
+        if entries:
+            entries.sort(key=lambda e: extract_timestamp(e) or datetime.min)
+            self.publish(entries)
+
+    def _read_new_lines(self, log_file: str, catch_up: bool) -> List[str]:
+        size = os.path.getsize(log_file)
+        offset = self._offsets.get(log_file)
+        if offset is None:
+            # 新出现的日志文件：启动时读取末尾部分作为历史记录，其后出现的文件从头读取
+            offset = max(0, size - self.catch_up_bytes) if catch_up else 0
+        elif size < offset:
+            offset = 0
+        if size == offset:
+            self._offsets[log_file] = offset
+            return []
+        with open(log_file, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        end = data.rfind(b"\n")
+        if end == -1:
+            self._offsets[log_file] = offset
+            return []
+        self._offsets[log_file] = offset + end + 1
+        lines = data[:end].decode("utf-8", errors="replace").splitlines()
+        if catch_up and offset > 0:
+            lines = lines[1:]  # 丢弃可能被截断的第一行
+
+        entries = []
+        for line in lines:
+            line = line.rstrip()
+            if not line:
+                continue
+            if is_log_line_valid(line) or not entries:
+                entries.append(line)
+            else:
+                entries[-1] += "\n" + line
+        return entries
+
+
+log_stream = LogStream()
@@ -1,12 +1,11 @@
-import os
-import shutil
-
 from core.builtins import MessageTaskManager
-from core.constants.path import cache_path
-from core.queue import check_job_queue
+from core.queue import JobQueue, check_job_queue
 from core.scheduler import Scheduler, IntervalTrigger, CronTrigger
+from core.utils.analytics import analytics_writer
+from core.utils.cache import purge_cache_path
 from core.utils.cooldown import clear_cd_list
 from core.utils.game import clear_ps_list
+from core.utils.web_render import web_render_client
 
 
 @Scheduler.scheduled_job(IntervalTrigger(minutes=60))
@@ -16,14 +15,13 @@ async def bg():
 
 @Scheduler.scheduled_job(IntervalTrigger(seconds=1), max_instances=1)
 async def job():
-    await check_job_queue()
+    if JobQueue.transport.should_poll():
+        await check_job_queue()
 
 
 @Scheduler.scheduled_job(CronTrigger.from_crontab("0 0 * * *"))
 async def auto_purge():
-    if os.path.exists(cache_path):
-        shutil.rmtree(cache_path)
-    os.makedirs(cache_path, exist_ok=True)
+    purge_cache_path()
 
 
 @Scheduler.scheduled_job(IntervalTrigger(seconds=1), max_instances=1)
@@ -32,5 +30,15 @@ async def clear_list():
     clear_ps_list()
 
 
+@Scheduler.scheduled_job(IntervalTrigger(seconds=5), max_instances=1)
+async def flush_analytics():
+    await analytics_writer.flush()
+
+
+@Scheduler.scheduled_job(IntervalTrigger(seconds=60), max_instances=1)
+async def probe_web_render():
+    await web_render_client.probe()
+
+
 def init_background_task():  # make IDE happy :)
     pass
@@ -5,6 +5,7 @@ import os
 import orjson as json
 
 from core.builtins import Plain, I18NContext
+from core.builtins.message.broadcast import broadcast_engine
 from core.background_tasks import init_background_task
 from core.config import CFGManager
 from core.constants import PrivateAssets, Secret
@@ -40,6 +41,7 @@ async def init_async(start_scheduler=True) -> None:
                 )
     await asyncio.gather(*gather_list)
     init_background_task()
+    await JobQueue.start_transport()
     if start_scheduler:
         if not Info.subprocess:
             load_extra_schedulers()
@@ -73,6 +75,7 @@ async def load_prompt(bot) -> None:
                     else:
                         await m.send_direct_message(I18NContext("loader.load.success"))
         os.remove(author_cache)
+    await broadcast_engine.resume(bot)
 
 
 __all__ = ["init_async", "load_prompt"]
@@ -3,8 +3,9 @@ from __future__ import annotations
 import asyncio
 from datetime import datetime, UTC as datetimeUTC, timedelta
 from re import Match
-from typing import Any, Coroutine, Dict, List, Optional, Tuple, Union
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple, Union
 
+from core.builtins.message.broadcast import BroadcastJob, BroadcastLimits, broadcast_engine
 from core.builtins.message.chain import *
 from core.builtins.message.elements import MessageElement
 from core.builtins.message.internal import *
@@ -725,23 +726,57 @@ class FetchTarget:
         """
         raise NotImplementedError
 
-    @staticmethod
+    @classmethod
     async def post_message(
+        cls,
         module_name: str,
         message: str,
         user_list: Optional[List[FetchedSession]] = None,
         i18n: bool = False,
         **kwargs: Dict[str, Any],
-    ):
+    ) -> BroadcastJob:
         """
-        尝试向开启此模块的对象发送一条消息。
+        尝试向开启此模块的对象发送一条消息，消息会按平台的速率限制在后台发送。
 
         :param module_name: 模块名称。
         :param message: 消息文本。
         :param user_list: 用户列表。
         :param i18n: 是否使用i18n。若为True则`message`为本地化键名。（或为指定语言的dict映射表（k=语言，v=文本））
+        :return: 推送任务。
         """
-        raise NotImplementedError
+        return await broadcast_engine.post(cls, module_name, message, user_list=user_list, i18n=i18n, **kwargs)
+
+    broadcast_limits: Dict[str, BroadcastLimits] = {"default": BroadcastLimits()}
+    """推送速率限制，键为推送通道。"""
+
+    @staticmethod
+    async def get_broadcast_eligible() -> Optional[Set[str]]:
+        """
+        获取可以推送消息的对象ID集合，返回None时不进行筛选。
+        """
+        return None
+
+    @staticmethod
+    def get_broadcast_lane(target_id: str, target_info: Optional[TargetInfo]) -> str:
+        """
+        获取推送对象使用的推送通道，不同通道使用各自的速率限制。
+
+        :param target_id: 对象ID。
+        :param target_info: 对象信息，推送至指定的用户列表时为None。
+        """
+        return "default"
+
+    @staticmethod
+    async def send_broadcast(job: BroadcastJob, fetch: FetchedSession, message_chain: MessageChain) -> Optional[bool]:
+        """
+        向推送对象发送消息。
+
+        :param job: 推送任务。
+        :param fetch: 推送对象。
+        :param message_chain: 消息链。
+        :return: 消息未发送且不视为失败时返回False。
+        """
+        await fetch.send_direct_message(message_chain)
 
     @staticmethod
     async def post_global_message(
@@ -772,6 +807,7 @@ add_export(FinishedSession)
 
 
 __all__ = [
+    "BroadcastLimits",
     "MessageSession",
     "ExecutionLockList",
     "MessageTaskManager",
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+import traceback
+import uuid
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import attrs
+import orjson as json
+from attrs import define
+from cattrs import unstructure
+
+from core.builtins.message.chain import MessageChain
+from core.builtins.message.elements import ImageElement
+from core.builtins.message.internal import I18NContext, Plain
+from core.config import Config
+from core.database.models import BroadcastProgress, TargetInfo
+from core.logger import Logger
+from core.utils.analytics import analytics_writer
+
+if TYPE_CHECKING:
+    from core.builtins.message import FetchedSession, FetchTarget
+
+enable_analytics = Config("enable_analytics", False)
+
+
+@define
+class BroadcastLimits:
+    """
+    推送速率限制。
+
+    :param rate: 每秒最多发送的消息数。
+    :param burst: 允许连续发送的消息数。
+    :param concurrency: 最多同时发送的消息数。
+    :param jitter: 每次发送前随机等待的最长时间（秒）。
+    """
+
+    rate: float = 1.0
+    burst: int = 1
+    concurrency: int = 1
+    jitter: float = 0.0
+
+
+class TokenBucket:
+    """
+    令牌桶，用于限制发送速率。
+
+    :param rate: 每秒补充的令牌数。
+    :param burst: 令牌桶容量。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        取得一个令牌，令牌不足时等待。
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastJob:
+    """
+    消息推送任务。
+
+    :param fetch_target: 推送所用平台的FetchTarget。
+    :param progress: 推送进度记录。
+    :param message_chain: 推送的消息链。
+    :param user_list: 指定的推送对象。
+    """
+
+    def __init__(self,
+                 fetch_target: type[FetchTarget],
+                 progress: BroadcastProgress,
+                 message_chain: MessageChain,
+                 user_list: Optional[List[FetchedSession]] = None):
+        self.fetch_target = fetch_target
+        self.progress = progress
+        self.message_chain = message_chain
+        self.user_list = user_list
+        self.processed: Set[str] = set(progress.processed)
+        # 供平台的发送方法保存任务内的状态
+        self.data: Dict[str, Any] = {}
+        self.started = time.monotonic()
+        self._unsaved = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def job_id(self) -> str:
+        return self.progress.job_id
+
+    @property
+    def module_name(self) -> Optional[str]:
+        return self.progress.module_name
+
+    @property
+    def done(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {
+            "job_id": self.job_id,
+            "client_name": self.progress.client_name,
+            "module_name": self.module_name,
+            "status": self.progress.status,
+            "total": self.progress.total,
+            "processed": len(self.processed),
+            "succeeded": self.progress.succeeded,
+            "failed": self.progress.failed,
+            "skipped": self.progress.skipped,
+            "elapsed": round(elapsed, 1),
+            "rate": round(len(self.processed) / elapsed, 3) if elapsed else 0.0,
+        }
+
+    async def wait(self):
+        """
+        等待推送完成。
+        """
+        if self._task:
+            await asyncio.shield(self._task)
+
+
+class BroadcastEngine:
+    """
+    消息推送引擎，在后台按平台的速率限制推送消息，并记录推送进度，重启后从中断处继续推送。
+    各平台的FetchTarget只需提供发送方法与速率限制。
+
+    :param checkpoint_interval: 每处理多少个对象保存一次进度。
+    :param resume_timeout: 超过此时间（秒）未更新的推送任务不再恢复。
+    """
+
+    def __init__(self, checkpoint_interval: int = 20, resume_timeout: int = 86400):
+        self.checkpoint_interval = checkpoint_interval
+        self.resume_timeout = resume_timeout
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._semaphores: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+        self._jobs: Dict[str, BroadcastJob] = {}
+
+    @property
+    def stats(self) -> List[Dict[str, Any]]:
+        return [job.stats for job in self._jobs.values()]
+
+    async def post(self,
+                   fetch_target: type[FetchTarget],
+                   module_name: Optional[str],
+                   message,
+                   user_list: Optional[List[FetchedSession]] = None,
+                   i18n: bool = False,
+                   **kwargs) -> BroadcastJob:
+        """
+        创建推送任务，相同的推送任务未完成时会继续此前的进度。
+
+        :param fetch_target: 推送所用平台的FetchTarget。
+        :param module_name: 模块名称，为`*`时推送至所有对象。
+        :param message: 消息。
+        :param user_list: 指定的推送对象。
+        :param i18n: 是否使用i18n。若为True则`message`为本地化键名。
+        :returns: 推送任务。
+        """
+        module_name = None if module_name == "*" else module_name
+        msgchain = message
+        if isinstance(message, str):
+            if i18n:
+                msgchain = MessageChain([I18NContext(message, **kwargs)])
+            else:
+                msgchain = MessageChain([Plain(message)])
+        msgchain = MessageChain(msgchain)
+        targets = [x.target.target_id for x in user_list] if user_list else None
+
+        try:
+            serialized, resumable = await self._serialize(msgchain)
+            job_id = hashlib.sha256(json.dumps([fetch_target.name, module_name, serialized, targets])).hexdigest()
+            if not resumable:
+                serialized = None
+        except Exception:
+            # 无法序列化的消息不能在重启后恢复
+            serialized = None
+            job_id = uuid.uuid4().hex
+
+        if (job := self._jobs.get(job_id)) and not job.done:
+            return job
+
+        progress = await BroadcastProgress.get_or_none(job_id=job_id)
+        if not progress:
+            progress = BroadcastProgress(job_id=job_id,
+                                         client_name=fetch_target.name,
+                                         module_name=module_name,
+                                         message=serialized,
+                                         targets=targets)
+        elif progress.status == "running" and \
+                time.time() - progress.updated_at.timestamp() < self.resume_timeout:
+            Logger.info(f"Resuming broadcast {job_id[:8]}, {len(progress.processed)} targets already processed.")
+        else:
+            # 此前已完成的相同推送，重新开始
+            progress.update_from_dict({"processed": [],
+                                       "status": "running",
+                                       "total": 0,
+                                       "succeeded": 0,
+                                       "failed": 0,
+                                       "skipped": 0,
+                                       "timestamp": datetime.now(UTC)})
+        return await self._start(BroadcastJob(fetch_target, progress, msgchain, user_list))
+
+    async def resume(self, fetch_target: type[FetchTarget]):
+        """
+        继续推送此平台未完成的推送任务。
+
+        :param fetch_target: 推送所用平台的FetchTarget。
+        """
+        try:
+            unfinished = await BroadcastProgress.get_unfinished(fetch_target.name, self.resume_timeout)
+        except Exception:
+            Logger.error(traceback.format_exc())
+            return
+        for progress in unfinished:
+            if progress.job_id in self._jobs or progress.message is None:
+                continue
+            user_list = None
+            if progress.targets:
+                user_list = await fetch_target.fetch_target_list(
+                    [x for x in progress.targets if x not in progress.processed])
+            Logger.info(f"Resuming broadcast {progress.job_id[:8]}, "
+                        f"{len(progress.processed)} targets already processed.")
+            await self._start(BroadcastJob(fetch_target, progress, MessageChain(progress.message), user_list))
+
+    @staticmethod
+    async def _serialize(msgchain: MessageChain) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        序列化消息链，不会将内存中的图片写入缓存文件。本地图片以内容的哈希值表示，
+        由于缓存文件会被定期清理，含有本地图片的消息不能在重启后恢复。
+
+        :param msgchain: 消息链。
+        :returns: 序列化后的消息链，以及消息链能否在重启后恢复。
+        """
+        resumable = True
+
+        async def convert(value):
+            nonlocal resumable
+            if isinstance(value, ImageElement):
+                if value.need_get:
+                    return {"path": value.path, "need_get": True, "headers": value.headers}
+                resumable = False
+                return {"sha256": hashlib.sha256(await value.get_bytes()).hexdigest()}
+            if isinstance(value, (list, tuple)):
+                return [await convert(v) for v in value]
+            if attrs.has(type(value)):
+                return {f.name: await convert(getattr(value, f.name))
+                        for f in attrs.fields(type(value)) if not f.name.startswith("_")}
+            return unstructure(value)
+
+        return [{x.__name__(): await convert(x)} for x in msgchain.value], resumable
+
+    async def _start(self, job: BroadcastJob) -> BroadcastJob:
+        self._jobs = {k: v for k, v in self._jobs.items() if not v.done}
+        self._jobs[job.job_id] = job
+        job._task = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job: BroadcastJob):
+        fetch_target = job.fetch_target
+        lanes: Dict[str, List[Tuple[str, Optional[FetchedSession]]]] = {}
+        try:
+            if job.user_list:
+                for fetch in job.user_list:
+                    target_id = fetch.target.target_id
+                    if target_id not in job.processed:
+                        lanes.setdefault(fetch_target.get_broadcast_lane(target_id, None), []).append((target_id, fetch))
+            elif job.progress.targets is None:
+                target_list = await TargetInfo.get_target_list_by_module(job.module_name, fetch_target.name)
+                eligible = await fetch_target.get_broadcast_eligible()
+                for x in target_list:
+                    if x.muted or x.target_id in job.processed or (eligible is not None and x.target_id not in eligible):
+                        continue
+                    lanes.setdefault(fetch_target.get_broadcast_lane(x.target_id, x), []).append((x.target_id, None))
+
+            job.progress.total = len(job.processed) + sum(len(x) for x in lanes.values())
+            await self._save(job)
+            await asyncio.gather(*(self._run_lane(job, lane, items) for lane, items in lanes.items()))
+            job.progress.status = "done"
+        except Exception:
+            Logger.error(traceback.format_exc())
+            job.progress.status = "failed"
+        await self._save(job)
+        Logger.info(f"Broadcast {job.job_id[:8]} {job.progress.status}: {job.progress.succeeded} succeeded, "
+                    f"{job.progress.failed} failed, {job.progress.skipped} skipped "
+                    f"in {time.monotonic() - job.started:.1f}s.")
+
+    async def _run_lane(self, job: BroadcastJob, lane: str, items: List[Tuple[str, Optional[FetchedSession]]]):
+        fetch_target = job.fetch_target
+        limits = fetch_target.broadcast_limits.get(lane) or BroadcastLimits()
+        key = (fetch_target.name, lane)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(limits.rate, limits.burst)
+            self._semaphores[key] = asyncio.Semaphore(limits.concurrency)
+        bucket = self._buckets[key]
+        semaphore = self._semaphores[key]
+        pending = iter(items)
+
+        async def worker():
+            for target_id, fetch in pending:
+                async with semaphore:
+                    await bucket.acquire()
+                    if limits.jitter:
+                        await asyncio.sleep(random.uniform(0, limits.jitter))
+                    await self._send(job, target_id, fetch)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, limits.concurrency))))
+
+    async def _send(self, job: BroadcastJob, target_id: str, fetch: Optional[FetchedSession]):
+        try:
+            if not fetch:
+                fetch = await job.fetch_target.fetch_target(target_id)
+            if not fetch or await job.fetch_target.send_broadcast(job, fetch, job.message_chain) is False:
+                job.progress.skipped += 1
+            else:
+                job.progress.succeeded += 1
+                if enable_analytics and job.module_name:
+                    analytics_writer.record(target_id=fetch.target.target_id,
+                                            sender_id=fetch.target.sender_id,
+                                            command="",
+                                            module_name=job.module_name,
+                                            module_type="schedule")
+        except Exception:
+            Logger.error(traceback.format_exc())
+            job.progress.failed += 1
+        job.processed.add(target_id)
+        job._unsaved += 1
+        if job._unsaved >= self.checkpoint_interval:
+            await self._save(job)
+
+    @staticmethod
+    async def _save(job: BroadcastJob):
+        job._unsaved = 0
+        job.progress.processed = list(job.processed)
+        try:
+            await job.progress.save()
+        except Exception:
+            Logger.error(traceback.format_exc())
+
+
+broadcast_engine = BroadcastEngine()
+
+
+__all__ = ["BroadcastLimits", "BroadcastJob", "BroadcastEngine", "TokenBucket", "broadcast_engine"]
@@ -115,53 +115,22 @@ class MessageChain:
 
         for v in self.value:
             if isinstance(v, PlainElement):
-                for secret in Secret.list:
-                    if secret in ["", None, True, False]:
-                        continue
-                    if v.text.upper().find(secret.upper()) != -1:
-                        Logger.warning(unsafeprompt("Plain", secret, v.text))
-                        return False
+                if secret := Secret.find(v.text):
+                    Logger.warning(unsafeprompt("Plain", secret, v.text))
+                    return False
             elif isinstance(v, EmbedElement):
-                for secret in Secret.list:
-                    if secret in ["", None, True, False]:
-                        continue
-                    if v.title:
-                        if v.title.upper().find(secret.upper()) != -1:
-                            Logger.warning(unsafeprompt("Embed.title", secret, v.title))
-                            return False
-                    if v.description:
-                        if v.description.upper().find(secret.upper()) != -1:
-                            Logger.warning(
-                                unsafeprompt("Embed.description", secret, v.description)
-                            )
-                            return False
-                    if v.footer:
-                        if v.footer.upper().find(secret.upper()) != -1:
-                            Logger.warning(
-                                unsafeprompt("Embed.footer", secret, v.footer)
-                            )
-                            return False
-                    if v.author:
-                        if v.author.upper().find(secret.upper()) != -1:
-                            Logger.warning(
-                                unsafeprompt("Embed.author", secret, v.author)
-                            )
-                            return False
-                    if v.url:
-                        if v.url.upper().find(secret.upper()) != -1:
-                            Logger.warning(unsafeprompt("Embed.url", secret, v.url))
-                            return False
-                    for f in v.fields:
-                        if f.name.upper().find(secret.upper()) != -1:
-                            Logger.warning(
-                                unsafeprompt("Embed.field.name", secret, f.name)
-                            )
-                            return False
-                        if f.value.upper().find(secret.upper()) != -1:
-                            Logger.warning(
-                                unsafeprompt("Embed.field.value", secret, f.value)
-                            )
-                            return False
+                fields = [("Embed.title", v.title),
+                          ("Embed.description", v.description),
+                          ("Embed.footer", v.footer),
+                          ("Embed.author", v.author),
+                          ("Embed.url", v.url)]
+                for f in v.fields:
+                    fields.append(("Embed.field.name", f.name))
+                    fields.append(("Embed.field.value", f.value))
+                for name, text in fields:
+                    if secret := Secret.find(text):
+                        Logger.warning(unsafeprompt(name, secret, text))
+                        return False
         return True
 
     def as_sendable(self, msg: MessageSession = None, embed: bool = True) -> list:
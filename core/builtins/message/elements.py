@@ -1,22 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import mimetypes
 import os
-import random
 import re
 from datetime import datetime, UTC
+from io import BytesIO
 from typing import Optional, TYPE_CHECKING, Dict, Any, Union, List
 from urllib import parse
 
-import httpx
+import numpy as np
 from PIL import Image as PILImage
-from attrs import define
+from attrs import define, field
+from cattrs import global_converter
+from cattrs.gen import make_dict_unstructure_fn, override
 from filetype import filetype
 from tenacity import retry, stop_after_attempt
 
 from core.constants.info import Info
 from core.utils.cache import random_cache_path
+from core.utils.http import get_client
 
 from copy import deepcopy
 
@@ -184,88 +188,162 @@ class ImageElement(MessageElement):
     """
     图片消息。
 
-    :param path: 图片路径。
+    :param path: 图片路径，图片仅存在于内存中时为空。
     """
 
     path: str
     need_get: bool = False
     headers: Optional[Dict[str, Any]] = None
+    _payload: Optional[bytes] = field(default=None, eq=False, repr=False)
+    _base64: Optional[str] = field(default=None, eq=False, repr=False)
+    _mime: Optional[str] = field(default=None, eq=False, repr=False)
 
     @classmethod
     def assign(
-        cls, path: Union[str, PILImage.Image], headers: Optional[Dict[str, Any]] = None
+        cls,
+        path: Union[str, PILImage.Image, bytes, bytearray, memoryview],
+        headers: Optional[Dict[str, Any]] = None
     ):
         """
-        :param path: 图片路径。
+        :param path: 图片路径、PIL图片、base64数据或图片的二进制数据。
         :param headers: 获取图片时的请求头。
         """
         need_get = False
+        payload = None
+        mime = None
         if isinstance(path, PILImage.Image):
-            save = f"{random_cache_path()}.png"
-            path.convert("RGBA").save(save)
-            path = save
+            buf = BytesIO()
+            path.convert("RGBA").save(buf, format="PNG")
+            payload = buf.getvalue()
+            mime = "image/png"
+            path = ""
+        elif isinstance(path, (bytes, bytearray, memoryview)):
+            payload = bytes(path)
+            path = ""
         elif re.match("^https?://.*", path):
             need_get = True
         elif "base64" in path:
             _, encoded_img = path.split(",", 1)
-            img_data = base64.b64decode(encoded_img)
+            payload = base64.b64decode(encoded_img)
+            path = ""
+        return deepcopy(cls(path, need_get, headers, payload=payload, mime=mime))
 
-            save = f"{random_cache_path()}.png"
-            with open(save, "wb") as img_file:
-                img_file.write(img_data)
-            path = save
-        return deepcopy(cls(path, need_get, headers))
+    def materialize(self) -> "ImageElement":
+        """
+        将内存中的图片写入缓存文件，使图片可以通过路径访问。
+        """
+        if self._payload is not None and (self.need_get or not self.path):
+            path = f"{random_cache_path()}{mimetypes.guess_extension(self._detect_mime()) or ".png"}"
+            with open(path, "wb") as f:
+                f.write(self._payload)
+            self.path = path
+            self.need_get = False
+        return self
+
+    async def get(self) -> str:
+        """
+        获取图片路径，内存中的图片会在首次调用时写入缓存文件。
+        """
+        if self.need_get or not self.path:
+            await self.get_bytes()
+        return os.path.abspath(self.materialize().path)
 
-    async def get(self):
+    async def get_bytes(self) -> bytes:
         """
-        获取图片。
+        获取图片的二进制数据，读取后保存在内存中。
         """
-        if self.need_get:
-            return os.path.abspath(await self.get_image())
-        return os.path.abspath(self.path)
+        if self._payload is None:
+            if self.need_get:
+                self._payload = await self.get_image()
+            else:
+                with open(self.path, "rb") as f:
+                    self._payload = f.read()
+        return self._payload
 
     @retry(stop=stop_after_attempt(3))
-    async def get_image(self):
+    async def get_image(self) -> bytes:
         """
         从网络下载图片。
         """
         url = self.path
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, timeout=20.0)
-            raw = resp.content
-            ft = filetype.match(raw).extension
-            img_path = f"{random_cache_path()}.{ft}"
-            with open(img_path, "wb+") as image_cache:
-                image_cache.write(raw)
-            return img_path
+        resp = await get_client(use_proxy=False, verify=True).get(url, headers=self.headers, timeout=20.0)
+        return resp.content
+
+    def _detect_mime(self) -> str:
+        if not self._mime:
+            kind = filetype.match(self._payload) if self._payload is not None else None
+            if kind:
+                self._mime = kind.mime
+            else:
+                self._mime = mimetypes.guess_type(self.path)[0] or "application/octet-stream"
+        return self._mime
 
-    async def get_base64(self, mime: bool = False):
-        file = await self.get()
+    async def get_mime(self) -> str:
+        """
+        获取图片的MIME类型。
+        """
+        await self.get_bytes()
+        return self._detect_mime()
 
-        with open(file, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode("UTF-8")
+    async def get_filename(self) -> str:
+        """
+        获取上传图片时使用的文件名。
+        """
+        if self.path and not self.need_get:
+            return os.path.basename(self.path)
+        return f"image{mimetypes.guess_extension(await self.get_mime()) or ".png"}"
+
+    async def get_base64(self, mime: bool = False) -> str:
+        """
+        获取图片的base64编码，编码结果会被缓存。
 
+        :param mime: 是否返回带MIME类型的data URI。
+        """
+        if self._base64 is None:
+            self._base64 = base64.b64encode(await self.get_bytes()).decode("UTF-8")
         if mime:
-            mime_type, _ = mimetypes.guess_type(file)
-            if not mime_type:
-                mime_type = 'application/octet-stream'
-            return f"data:{mime_type};base64,{img_b64}"
-        return img_b64
+            return f"data:{await self.get_mime()};base64,{self._base64}"
+        return self._base64
 
     async def add_random_noise(self) -> "ImageElement":
-        image = PILImage.open(await self.get())
-        image = image.convert("RGBA")
-
-        noise_image = PILImage.new("RGBA", (50, 50))
-        for i in range(50):
-            for j in range(50):
-                noise_image.putpixel((i, j), (i, j, i, random.randint(0, 1)))
+        """
+        在图片左上角叠加随机噪点，生成内容不同的新图片。
+        """
+        return (await self.add_random_noise_variants(1))[0]
 
-        image.alpha_composite(noise_image)
+    async def add_random_noise_variants(self, count: int) -> List["ImageElement"]:
+        """
+        生成多张叠加了不同随机噪点的图片，原图只解码一次，且在线程中完成编码。
 
-        save = f"{random_cache_path()}.png"
-        image.save(save)
-        return ImageElement.assign(save)
+        :param count: 生成的图片数量。
+        """
+        payloads = await asyncio.to_thread(_make_noise_variants, await self.get_bytes(), count)
+        return [ImageElement.assign(payload) for payload in payloads]
+
+
+def _make_noise_variants(data: bytes, count: int, size: int = 50) -> List[bytes]:
+    image = PILImage.open(BytesIO(data)).convert("RGBA")
+    rng = np.random.default_rng()
+    xs, ys = np.meshgrid(np.arange(size, dtype=np.uint8), np.arange(size, dtype=np.uint8))
+    noise = np.stack([xs, ys, xs, np.zeros_like(xs)], axis=-1)
+
+    variants = []
+    for _ in range(count):
+        noise[..., 3] = rng.integers(0, 2, size=(size, size), dtype=np.uint8)
+        variant = image.copy()
+        variant.alpha_composite(PILImage.fromarray(noise, "RGBA"))
+        buf = BytesIO()
+        variant.save(buf, format="PNG")
+        variants.append(buf.getvalue())
+    return variants
+
+
+# 内存中的图片数据不参与序列化，序列化前先写入缓存文件
+_unstructure_image = make_dict_unstructure_fn(ImageElement, global_converter,
+                                              _payload=override(omit=True),
+                                              _base64=override(omit=True),
+                                              _mime=override(omit=True))
+global_converter.register_unstructure_hook(ImageElement, lambda x: _unstructure_image(x.materialize()))
 
 
 @define
@@ -1,6 +1,7 @@
 import datetime
 import os
 import re
+import threading
 from time import sleep
 from typing import Optional, Union, Any
 
@@ -30,6 +31,9 @@ class CFGManager:
     _load_lock = False
     _save_lock = False
     _watch_lock = False
+    _cache: dict[tuple, Any] = {}
+    _modified = False
+    _watcher: Optional[threading.Thread] = None
 
     @classmethod
     def wait(cls, _lock):
@@ -55,6 +59,8 @@ class CFGManager:
                     cls._tss[cfg_name] = os.path.getmtime(os.path.join(cls.config_path, cfg))
             except Exception as e:
                 raise ConfigValueError(e)
+            cls._cache.clear()
+            cls._modified = False
             cls._load_lock = False
 
     @classmethod
@@ -70,27 +76,55 @@ class CFGManager:
                         f.write(toml_dumps(cls.values[cfg], sort_keys=True))
             except Exception as e:
                 raise ConfigValueError(e)
+            cls._cache.clear()
             cls._save_lock = False
         else:
             cls.wait(cls._save_lock)
             cls.save()
 
+    @classmethod
+    def is_modified(cls) -> bool:  # Check whether any config file has been modified since last load
+        for cfg, ts in list(cls._tss.items()):
+            cfg_file = cfg
+            if not cfg_file.endswith(".toml"):
+                cfg_file += ".toml"
+            file_path = os.path.join(cls.config_path, cfg_file)
+            if os.path.exists(file_path):
+                if os.path.getmtime(file_path) != ts:
+                    return True
+        return False
+
     @classmethod
     def watch(cls):  # Watch for changes in the config file and reload if necessary
         if not cls._watch_lock:
             cls._watch_lock = True
-            for cfg in cls.values:
-                cfg_file = cfg
-                if not cfg_file.endswith(".toml"):
-                    cfg_file += ".toml"
-                file_path = os.path.join(cls.config_path, cfg_file)
-                if os.path.exists(file_path):
-                    if os.path.getmtime(file_path) != cls._tss[cfg]:
-                        logger.warning("[Config] Config file has been modified, reloading...")
-                        cls.load()
-                        break
+            if cls._modified or cls.is_modified():
+                logger.warning("[Config] Config file has been modified, reloading...")
+                cls.load()
             cls._watch_lock = False
 
+    @classmethod
+    def start_watcher(cls, interval: float = 1):
+        """
+        启动后台线程定期检查配置文件是否被修改，被修改的配置文件将在下一次读取配置时重新加载。
+
+        :param interval: 检查间隔（秒）。
+        """
+        if cls._watcher and cls._watcher.is_alive():
+            return
+
+        def _watch():
+            while True:
+                sleep(interval)
+                try:
+                    if not cls._modified and cls.is_modified():
+                        cls._modified = True
+                except OSError:
+                    pass
+
+        cls._watcher = threading.Thread(target=_watch, name="ConfigWatcher", daemon=True)
+        cls._watcher.start()
+
     @classmethod
     def get(cls,
             q: str,
@@ -111,8 +145,28 @@ class CFGManager:
 
         :return: 配置文件中对应配置项的值。
         """
-        cls.watch()
+        if cls._watcher and cls._watcher.is_alive():
+            if cls._modified:
+                cls.watch()
+        else:
+            cls.watch()
         q = q.lower()
+        key = (q, cfg_type, type(default), secret, table_name, _global, _generate)
+        if key in cls._cache:
+            return cls._cache[key]
+        value = cls._get(q, default, cfg_type, secret, table_name, _global, _generate)
+        cls._cache[key] = value
+        return value
+
+    @classmethod
+    def _get(cls,
+             q: str,
+             default: Union[Any, None] = None,
+             cfg_type: Union[type, tuple, None] = None,
+             secret: bool = False,
+             table_name: Optional[str] = None,
+             _global: bool = False,
+             _generate: bool = False) -> Any:
         value = None
 
         if not table_name:
@@ -358,6 +412,7 @@ class CFGManager:
                     cls.values[cfg_name][target].value.item(q).comment(localed_comment)
 
         if _generate:
+            cls._cache.clear()
             return
 
         cls.save()
@@ -403,6 +458,9 @@ class CFGManager:
 
 
 CFGManager.load()
+CFGManager.start_watcher()
+if hasattr(os, "register_at_fork"):  # threads are not inherited by forked bot processes
+    os.register_at_fork(after_in_child=CFGManager.start_watcher)
 
 
 def Config(q: str,
@@ -1,11 +1,38 @@
+import re
+from typing import Optional
+
+
 class Secret:
     list = []
     ip_address = None
     ip_country = None
+    _pattern: Optional[re.Pattern] = None
 
     @classmethod
     def add(cls, secret):
         cls.list.append(secret)
+        cls._compile()
+
+    @classmethod
+    def _compile(cls):
+        secrets = dict.fromkeys(str(s).upper() for s in cls.list if s not in ["", None, True, False])
+        if secrets:
+            cls._pattern = re.compile("|".join(re.escape(s) for s in sorted(secrets, key=len, reverse=True)))
+        else:
+            cls._pattern = None
+
+    @classmethod
+    def find(cls, text: str) -> Optional[str]:
+        """
+        查找文本中包含的密钥（不区分大小写）。
+
+        :param text: 待检查的文本。
+        :return: 找到的密钥，若不包含则返回 None。
+        """
+        if not cls._pattern or not text:
+            return None
+        match = cls._pattern.search(text.upper())
+        return match.group(0) if match else None
 
 
 class Info:
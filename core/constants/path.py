@@ -16,6 +16,9 @@ webui_path = os.path.abspath("./webui")
 fonts_path = os.path.join(assets_path, "fonts")
 templates_path = os.path.join(assets_path, "templates")
 
+# cache 子路径，不会被每日清理
+render_cache_path = os.path.join(cache_path, "render")
+
 # 字体文件路径
 noto_sans_bold_path = os.path.join(fonts_path, "Noto Sans CJK Bold.otf")
 noto_sans_demilight_path = os.path.join(fonts_path, "Noto Sans CJK DemiLight.otf")
@@ -1,2 +1,2 @@
 config_version = 1
-database_version = 2
+database_version = 4
@@ -1,21 +1,94 @@
-from typing import TYPE_CHECKING, Optional, Union, Self
+from typing import TYPE_CHECKING, Any, Optional, Union, Self
 
+from tortoise.expressions import F
 from tortoise.models import Model
 
 from core.exports import exports
+from core.utils.cache import TTLCache
 
 if TYPE_CHECKING:
     from core.builtins import Bot
 
 
+_cached_models: dict[str, type["DBModel"]] = {}
+
+
 class DBModel(Model):
     """
     Base model for all database models.
+
+    Subclasses may set ``_instance_cache`` to a :class:`TTLCache` to keep instances fetched by
+    ``get_by_target_id``/``get_by_sender_id`` in memory. Saving or deleting a cached instance
+    updates the local cache and invalidates other bot processes through the job queue.
     """
+    _instance_cache: Optional[TTLCache] = None
 
     class Meta:
         abstract = True
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get("_instance_cache") is not None:
+            _cached_models[cls.__name__] = cls
+
+    async def save(self, *args, **kwargs) -> None:
+        created = not self._saved_in_db
+        await super().save(*args, **kwargs)
+        if self._instance_cache is not None:
+            self._instance_cache.set(self.pk, self)
+            if not created:
+                await self._invalidate_others()
+
+    async def delete(self, *args, **kwargs) -> None:
+        await super().delete(*args, **kwargs)
+        if self._instance_cache is not None:
+            self._instance_cache.pop(self.pk)
+            await self._invalidate_others()
+
+    async def _increment(self, field: str, amount: Any) -> None:
+        """
+        Atomically add amount to a numeric field in the database, then reload the field so that
+        concurrent updates from other bot processes are not overwritten by a stale cached instance.
+
+        :param field: The field name to update.
+        :param amount: The amount to add, can be negative.
+        """
+        await self.__class__.filter(pk=self.pk).update(**{field: F(field) + amount})
+        await self.refresh_from_db(fields=[field])
+        if self._instance_cache is not None:
+            self._instance_cache.set(self.pk, self)
+            await self._invalidate_others()
+
+    async def _invalidate_others(self):
+        if job_queue := exports.get("JobQueue"):
+            await job_queue.invalidate_cache(self.__class__.__name__, str(self.pk))
+
+    @classmethod
+    def invalidate_cache(cls, pk: Any = None):
+        """
+        Drop cached instances of this model.
+
+        :param pk: The primary key to drop. If None, the whole cache will be cleared.
+        """
+        if cls._instance_cache is not None:
+            if pk is None:
+                cls._instance_cache.clear()
+            else:
+                cls._instance_cache.pop(pk)
+
+    @classmethod
+    async def _get_cached(cls, create: bool, **kwargs) -> Optional[Self]:
+        pk = next(iter(kwargs.values()))
+        if cls._instance_cache is not None and (cached := cls._instance_cache.get(pk)) is not None:
+            return cached
+        if create:
+            obj = (await cls.get_or_create(**kwargs))[0]
+        else:
+            obj = await cls.get_or_none(**kwargs)
+        if obj and cls._instance_cache is not None:
+            cls._instance_cache.set(pk, obj)
+        return obj
+
     @classmethod
     async def get_by_target_id(cls,
                                target_id: Union["Bot.MessageSession", "Bot.FetchedSession", str],
@@ -39,9 +112,7 @@ class DBModel(Model):
         if not t:
             raise ValueError(
                 "target_id must be a str or a MessageSession/FetchedSession instance, or exports are unavailable.")
-        if create:
-            return (await cls.get_or_create(target_id=t))[0]
-        return await cls.get_or_none(target_id=t)
+        return await cls._get_cached(create, target_id=t)
 
     @classmethod
     async def get_by_sender_id(cls,
@@ -65,6 +136,11 @@ class DBModel(Model):
         if not t:
             raise ValueError(
                 "sender_id must be a str or a MessageSession/FetchedSession instance, or exports are unavailable.")
-        if create:
-            return (await cls.get_or_create(sender_id=t))[0]
-        return await cls.get_or_none(sender_id=t)
+        return await cls._get_cached(create, sender_id=t)
+
+
+def get_cached_model(name: str) -> Optional[type[DBModel]]:
+    """
+    Get a model class with in-memory cache enabled by its name.
+    """
+    return _cached_models.get(name)
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import uuid
 from collections import Counter
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 from decimal import Decimal
 from typing import Any, List, Optional, Union
 
 from tortoise import fields
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F
+from tortoise.functions import Sum
 
 from core.constants import default_locale
+from core.utils.cache import TTLCache
 from core.utils.list import convert2lst
 from .base import DBModel
 
@@ -34,6 +38,8 @@ class SenderInfo(DBModel):
     petal = fields.IntField(default=0)
     sender_data = fields.JSONField(default={})
 
+    _instance_cache = TTLCache(maxsize=10000, ttl=300)
+
     class Meta:
         table = "sender_info"
 
@@ -60,8 +66,7 @@ class SenderInfo(DBModel):
 
         :param amount: 警告用户次数。
         """
-        self.warns = self.warns + amount
-        await self.save()
+        await self._increment("warns", amount)
         return True
 
     async def modify_petal(self, amount: Union[str, int, Decimal]) -> bool:
@@ -70,9 +75,7 @@ class SenderInfo(DBModel):
 
         :param amount: 要添加或减少的花瓣数量。
         """
-        petal = self.petal + int(amount)
-        self.petal = petal
-        await self.save()
+        await self._increment("petal", int(amount))
         return True
 
     async def clear_petal(self) -> bool:
@@ -127,6 +130,8 @@ class TargetInfo(DBModel):
     banned_users = fields.JSONField(default=[])
     target_data = fields.JSONField(default={})
 
+    _instance_cache = TTLCache(maxsize=10000, ttl=300)
+
     class Meta:
         table = "target_info"
 
@@ -262,6 +267,12 @@ class AnalyticsData(DBModel):
     class Meta:
         table = "analytics_data"
 
+    async def save(self, *args, **kwargs) -> None:
+        created = not self._saved_in_db
+        await super().save(*args, **kwargs)
+        if created:
+            await AnalyticsRollup.bump(self.timestamp, self.module_name, self.module_type, self.target_id)
+
     @classmethod
     async def get_data_by_times(cls, new, old, module_name=None):
         query = cls.filter(timestamp__gte=old, timestamp__lte=new)
@@ -285,9 +296,124 @@ class AnalyticsData(DBModel):
 
     @classmethod
     async def get_modules_count(cls):
-        analytics = await cls.all().values("module_name")
-        module_counter = Counter([entry["module_name"] for entry in analytics])
-        return dict(module_counter)
+        return await AnalyticsRollup.get_grouped_count("module_name")
+
+
+def _to_bucket(time: datetime) -> datetime:
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=UTC)
+    return time.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+class AnalyticsRollup(DBModel):
+    """
+    按小时汇总的统计数据，在写入统计数据时增量更新。
+
+    :param bucket: 所在小时的起始时间（UTC）。
+    :param module_name: 模块名称。
+    :param module_type: 模块类型。
+    :param target_prefix: 会话 ID 的平台前缀。
+    :param counts: 该小时内的记录数。
+    """
+    id = fields.IntField(pk=True)
+    bucket = fields.DatetimeField()
+    module_name = fields.CharField(max_length=128)
+    module_type = fields.CharField(max_length=128)
+    target_prefix = fields.CharField(max_length=128)
+    counts = fields.IntField(default=0)
+
+    class Meta:
+        table = "analytics_rollup"
+        unique_together = (("bucket", "module_name", "module_type", "target_prefix"),)
+        indexes = (("module_name", "bucket"),)
+
+    @staticmethod
+    def make_key(time: datetime, module_name: str, module_type: str, target_id: str) -> dict:
+        return {"bucket": _to_bucket(time),
+                "module_name": module_name[:128],
+                "module_type": module_type[:128],
+                "target_prefix": target_id.split("|")[0][:128]}
+
+    @classmethod
+    async def bump(cls, time: datetime, module_name: str, module_type: str, target_id: str, amount: int = 1):
+        """
+        增加对应小时的记录数。
+
+        :param time: 记录时间。
+        :param module_name: 模块名称。
+        :param module_type: 模块类型。
+        :param target_id: 会话 ID。
+        :param amount: 增加的数量。
+        """
+        key = cls.make_key(time, module_name, module_type, target_id)
+        if not await cls.filter(**key).update(counts=F("counts") + amount):
+            try:
+                await cls.create(**key, counts=amount)
+            except IntegrityError:  # 其他进程已创建该行
+                await cls.filter(**key).update(counts=F("counts") + amount)
+
+    @classmethod
+    async def rebuild(cls, batch_size: int = 10000):
+        """
+        根据统计数据重新生成汇总表。
+        """
+        await cls.all().delete()
+        counter = Counter()
+        last_id = 0
+        while True:
+            rows = await AnalyticsData.filter(id__gt=last_id).order_by("id").limit(batch_size).values(
+                "id", "module_name", "module_type", "target_id", "timestamp")
+            if not rows:
+                break
+            for row in rows:
+                key = cls.make_key(row["timestamp"], row["module_name"], row["module_type"], row["target_id"])
+                counter[tuple(key.values())] += 1
+            last_id = rows[-1]["id"]
+        await cls.bulk_create([cls(bucket=bucket,
+                                   module_name=module_name,
+                                   module_type=module_type,
+                                   target_prefix=target_prefix,
+                                   counts=counts)
+                               for (bucket, module_name, module_type, target_prefix), counts in counter.items()],
+                              batch_size=1000)
+
+    @classmethod
+    def _filter_by_times(cls, new: Optional[datetime] = None, old: Optional[datetime] = None, module_name=None):
+        query = cls.all()
+        if old is not None:
+            query = query.filter(bucket__gte=_to_bucket(old))
+        if new is not None:
+            query = query.filter(bucket__lt=new if new.tzinfo else new.replace(tzinfo=UTC))
+        if module_name is not None:
+            query = query.filter(module_name=module_name)
+        return query
+
+    @classmethod
+    async def get_count_by_times(cls, new=None, old=None, module_name=None) -> int:
+        """
+        获取时间范围内的记录总数。
+
+        :param new: 结束时间，留空则不限制。
+        :param old: 起始时间，留空则不限制。
+        :param module_name: 模块名称，留空则统计所有模块。
+        """
+        result = await cls._filter_by_times(new, old, module_name).annotate(total=Sum("counts")).values("total")
+        return (result[0]["total"] or 0) if result else 0
+
+    @classmethod
+    async def get_grouped_count(cls, group_by: str, new=None, old=None, module_name=None) -> dict:
+        """
+        获取时间范围内按字段分组的记录数。
+
+        :param group_by: 分组字段，可为 bucket、module_name、module_type 或 target_prefix。
+        :param new: 结束时间，留空则不限制。
+        :param old: 起始时间，留空则不限制。
+        :param module_name: 模块名称，留空则统计所有模块。
+        :return: 分组字段值与记录数的字典。
+        """
+        rows = await cls._filter_by_times(new, old, module_name).annotate(
+            total=Sum("counts")).group_by(group_by).values(group_by, "total")
+        return {row[group_by]: row["total"] for row in rows}
 
 
 class DBVersion(DBModel):
@@ -376,6 +502,7 @@ class JobQueuesTable(DBModel):
 
     class Meta:
         table = "job_queues"
+        indexes = (("target_client", "status"), ("timestamp",))
 
     @classmethod
     async def add_task(cls, target_client: str, action: str, args: dict) -> str:
@@ -396,13 +523,7 @@ class JobQueuesTable(DBModel):
 
     @classmethod
     async def clear_task(cls, time=43200) -> bool:
-        now_timestamp = datetime.now().timestamp()
-
-        queries = await cls.all()
-        for q in queries:
-            if now_timestamp - q.timestamp.timestamp() > time:
-                await q.delete()
-
+        await cls.filter(timestamp__lt=datetime.now(UTC) - timedelta(seconds=time)).delete()
         return True
 
     @classmethod
@@ -412,11 +533,80 @@ class JobQueuesTable(DBModel):
         ).first()
 
     @classmethod
-    async def get_all(cls, target_client: str):
+    async def get_all(cls, target_client: Union[str, list[str], tuple[str]]):
         return await cls.filter(
-            target_client=target_client, status="pending"
+            target_client__in=convert2lst(target_client), status="pending"
+        ).all()
+
+    @classmethod
+    async def get_finished(cls, task_ids: Union[list[str], tuple[str]]):
+        """
+        批量获取已完成的任务。
+
+        :param task_ids: 任务 ID 列表。
+        :return: 已完成的任务列表。
+        """
+        if not task_ids:
+            return []
+        return await cls.filter(task_id__in=task_ids, status="done").all()
+
+
+class BroadcastProgress(DBModel):
+    """
+    消息推送进度。
+
+    :param job_id: 推送任务 ID。
+    :param client_name: 客户端名称。
+    :param module_name: 模块名称。
+    :param message: 序列化后的消息链。
+    :param targets: 指定的推送对象，为空时推送至所有开启模块的对象。
+    :param processed: 已处理的对象。
+    :param status: 任务状态。
+    :param total: 需要推送的对象数。
+    :param succeeded: 发送成功的对象数。
+    :param failed: 发送失败的对象数。
+    :param skipped: 跳过的对象数。
+    :param timestamp: 任务开始时间。
+    :param updated_at: 进度更新时间。
+    """
+    job_id = fields.CharField(max_length=64, pk=True)
+    client_name = fields.CharField(max_length=512)
+    module_name = fields.CharField(max_length=512, null=True)
+    message = fields.JSONField(null=True)
+    targets = fields.JSONField(null=True)
+    processed = fields.JSONField(default=[])
+    status = fields.CharField(max_length=32, default="running")
+    total = fields.IntField(default=0)
+    succeeded = fields.IntField(default=0)
+    failed = fields.IntField(default=0)
+    skipped = fields.IntField(default=0)
+    timestamp = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "broadcast_progress"
+        indexes = (("client_name", "status"),)
+
+    @classmethod
+    async def get_unfinished(cls, client_name: str, time: int = 86400):
+        """
+        获取未完成的推送任务。
+
+        :param client_name: 客户端名称。
+        :param time: 只返回在此时间（秒）内更新过的任务。
+        :return: 未完成的推送任务列表。
+        """
+        return await cls.filter(
+            client_name=client_name,
+            status="running",
+            updated_at__gt=datetime.now(UTC) - timedelta(seconds=time)
         ).all()
 
+    @classmethod
+    async def clear_task(cls, time: int = 604800) -> bool:
+        await cls.filter(updated_at__lt=datetime.now(UTC) - timedelta(seconds=time)).delete()
+        return True
+
 
 class MaliciousLoginRecords(DBModel):
     """
@@ -2,7 +2,7 @@ from tortoise import Tortoise, connections
 
 from core.database import fetch_module_db
 from core.database.link import db_type, get_db_link
-from core.database.models import DBVersion
+from core.database.models import AnalyticsRollup, DBVersion
 
 database_list = fetch_module_db()
 
@@ -81,9 +81,29 @@ async def update_database():
             await query_dbver.delete()
             await DBVersion.create(version=2)
         if db_version < 3:
+            query_dbver = await DBVersion.first()
+
+            if db_type not in ("sqlite", "postgres"):
+                # sqlite and postgres indexes are created by generate_schemas(safe=True) above
+                await conn.execute_script("""
+                    CREATE INDEX idx_job_queues_target_client_status ON job_queues (target_client, status);
+                    CREATE INDEX idx_job_queues_timestamp ON job_queues (timestamp);
+                """)
+
+            await query_dbver.delete()
+            await DBVersion.create(version=3)
+        if db_version < 4:
+            query_dbver = await DBVersion.first()
+
+            # analytics_rollup is created by generate_schemas(safe=True) above
+            await AnalyticsRollup.rebuild()
+
+            await query_dbver.delete()
+            await DBVersion.create(version=4)
+        if db_version < 5:
             # query_dbver = await DBVersion.first()
             ...
             # await query_dbver.delete()
-            # await DBVersion.create(version=3)
+            # await DBVersion.create(version=5)
 
     await Tortoise.close_connections()
@@ -10,7 +10,6 @@ import hmac
 import time
 from typing import Union, List, Dict
 
-import httpx
 import orjson as json
 from tenacity import retry, wait_fixed, stop_after_attempt
 
@@ -18,6 +17,7 @@ from core.builtins import Bot
 from core.config import Config
 from core.database.local import DirtyWordCache
 from core.logger import Logger
+from core.utils.http import get_client
 
 
 def hash_hmac(key, code):
@@ -132,18 +132,17 @@ async def check(*text: Union[str, List[str]], additional_text=None) -> List[Dict
         sign = f"acs {access_key_id}:{hash_hmac(access_key_secret, step3)}"
         headers["Authorization"] = sign
 
-        async with httpx.AsyncClient(headers=headers) as client:
-            resp = await client.post(f"{root}{url}", content=json.dumps(body))
-            if resp.status_code == 200:
-                result = json.loads(resp.content)
-                Logger.debug(result)
-                for item in result["data"]:
-                    content = item["content"]
-                    for n in call_api_list[content]:
-                        query_list[n][content] = parse_data(item, additional_text=additional_text)
-                    await DirtyWordCache.create(desc=content, result=item)
-            else:
-                raise ValueError(resp.text)
+        resp = await get_client(use_proxy=False, verify=True).post(f"{root}{url}", headers=headers, content=json.dumps(body))
+        if resp.status_code == 200:
+            result = json.loads(resp.content)
+            Logger.debug(result)
+            for item in result["data"]:
+                content = item["content"]
+                for n in call_api_list[content]:
+                    query_list[n][content] = parse_data(item, additional_text=additional_text)
+                await DirtyWordCache.create(desc=content, result=item)
+        else:
+            raise ValueError(resp.text)
 
     results = []
     Logger.debug(query_list)
@@ -5,7 +5,7 @@ import traceback
 import orjson as json
 
 from core.constants.path import schedulers_path
-from core.database.models import JobQueuesTable
+from core.database.models import BroadcastProgress, JobQueuesTable
 from core.logger import Logger
 from core.scheduler import Scheduler, IntervalTrigger
 from core.utils.info import Info
@@ -16,6 +16,7 @@ def load_extra_schedulers():
     async def clear_queue():
         Logger.info("Clearing job queue...")
         await JobQueuesTable.clear_task()
+        await BroadcastProgress.clear_task()
         Logger.info("Job queue cleared.")
 
     fun_file = None
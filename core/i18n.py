@@ -61,6 +61,12 @@ class LocaleNode:
 
 
 locale_root = LocaleNode()
+locale_tables: Dict[str, Dict[str, Any]] = {}
+_merged_tables: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Tuple[Any, Optional[Template]]]] = {}
+
+_i18n_split_pattern = re.compile(r"(\[I18N:.*?])")
+_i18n_match_pattern = re.compile(r"\[I18N:([^\s,\]]+)(?:,([^\]]+))?\]")
+_i18n_param_pattern = re.compile(r"(.*?)=(.*)")
 
 # From https://stackoverflow.com/a/6027615
 
@@ -111,12 +117,40 @@ def load_locale_file() -> List[str]:
     for lang in locale_dict:
         for k in locale_dict[lang].keys():
             locale_root.update_node(f"{lang}.{k}", locale_dict[lang][k])
+        locale_tables.setdefault(lang, {}).update(locale_dict[lang])
+
+    for (locale, fallback_lng), table in _merged_tables.items():
+        # 就地更新，已创建的 Locale 对象无需重新获取
+        merged = _build_merged_table(locale, fallback_lng)
+        table.clear()
+        table.update(merged)
 
     return err_prompt
 
 
+def _build_merged_table(locale: str, fallback_lng: Tuple[str, ...]) -> Dict[str, Tuple[Any, Optional[Template]]]:
+    """
+    按回退顺序合并本地化字符串，并预先构建含有占位符的字符串模板。
+
+    :param locale: 首选语言。
+    :param fallback_lng: 回退语言列表。
+    :returns: 键名到 (本地化字符串, 字符串模板) 的映射。
+    """
+    merged = {}
+    for lng in reversed((locale,) + fallback_lng):
+        merged.update(locale_tables.get(lng, {}))
+    return {k: (v, Template(v) if isinstance(v, str) and "$" in v else None) for k, v in merged.items()}
+
+
+def _get_merged_table(locale: str, fallback_lng: Tuple[str, ...]) -> Dict[str, Tuple[Any, Optional[Template]]]:
+    key = (locale, fallback_lng)
+    if key not in _merged_tables:
+        _merged_tables[key] = _build_merged_table(locale, fallback_lng)
+    return _merged_tables[key]
+
+
 def get_available_locales() -> List[str]:
-    return list(locale_root.children.keys())
+    return list(locale_tables.keys())
 
 
 class Locale:
@@ -131,12 +165,13 @@ class Locale:
         self.locale = locale
         self.data: LocaleNode = locale_root.query_node(locale)
         self.fallback_lng = fallback_lng
+        self._table = _get_merged_table(locale, tuple(fallback_lng))
 
     def __getitem__(self, key: str):
         return self.data.query_node(key)
 
     def __contains__(self, key: str):
-        return key in self.data
+        return key in locale_tables.get(self.locale, {})
 
     def get_locale_node(self, path: str):
         """获取本地化节点。"""
@@ -145,24 +180,15 @@ class Locale:
     def get_string_with_fallback(
         self, key: str, fallback_failed_prompt: bool = True
     ) -> str:
-        node = self.data.query_node(key)
-        if node:
-            return node.value  # 1. 如果本地化字符串存在，直接返回
-        fallback_lng = list(self.fallback_lng)
-        fallback_lng.insert(0, self.locale)
-        for lng in fallback_lng:
-            if lng in locale_root.children:
-                node = locale_root.query_node(lng).query_node(key)
-                if node:
-                    return (
-                        node.value
-                    )  # 2. 如果在 fallback 语言中本地化字符串存在，直接返回
+        entry = self._table.get(key)
+        if entry:
+            return entry[0]  # 1. 如果本地化字符串在本语言或 fallback 语言中存在，直接返回
         if fallback_failed_prompt:
             return f"{{{key}}}" + self.t(
                 "error.i18n.fallback", fallback_failed_prompt=False
             )
         return key
-        # 3. 如果在 fallback 语言中本地化字符串不存在，返回 key
+        # 2. 如果在 fallback 语言中本地化字符串不存在，返回 key
 
     def t(
         self, key: Union[str, dict], fallback_failed_prompt: bool = True, **kwargs: Any
@@ -180,6 +206,10 @@ class Locale:
             if "fallback" in key:
                 return key["fallback"]
             return str(key) + self.t("error.i18n.fallback", fallback=self.locale)
+        entry = self._table.get(key)
+        if entry:
+            localized, template = entry
+            return template.safe_substitute(**kwargs) if template else localized
         localized = self.get_string_with_fallback(key, fallback_failed_prompt)
         return Template(localized).safe_substitute(**kwargs)
 
@@ -193,13 +223,15 @@ class Locale:
         :param fallback_failed_prompt: 是否添加本地化失败提示。（默认为False）
         :returns: 本地化后的字符串。
         """
-        split_all = re.split(r"(\[I18N:.*?])", text)
+        if "[I18N:" not in text:
+            return text
+        split_all = _i18n_split_pattern.split(text)
         split_all = [x for x in split_all if x]
         msgs = []
         kwargs = {}
 
         for e in split_all:
-            match = re.match(r"\[I18N:([^\s,\]]+)(?:,([^\]]+))?\]", e)
+            match = _i18n_match_pattern.match(e)
             if not match:
                 msgs.append(e)
             else:
@@ -209,7 +241,7 @@ class Locale:
                     params = match.group(2).split(",")
                     params = [x for x in params if x]
                     for a in params:
-                        ma = re.match(r"(.*?)=(.*)", a)
+                        ma = _i18n_param_pattern.match(a)
                         if ma:
                             kwargs[html.unescape(ma.group(1))] = html.unescape(ma.group(2))
                 t_value = self.t(i18nkey, **kwargs)
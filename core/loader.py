@@ -3,7 +3,7 @@ import os
 import re
 import sys
 import traceback
-from typing import Dict, Optional, Union, Callable
+from typing import Dict, List, Optional, Tuple, Union, Callable
 
 from core.config import Config
 from core.constants.path import modules_path, PrivateAssets
@@ -18,6 +18,8 @@ from core.types.module.component_meta import (
 )
 from core.utils.info import Info
 from core.utils.loader import fetch_modules_list
+from core.utils.trie import PrefixTrie
+from core.utils.web_render import render_cache
 
 all_modules = []
 current_unloaded_modules = []
@@ -125,11 +127,22 @@ class ModulesManager:
                     )
                     cls.modules_hooks.update({hook_name: hook.function})
 
+    @classmethod
+    def refresh_dispatch(cls):
+        cls._module_trie_cache.clear()
+        cls._regex_dispatch_cache.clear()
+        cls._alias_trie = PrefixTrie(cls.modules_aliases)
+        cls._fallback_trie = PrefixTrie()
+        for priority, m in enumerate(current_unloaded_modules + err_modules):
+            if m:
+                cls._fallback_trie.add(m, priority, replace=False)
+
     @classmethod
     def refresh(cls):
         cls.refresh_modules_aliases()
         cls.refresh_modules_hooks()
         cls._return_cache.clear()
+        cls.refresh_dispatch()
 
     @classmethod
     def search_related_module(cls, module, include_self=True):
@@ -161,14 +174,87 @@ class ModulesManager:
         if bind_prefix in cls.modules:
             if isinstance(meta, CommandMeta):
                 cls.modules[bind_prefix].command_list.add(meta)
+                cls.modules[bind_prefix].parse_plans.clear()
             elif isinstance(meta, RegexMeta):
                 cls.modules[bind_prefix].regex_list.add(meta)
+                cls._regex_dispatch_cache.clear()
             elif isinstance(meta, ScheduleMeta):
                 cls.modules[bind_prefix].schedule_list.add(meta)
             elif isinstance(meta, HookMeta):
                 cls.modules[bind_prefix].hooks_list.add(meta)
 
     _return_cache = {}
+    _module_trie_cache: Dict[Optional[str], PrefixTrie] = {}
+    _alias_trie = PrefixTrie()
+    _fallback_trie = PrefixTrie()
+    _regex_dispatch_cache: Dict[Tuple[str, str], List[Tuple[str, Module, RegexMeta, re.Pattern]]] = {}
+
+    @classmethod
+    def match_module(cls, command: str, target_from: Optional[str] = None) -> Optional[str]:
+        """
+        获取命令所匹配的模块名（包括未加载与加载失败的模块）。
+
+        :param command: 去除前缀后的命令。
+        :param target_from: 会话来源。
+        :return: 匹配到的模块名，未匹配则返回 None。
+        """
+        if target_from not in cls._module_trie_cache:
+            cls._module_trie_cache[target_from] = PrefixTrie(cls.return_modules_list(target_from))
+        if matched := cls._module_trie_cache[target_from].shortest_prefix_of(command):
+            return matched
+        fallback = min(cls._fallback_trie.prefixes_of(command), key=lambda x: x[1], default=None)
+        return fallback[0] if fallback else None
+
+    @classmethod
+    def return_regex_dispatch(cls,
+                              target_from: str,
+                              client_name: str) -> List[Tuple[str, Module, RegexMeta, re.Pattern]]:
+        """
+        获取当前平台可用的正则表达式分派表，其中的表达式均已预编译。
+
+        :param target_from: 会话来源。
+        :param client_name: 客户端名称。
+        :return: (模块名, 模块, 正则元数据, 预编译的表达式) 的列表。
+        """
+        key = (target_from, client_name)
+        if key not in cls._regex_dispatch_cache:
+            table = []
+            for m, module in cls.return_modules_list(target_from).items():
+                if not module.regex_list.set or not module.load:
+                    continue
+                if target_from in module.exclude_from or client_name in module.exclude_from:
+                    continue
+                if "*" not in module.available_for and target_from not in module.available_for and \
+                        client_name not in module.available_for:
+                    continue
+                for rfunc in module.regex_list.set:
+                    try:
+                        pattern = rfunc.pattern if isinstance(rfunc.pattern, re.Pattern) else re.compile(
+                            rfunc.pattern, flags=rfunc.flags)
+                    except re.error:
+                        Logger.error(f"Failed to compile regex of module {m}: \n{traceback.format_exc()}")
+                        continue
+                    table.append((m, module, rfunc, pattern))
+            cls._regex_dispatch_cache[key] = table
+        return cls._regex_dispatch_cache[key]
+
+    @classmethod
+    def match_alias(cls, command: str, matched_module: Optional[str] = None) -> Optional[str]:
+        """
+        获取命令所匹配的最长模块别名。
+
+        :param command: 去除前缀后的命令。
+        :param matched_module: 命令已匹配的模块名，若存在则仅匹配以该模块名开头的别名。
+        :return: 匹配到的别名，未匹配则返回 None。
+        """
+        result = None
+        for alias, replacement in cls._alias_trie.prefixes_of(command):
+            if matched_module:
+                if alias.startswith(matched_module):
+                    result = alias
+            elif not command.startswith(replacement):
+                result = alias
+        return result
 
     @classmethod
     def return_modules_list(cls, target_from: Optional[str] = None) -> Dict[str, Module]:
@@ -206,6 +292,7 @@ class ModulesManager:
         unbind_modules = cls.search_related_module(module_name)
         cls.remove_modules(unbind_modules)
         cls.refresh()
+        render_cache.clear("help")
         return cls.reload_py_module(py_module)
 
     @classmethod
@@ -233,6 +320,7 @@ class ModulesManager:
                     err_modules.append(module_name)
                 return False
         cls.refresh()
+        render_cache.clear("help")
         return True
 
     @classmethod
@@ -243,6 +331,7 @@ class ModulesManager:
         unbind_modules = cls.search_related_module(module_name)
         cls.remove_modules(unbind_modules)
         cls.refresh()
+        render_cache.clear("help")
         current_unloaded_modules.append(module_name)
         return True
 
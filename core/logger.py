@@ -48,6 +48,7 @@ class LoggingLogger:
             self.log.warning("Debug mode is enabled.")
 
     def rename(self, name):
+        self.name = name
         self.log.remove()
         self.log.add(
             sys.stderr,
@@ -35,11 +35,25 @@ class Template:
     ):
         self.args_ = args
         self.priority = priority
+        self._compiled = None
 
     @property
     def args(self):
         return self.args_
 
+    @property
+    def compiled(self) -> "CompiledTemplate":
+        if self._compiled is None:
+            self.compile()
+        return self._compiled
+
+    def compile(self) -> "Template":
+        """
+        预先整理模板中用于快速排除不匹配参数的信息。
+        """
+        self._compiled = CompiledTemplate(self)
+        return self
+
     def __str__(self):
         return f"Template({self.args})"
 
@@ -59,6 +73,34 @@ class OptionalPattern:
         return self.__str__()
 
 
+class CompiledTemplate:
+    """
+    编译后的命令模板。
+
+    模板中的每个必选参数（字面量或变量）都需要消耗一个参数，字面量参数则必须出现在参数列表中，
+    因此参数数量不足或缺少字面量参数的模板必然无法匹配，可以在逐个尝试之前直接排除。
+
+    :param template: 命令模板。
+    """
+
+    def __init__(self, template: Template):
+        self.patterns = [x for x in template.args if not isinstance(x, DescPattern)]
+        required = [x.name for x in self.patterns if isinstance(x, ArgumentPattern) and x.name != "..."]
+        self.required_literals = frozenset(x for x in required if not x.startswith("<"))
+        self.min_argc = len(required)
+        # flagged optional arguments are parsed before anything else and may raise on their own,
+        # so templates whose flags are present are always walked to keep the result unchanged
+        self.flags_with_args = frozenset(x.flag for x in self.patterns
+                                         if isinstance(x, OptionalPattern) and x.flag and x.args)
+
+    def may_match(self, argv_set: set, argc: int) -> bool:
+        if not self.patterns:
+            return False
+        if self.flags_with_args & argv_set:
+            return True
+        return argc >= self.min_argc and self.required_literals <= argv_set
+
+
 class Argument:
     def __init__(self, value: str):
         self.value = value
@@ -162,7 +204,7 @@ def parse_template(argv: List[str]) -> List[Template]:
                 if strip_pattern.startswith("<") and not strip_pattern.endswith(">"):
                     raise InvalidTemplatePattern(p)
                 template.args.append(ArgumentPattern(strip_pattern))
-        templates.append(template)
+        templates.append(template.compile())
     return templates
 
 
@@ -211,15 +253,18 @@ def templates_to_str(
 
 def parse_argv(argv: List[str], templates: List["Template"]) -> MatchedResult:
     matched_result = []
+    argv_set = set(argv)
+    argc = len(argv)
     for template in templates:
+        compiled = template.compiled
+        if not compiled.may_match(argv_set, argc):  # reject templates that can never match without walking them
+            continue
         try:
             argv_copy = argv.copy()  # copy argv to avoid changing original argv
             parsed_argv = {}
             original_template = template
             afters = []
-            args = [x for x in template.args if not isinstance(x, DescPattern)]
-            if not args:
-                continue
+            args = compiled.patterns
             for a in args:  # optional first
                 if isinstance(a, OptionalPattern):
                     if not a.flag:
@@ -331,34 +376,14 @@ def parse_argv(argv: List[str], templates: List["Template"]) -> MatchedResult:
                     break
         if not filtered:
             filtered_result.append(m)
-    if (
-        len_filtered_result := len(filtered_result)
-    ) > 1:  # if multiple result, select one by priority
-        priority_result = {}
-        for f in filtered_result:
-            priority = f.priority  # base priority
-            for keys in f.args:  # add priority for each argument
-                if f.args[keys] is True:  # if argument is not any else
-                    priority += 1
-            if priority not in priority_result:
-                priority_result[priority] = [f]
-            else:
-                priority_result[priority].append(f)
-        max_ = max(priority_result.keys())
-        if len(priority_result[max_]) > 1:  # if still...
-            new_priority_result = {}
-            for p in priority_result[max_]:
-                new_priority = p.priority
-                for keys in p.args:
-                    if p.args[keys]:
-                        new_priority += 1
-                if new_priority not in new_priority_result:
-                    new_priority_result[new_priority] = [p]
-                else:
-                    new_priority_result[new_priority].append(p)
-            max_ = max(new_priority_result.keys())
-            return new_priority_result[max_][0]
-        return priority_result[max_][0]
-    if len_filtered_result == 0:
+    if not filtered_result:
         raise InvalidCommandFormatError
-    return filtered_result[0]
+    # if multiple result, select one by priority: base priority plus each argument that is exactly True,
+    # then (if still tied) base priority plus each truthy argument
+    return max(
+        filtered_result,
+        key=lambda f: (
+            f.priority + sum(1 for v in f.args.values() if v is True),
+            f.priority + sum(1 for v in f.args.values() if v),
+        ),
+    )
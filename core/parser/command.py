@@ -1,8 +1,10 @@
-import copy
 import re
 import shlex
 import traceback
-from typing import Dict, Optional, Union
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple, Union
+
+from attrs import define
 
 from core.builtins import base_superuser_list, MessageSession
 from core.config import Config
@@ -15,6 +17,59 @@ from .args import parse_argv, Template, templates_to_str, DescPattern
 default_locale = Config("default_locale", cfg_type=str)
 
 
+@define(frozen=True)
+class ParsePlan:
+    """
+    模块的命令解析计划，按会话来源与权限等级预先整理好命令模板，并缓存于模块上。
+
+    :param help_docs: 命令模板与其对应的命令元数据。
+    :param options_desc: 选项名称与其未本地化的描述。
+    :param templates: 用于匹配参数的命令模板。
+    """
+    help_docs: MappingProxyType
+    options_desc: Tuple[Tuple[str, str], ...]
+    templates: Tuple[Template, ...]
+
+
+def get_parse_plan(module: Module,
+                   target_from: Optional[str] = None,
+                   is_superuser: bool = False,
+                   is_base_superuser: bool = False) -> ParsePlan:
+    """
+    获取模块的命令解析计划，若不存在则生成并缓存。
+
+    :param module: 模块。
+    :param target_from: 会话来源，留空则包含模块的所有命令。
+    :param is_superuser: 是否包含需要超级用户权限的命令。
+    :param is_base_superuser: 是否包含需要基础超级用户权限的命令。
+    """
+    key = (target_from, is_superuser, is_base_superuser)
+    if plan := module.parse_plans.get(key):
+        return plan
+    help_docs = {}
+    options_desc = []
+    for match in (
+        module.command_list.set
+        if target_from is None
+        else module.command_list.get(
+            target_from,
+            show_required_superuser=is_superuser,
+            show_required_base_superuser=is_base_superuser,
+        )
+    ):
+        if match.help_doc:
+            for m in match.help_doc:
+                help_docs[m] = {"priority": match.priority, "meta": match}
+        else:
+            help_docs[""] = {"priority": match.priority, "meta": match}
+        if match.options_desc:
+            for m in match.options_desc:
+                options_desc.append((m, match.options_desc[m]))
+    plan = ParsePlan(MappingProxyType(help_docs), tuple(options_desc), tuple(t for t in help_docs if t != ""))
+    module.parse_plans[key] = plan
+    return plan
+
+
 class CommandParser:
     def __init__(
         self,
@@ -24,40 +79,26 @@ class CommandParser:
         msg: Optional[MessageSession] = None,
         is_superuser: Optional[bool] = None,
     ):
-        args = copy.deepcopy(args)
         self.command_prefixes = command_prefixes
         self.bind_prefix = bind_prefix
         self.origin_template = args
         self.msg: Union[MessageSession, None] = msg
-        self.options_desc = []
         self.lang = self.msg.locale if self.msg else Locale(default_locale)
-        help_docs = {}
         if is_superuser is None:
             is_superuser = self.msg.check_super_user() if self.msg else False
         is_base_superuser = (
             (self.msg.target.sender_id in base_superuser_list) if self.msg else False
         )
-        for match in (
-            args.command_list.set
-            if not self.msg
-            else args.command_list.get(
-                self.msg.target.target_from,
-                show_required_superuser=is_superuser,
-                show_required_base_superuser=is_base_superuser,
-            )
-        ):
-            if match.help_doc:
-                for m in match.help_doc:
-                    help_docs[m] = {"priority": match.priority, "meta": match}
-            else:
-                help_docs[""] = {"priority": match.priority, "meta": match}
-            if match.options_desc:
-                for m in match.options_desc:
-                    desc = self.lang.t_str(
-                        match.options_desc[m], fallback_failed_prompt=False
-                    )
-                    self.options_desc.append(f"{m} - {desc}")
-        self.args: Dict[Union[Template, ""], dict] = help_docs
+        self.plan = get_parse_plan(args,
+                                   self.msg.target.target_from if self.msg else None,
+                                   is_superuser,
+                                   is_base_superuser)
+        self.args: Dict[Union[Template, ""], dict] = self.plan.help_docs
+
+    @property
+    def options_desc(self):
+        return [f"{m} - {self.lang.t_str(desc, fallback_failed_prompt=False)}"
+                for m, desc in self.plan.options_desc]
 
     def return_formatted_help_doc(self) -> str:
         if not self.args:
@@ -104,9 +145,7 @@ class CommandParser:
                         if len(arg.args) == 1 and isinstance(arg.args[0], DescPattern):
                             return self.args[arg]["meta"], None
                     raise InvalidCommandFormatError
-                base_match = parse_argv(
-                    split_command[1:], [args for args in self.args if args != ""]
-                )
+                base_match = parse_argv(split_command[1:], self.plan.templates)
                 return (
                     self.args[base_match.original_template]["meta"],
                     base_match.args,
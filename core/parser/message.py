@@ -16,12 +16,12 @@ from core.constants.default import bug_report_url_default
 from core.constants.exceptions import AbuseWarning, FinishedException, InvalidCommandFormatError, \
     InvalidHelpDocTypeError, \
     WaitCancelException, NoReportException, SendMessageFailed
-from core.database.models import AnalyticsData
 from core.loader import ModulesManager, current_unloaded_modules, err_modules
 from core.logger import Logger
 from core.parser.command import CommandParser
 from core.tos import warn_target
 from core.types import Module, Param
+from core.utils.analytics import analytics_writer
 from core.utils.info import Info
 from core.utils.message import remove_duplicate_space
 
@@ -41,6 +41,7 @@ temp_ban_counter = {}  # 临时封禁计数
 cooldown_counter = {}  # 冷却计数
 
 match_hash_cache = {}
+prefixes_cache = {}
 
 
 async def check_temp_ban(target):
@@ -90,7 +91,7 @@ async def parser(msg: Bot.MessageSession,
         if in_prefix_list or disable_prefix:  # 检查消息前缀
             Logger.info(
                 f"{identify_str} -> [Bot]: {msg.trigger_msg}")
-            command_first_word = await _process_command(msg, modules, disable_prefix, in_prefix_list, display_prefix)
+            command_first_word = await _process_command(msg, disable_prefix, in_prefix_list, display_prefix)
 
             if msg.muted and command_first_word != "mute":
                 return
@@ -110,7 +111,7 @@ async def parser(msg: Bot.MessageSession,
                 if ExecutionLockList.check(msg):
                     return await msg.send_message(I18NContext("parser.command.running.prompt2"))
 
-        await _execute_regex(msg, modules, identify_str)
+        await _execute_regex(msg, identify_str)
         return msg
 
     except WaitCancelException:  # 出现于等待被取消的情况
@@ -156,12 +157,19 @@ def _transform_alias(msg, command: str):
     return command
 
 
+def _merge_prefixes(custom_prefix: tuple) -> tuple:
+    if custom_prefix not in prefixes_cache:
+        if len(prefixes_cache) > 4096:
+            prefixes_cache.clear()
+        # 混合自定义命令前缀与基础命令前缀，并过滤重复与空白前缀
+        prefixes_cache[custom_prefix] = tuple(i for i in dict.fromkeys(custom_prefix + tuple(command_prefix))
+                                              if i.strip())
+    return prefixes_cache[custom_prefix]
+
+
 def _get_prefixes(msg: Bot.MessageSession, prefix):
-    msg.prefixes = command_prefix.copy()  # 复制一份作为基础命令前缀
     get_custom_prefix = msg.target_data.get("command_prefix")  # 获取自定义命令前缀
-    if get_custom_prefix:
-        msg.prefixes = get_custom_prefix + msg.prefixes  # 混合
-    msg.prefixes = [i for i in set(msg.prefixes) if i.strip()]  # 过滤重复与空白前缀
+    msg.prefixes = list(_merge_prefixes(tuple(get_custom_prefix) if get_custom_prefix else ()))
 
     if msg.target_data.get("command_alias"):
         msg.trigger_msg = _transform_alias(msg, msg.trigger_msg)  # 将自定义别名替换为命令
@@ -189,7 +197,7 @@ def _get_prefixes(msg: Bot.MessageSession, prefix):
     return disable_prefix, in_prefix_list, display_prefix
 
 
-async def _process_command(msg: Bot.MessageSession, modules, disable_prefix, in_prefix_list, display_prefix):
+async def _process_command(msg: Bot.MessageSession, disable_prefix, in_prefix_list, display_prefix):
     if disable_prefix and not in_prefix_list:
         command = msg.trigger_msg
     else:
@@ -201,36 +209,10 @@ async def _process_command(msg: Bot.MessageSession, modules, disable_prefix, in_
     else:
         await msg.send_message(I18NContext("parser.command.running.prompt"))
 
-    not_alias = False
-    cm = ""
-    for moduleName in modules:
-        if command.startswith(moduleName):  # 判断此命令是否匹配一个实际的模块
-            not_alias = True
-            cm = moduleName
-            break
-    if not not_alias:
-        for um in current_unloaded_modules:
-            if command.startswith(um):
-                not_alias = True
-                cm = um
-                break
-    if not not_alias:
-        for em in err_modules:
-            if command.startswith(em):
-                not_alias = True
-                cm = em
-                break
-    alias_list = []
-    for alias in ModulesManager.modules_aliases:
-        if not not_alias:  # 如果没有匹配到模块，则判断是否匹配命令别名
-            if command.startswith(alias) and not command.startswith(ModulesManager.modules_aliases[alias]):
-                alias_list.append(alias)
-        else:  # 如果是模块，则判断是否有基于此模块前缀的别名
-            if alias.startswith(cm) and command.startswith(alias):
-                alias_list.append(alias)
-    if alias_list:
-        max_ = max(alias_list, key=len)
-        command = command.replace(max_, ModulesManager.modules_aliases[max_], 1)
+    # 判断此命令是否匹配一个实际的模块，若是则只匹配基于此模块前缀的别名，否则匹配命令别名
+    cm = ModulesManager.match_module(command, msg.target.target_from)
+    if alias := ModulesManager.match_alias(command, cm):
+        command = command.replace(alias, ModulesManager.modules_aliases[alias], 1)
 
     command_split: list = command.split(" ")  # 切割消息
     msg.trigger_msg = command  # 触发该命令的消息，去除消息前缀
@@ -316,11 +298,11 @@ async def _execute_module(msg: Bot.MessageSession, require_enable_modules, modul
                        f"Times take up: {str(time_used)}")
         Info.command_parsed += 1
         if enable_analytics:
-            await AnalyticsData.create(target_id=msg.target.target_id,
-                                       sender_id=msg.target.sender_id,
-                                       command=msg.trigger_msg,
-                                       module_name=command_first_word,
-                                       module_type="normal")
+            analytics_writer.record(target_id=msg.target.target_id,
+                                    sender_id=msg.target.sender_id,
+                                    command=msg.trigger_msg,
+                                    module_name=command_first_word,
+                                    module_type="normal")
 
     except AbuseWarning as e:
         await _process_tos_abuse_warning(msg, str(e))
@@ -334,11 +316,36 @@ async def _execute_module(msg: Bot.MessageSession, require_enable_modules, modul
         await _process_exception(msg, e)
 
 
-async def _execute_regex(msg: Bot.MessageSession, modules, identify_str):
-    for m in modules:  # 遍历模块
+async def _execute_regex(msg: Bot.MessageSession, identify_str):
+    enabled_modules = set(msg.enabled_modules)
+    trigger_msgs = {}
+    # 遍历当前平台可用的正则表达式，先匹配，命中后再进行权限检查
+    for m, regex_module, rfunc, pattern in ModulesManager.return_regex_dispatch(msg.target.target_from,
+                                                                                msg.target.client_name):
+        if m not in enabled_modules:  # 如果模块未启用
+            continue
         try:
-            if m in msg.enabled_modules and modules[m].regex_list.set:  # 如果模块已启用
-                regex_module: Module = modules[m]
+            time_start = datetime.now()
+            try:
+                matched = False
+                matched_hash = 0
+                if rfunc.text_only not in trigger_msgs:
+                    trigger_msgs[rfunc.text_only] = msg.as_display(text_only=rfunc.text_only)
+                trigger_msg = trigger_msgs[rfunc.text_only]
+                if rfunc.mode.upper() in ["M", "MATCH"]:
+                    msg.matched_msg = pattern.match(trigger_msg)
+                    if msg.matched_msg:
+                        matched = True
+                        matched_hash = hash(msg.matched_msg.groups())
+                elif rfunc.mode.upper() in ["A", "FINDALL"]:
+                    msg.matched_msg = pattern.findall(trigger_msg)
+                    msg.matched_msg = tuple(set(msg.matched_msg))
+                    if msg.matched_msg:
+                        matched = True
+                        matched_hash = hash(msg.matched_msg)
+
+                if not matched:
+                    continue
 
                 if regex_module.required_base_superuser:
                     if msg.target.sender_id not in base_superuser_list:
@@ -350,107 +357,74 @@ async def _execute_regex(msg: Bot.MessageSession, modules, identify_str):
                     if not await msg.check_permission():
                         continue
 
-                if not regex_module.load or \
-                    msg.target.target_from in regex_module.exclude_from or \
-                    msg.target.client_name in regex_module.exclude_from or \
-                    ("*" not in regex_module.available_for and
-                        msg.target.target_from not in regex_module.available_for and
-                        msg.target.client_name not in regex_module.available_for):
+                if rfunc.logging:
+                    Logger.info(
+                        f"{identify_str} -> [Bot]: {msg.trigger_msg}")
+                Logger.debug("Matched hash:" + str(matched_hash))
+                if msg.target.target_id not in match_hash_cache:
+                    match_hash_cache[msg.target.target_id] = {}
+                if rfunc.logging and matched_hash in match_hash_cache[msg.target.target_id] and \
+                        datetime.now().timestamp() - match_hash_cache[msg.target.target_id][
+                        matched_hash] < int((msg.target_data.get("cooldown_time", 0)) or 3):
+                    Logger.warning("Match loop detected, skipping...")
                     continue
+                match_hash_cache[msg.target.target_id][matched_hash] = datetime.now().timestamp()
 
-                for rfunc in regex_module.regex_list.set:  # 遍历正则模块的表达式
-                    time_start = datetime.now()
-                    try:
-                        matched = False
-                        matched_hash = 0
-                        trigger_msg = msg.as_display(text_only=rfunc.text_only)
-                        if rfunc.mode.upper() in ["M", "MATCH"]:
-                            msg.matched_msg = re.match(rfunc.pattern, trigger_msg, flags=rfunc.flags)
-                            if msg.matched_msg:
-                                matched = True
-                                matched_hash = hash(msg.matched_msg.groups())
-                        elif rfunc.mode.upper() in ["A", "FINDALL"]:
-                            msg.matched_msg = re.findall(rfunc.pattern, trigger_msg, flags=rfunc.flags)
-                            msg.matched_msg = tuple(set(msg.matched_msg))
-                            if msg.matched_msg:
-                                matched = True
-                                matched_hash = hash(msg.matched_msg)
-
-                        if matched and regex_module.load and not (
-                            msg.target.target_from in regex_module.exclude_from or
-                            msg.target.client_name in regex_module.exclude_from or
-                            ("*" not in regex_module.available_for and
-                                msg.target.target_from not in regex_module.available_for and
-                                msg.target.client_name not in regex_module.available_for)):  # 如果匹配成功
-
-                            if rfunc.logging:
-                                Logger.info(
-                                    f"{identify_str} -> [Bot]: {msg.trigger_msg}")
-                            Logger.debug("Matched hash:" + str(matched_hash))
-                            if msg.target.target_id not in match_hash_cache:
-                                match_hash_cache[msg.target.target_id] = {}
-                            if rfunc.logging and matched_hash in match_hash_cache[msg.target.target_id] and \
-                                    datetime.now().timestamp() - match_hash_cache[msg.target.target_id][
-                                    matched_hash] < int((msg.target_data.get("cooldown_time", 0)) or 3):
-                                Logger.warning("Match loop detected, skipping...")
-                                continue
-                            match_hash_cache[msg.target.target_id][matched_hash] = datetime.now().timestamp()
-
-                            if enable_tos and rfunc.show_typing:
-                                await _check_temp_ban(msg)
-                            if rfunc.show_typing:
-                                await _check_target_cooldown(msg)
-                            if rfunc.required_superuser:
-                                if not msg.check_super_user():
-                                    continue
-                            elif rfunc.required_admin:
-                                if not await msg.check_permission():
-                                    continue
-
-                            if not regex_module.base:
-                                if enable_tos and rfunc.show_typing:
-                                    await _tos_msg_counter(msg, msg.trigger_msg)
-                                else:
-                                    Logger.debug(
-                                        "Tos is disabled, check the configuration if it is not work as expected.")
-
-                            if not ExecutionLockList.check(msg):
-                                ExecutionLockList.add(msg)
-                            else:
-                                return await msg.send_message(I18NContext("parser.command.running.prompt"))
-
-                            if rfunc.show_typing and not msg.sender_data.get("disable_typing", False):
-                                async with msg.Typing(msg):
-                                    await rfunc.function(msg)  # 将msg传入下游模块
-                            else:
-                                await rfunc.function(msg)  # 将msg传入下游模块
-                            raise FinishedException(msg.sent)  # if not using msg.finish
-                    except FinishedException as e:
-                        time_used = datetime.now() - time_start
-                        if rfunc.logging:
-                            Logger.success(
-                                f"Successfully finished session from {identify_str}, returns: {str(e)}. "
-                                f"Times take up: {time_used}")
-
-                        Info.command_parsed += 1
-                        if enable_analytics and rfunc.show_typing:
-                            await AnalyticsData.create(target_id=msg.target.target_id,
-                                                       sender_id=msg.target.sender_id,
-                                                       command=msg.trigger_msg,
-                                                       module_name=m,
-                                                       module_type="regex")
+                if enable_tos and rfunc.show_typing:
+                    await _check_temp_ban(msg)
+                if rfunc.show_typing:
+                    await _check_target_cooldown(msg)
+                if rfunc.required_superuser:
+                    if not msg.check_super_user():
+                        continue
+                elif rfunc.required_admin:
+                    if not await msg.check_permission():
                         continue
 
-                    except NoReportException as e:
-                        await _process_noreport_exception(msg, e)
+                if not regex_module.base:
+                    if enable_tos and rfunc.show_typing:
+                        await _tos_msg_counter(msg, msg.trigger_msg)
+                    else:
+                        Logger.debug(
+                            "Tos is disabled, check the configuration if it is not work as expected.")
 
-                    except AbuseWarning as e:
-                        await _process_tos_abuse_warning(msg, str(e))
+                if not ExecutionLockList.check(msg):
+                    ExecutionLockList.add(msg)
+                else:
+                    return await msg.send_message(I18NContext("parser.command.running.prompt"))
 
-                    except Exception as e:
-                        await _process_exception(msg, e)
-                    finally:
-                        ExecutionLockList.remove(msg)
+                if rfunc.show_typing and not msg.sender_data.get("disable_typing", False):
+                    async with msg.Typing(msg):
+                        await rfunc.function(msg)  # 将msg传入下游模块
+                else:
+                    await rfunc.function(msg)  # 将msg传入下游模块
+                raise FinishedException(msg.sent)  # if not using msg.finish
+            except FinishedException as e:
+                time_used = datetime.now() - time_start
+                if rfunc.logging:
+                    Logger.success(
+                        f"Successfully finished session from {identify_str}, returns: {str(e)}. "
+                        f"Times take up: {time_used}")
+
+                Info.command_parsed += 1
+                if enable_analytics and rfunc.show_typing:
+                    analytics_writer.record(target_id=msg.target.target_id,
+                                            sender_id=msg.target.sender_id,
+                                            command=msg.trigger_msg,
+                                            module_name=m,
+                                            module_type="regex")
+                continue
+
+            except NoReportException as e:
+                await _process_noreport_exception(msg, e)
+
+            except AbuseWarning as e:
+                await _process_tos_abuse_warning(msg, str(e))
+
+            except Exception as e:
+                await _process_exception(msg, e)
+            finally:
+                ExecutionLockList.remove(msg)
 
         except SendMessageFailed:
             await _process_send_message_failed(msg)
@@ -5,16 +5,20 @@ from uuid import uuid4
 
 from core.builtins import Bot, MessageChain, I18NContext, Plain
 from core.config import Config
-from core.constants import Info
+from core.database.base import get_cached_model
 from core.database.models import JobQueuesTable
+from core.exports import add_export
 from core.logger import Logger
-from core.utils.info import get_all_clients_name
+from core.queue_transport import get_transport
+from core.utils.http_cache import http_cache
+from core.utils.info import get_all_clients_name, get_running_clients_name
 from core.utils.ip import append_ip, fetch_ip_info
-from core.utils.web_render import check_web_render
+from core.utils.web_render import check_web_render, web_render_client
 
 _queue_tasks = {}
 queue_actions = {}
 report_targets = Config("report_targets", [])
+_check_lock = asyncio.Lock()
 
 
 class QueueFinished(Exception):
@@ -31,6 +35,15 @@ def action(action_name: str):
 
 class JobQueue:
     name = "Internal|" + str(uuid4())
+    transport = get_transport()
+
+    @classmethod
+    async def start_transport(cls):
+        await cls.transport.start(check_job_queue, _is_relevant, _on_broadcast)
+
+    @classmethod
+    async def stop_transport(cls):
+        await cls.transport.stop()
 
     @classmethod
     async def add_job(cls, target_client: str, action, args, wait=True):
@@ -38,10 +51,13 @@ class JobQueue:
         if wait:
             flag = asyncio.Event()
             _queue_tasks[task_id] = {"flag": flag}
-            await flag.wait()
-            result = _queue_tasks[task_id]["result"]
-            del _queue_tasks[task_id]
-            return result
+            await cls.transport.notify_job(target_client)
+            try:
+                await flag.wait()
+                return _queue_tasks[task_id]["result"]
+            finally:
+                _queue_tasks.pop(task_id, None)
+        await cls.transport.notify_job(target_client)
         return task_id
 
     @classmethod
@@ -71,31 +87,79 @@ class JobQueue:
     @classmethod
     async def web_render_status(cls):
         web_render_status, web_render_local_status = await check_web_render()
+        web_render_remote_status = web_render_client.stats["remote"]["healthy"]
         for target in get_all_clients_name():
             await cls.add_job(target, "web_render_status", {"web_render_status": web_render_status,
-                                                            "web_render_local_status": web_render_local_status}, wait=False)
+                                                            "web_render_local_status": web_render_local_status,
+                                                            "web_render_remote_status": web_render_remote_status},
+                              wait=False)
+
+    @classmethod
+    async def get_http_cache_stats(cls, timeout: float = 10) -> dict:
+        stats = {Bot.FetchTarget.name: dict(http_cache.stats)}
+
+        async def _get(target: str):
+            try:
+                stats[target] = await asyncio.wait_for(cls.add_job(target, "get_http_cache_stats", {}), timeout)
+            except asyncio.TimeoutError:
+                Logger.warning(f"Failed to get HTTP cache stats from {target}: timeout.")
+
+        await asyncio.gather(*(_get(target) for target in get_running_clients_name()
+                               if target != Bot.FetchTarget.name))
+        return stats
 
     @classmethod
     async def send_message(cls, target_client: str, target_id: str, message):
         await cls.add_job(target_client, "send_message", {"target_id": target_id, "message": message})
 
+    @classmethod
+    async def invalidate_cache(cls, model: str, pk: str):
+        if await cls.transport.broadcast({"action": "invalidate_cache", "source": cls.name,
+                                          "args": {"model": model, "pk": pk}}):
+            return
+        # 未连接到通知中转时，仅通过数据库通知正在运行的其他客户端
+        await asyncio.gather(*(cls.add_job(target, "invalidate_cache", {"model": model, "pk": pk}, wait=False)
+                               for target in get_running_clients_name() if target != Bot.FetchTarget.name))
+
+
+add_export(JobQueue)
+
+
+def _is_relevant(msg: dict) -> bool:
+    if msg.get("type") == "job":
+        return msg.get("target_client") in (JobQueue.name, Bot.FetchTarget.name)
+    if msg.get("type") == "done":
+        return msg.get("task_id") in _queue_tasks
+    return False
+
+
+def _on_broadcast(msg: dict):
+    if msg.get("source") == JobQueue.name:
+        return
+    if msg.get("action") == "invalidate_cache":
+        if model := get_cached_model(msg["args"]["model"]):
+            model.invalidate_cache(msg["args"]["pk"])
+
 
 async def return_val(tsk: JobQueuesTable, value: dict, status: str = "done"):
     await tsk.return_val(value, status)
+    await JobQueue.transport.notify_done(str(tsk.task_id))
     raise QueueFinished
 
 
 async def check_job_queue():
-    for task_id in _queue_tasks:
-        tsk = await JobQueuesTable.get(task_id=task_id)
-        if tsk.status == "done":
+    async with _check_lock:
+        await _check_job_queue()
+
+
+async def _check_job_queue():
+    for tsk in await JobQueuesTable.get_finished(list(_queue_tasks)):
+        task_id = str(tsk.task_id)
+        if task_id in _queue_tasks:
             _queue_tasks[task_id]["result"] = tsk.result
             _queue_tasks[task_id]["flag"].set()
 
-    get_internal = await JobQueuesTable.get_all(target_client=JobQueue.name)
-    get_all = await JobQueuesTable.get_all(target_client=Bot.FetchTarget.name)
-
-    for tsk in get_internal + get_all:
+    for tsk in await JobQueuesTable.get_all(target_client=[JobQueue.name, Bot.FetchTarget.name]):
         Logger.debug(f"Received job queue task {tsk.task_id}, action: {tsk.action}")
         Logger.debug(f"Args: {tsk.args}")
         try:
@@ -150,12 +214,24 @@ async def _(tsk: JobQueuesTable, args: dict):
 
 @action("web_render_status")
 async def _(tsk: JobQueuesTable, args: dict):
-    Info.web_render_status = args["web_render_status"]
-    Info.web_render_local_status = args["web_render_local_status"]
+    web_render_client.set_health("local", args["web_render_local_status"])
+    web_render_client.set_health("remote", args.get("web_render_remote_status", args["web_render_status"]))
     await return_val(tsk, {})
 
 
+@action("get_http_cache_stats")
+async def _(tsk: JobQueuesTable, args: dict):
+    await return_val(tsk, dict(http_cache.stats))
+
+
 @action("send_message")
 async def _(tsk: JobQueuesTable, args: dict):
     await Bot.send_message(args["target_id"], MessageChain(args["message"]))
     await return_val(tsk, {"send": True})
+
+
+@action("invalidate_cache")
+async def _(tsk: JobQueuesTable, args: dict):
+    if model := get_cached_model(args["model"]):
+        model.invalidate_cache(args["pk"])
+    await return_val(tsk, {})
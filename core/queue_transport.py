@@ -0,0 +1,245 @@
+"""
+任务队列的通知传输层。
+
+数据库中的任务表始终是任务的持久化来源，传输层只负责在任务被添加或完成时唤醒相关进程，
+使其无需每秒轮询数据库。未连接到通知中转时，将自动回退为数据库轮询。
+"""
+
+import asyncio
+import os
+import socketserver
+import threading
+import time
+import traceback
+from typing import Awaitable, Callable, Optional
+
+import orjson as json
+
+from core.logger import Logger
+
+QUEUE_BROKER_ENV = "AKARI_QUEUE_BROKER"
+
+
+class QueueTransport:
+    """
+    任务队列传输层基类，仅使用数据库轮询。
+    """
+
+    connected = False
+
+    async def start(self,
+                    handler: Callable[[], Awaitable[None]],
+                    is_relevant: Callable[[dict], bool],
+                    on_broadcast: Optional[Callable[[dict], None]] = None):
+        """
+        启动传输层。
+
+        :param handler: 收到相关通知时调用的处理函数。
+        :param is_relevant: 判断通知是否与当前进程相关的函数。
+        :param on_broadcast: 收到广播消息时调用的处理函数。
+        """
+
+    async def stop(self):
+        """
+        停止传输层。
+        """
+
+    async def notify_job(self, target_client: str):
+        """
+        通知目标客户端有新的任务。
+
+        :param target_client: 目标客户端。
+        """
+
+    async def notify_done(self, task_id: str):
+        """
+        通知任务已完成。
+
+        :param task_id: 任务 ID。
+        """
+
+    async def broadcast(self, msg: dict) -> bool:
+        """
+        向所有进程广播一条消息，不经过数据库。
+
+        :param msg: 消息内容。
+        :return: 是否已发出，未连接到通知中转时返回False。
+        """
+        return False
+
+    def should_poll(self) -> bool:
+        """
+        是否需要在本轮计划任务中轮询数据库。
+        """
+        return True
+
+
+class PollingTransport(QueueTransport):
+    """
+    纯数据库轮询传输层，每秒检查一次任务表。
+    """
+
+
+class BrokerTransport(QueueTransport):
+    """
+    基于本地通知中转的传输层。
+
+    :param address: 通知中转地址，格式为`host:port`。
+    :param fallback_interval: 已连接时兜底轮询数据库的间隔（秒）。
+    :param reconnect_interval: 断开连接后的重连间隔（秒）。
+    """
+
+    def __init__(self, address: str, fallback_interval: float = 60, reconnect_interval: float = 5):
+        host, port = address.rsplit(":", 1)
+        self.host = host
+        self.port = int(port)
+        self.fallback_interval = fallback_interval
+        self.reconnect_interval = reconnect_interval
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._last_poll = 0.0
+
+    async def start(self, handler, is_relevant, on_broadcast=None):
+        self._tasks.append(asyncio.create_task(self._listen(is_relevant, on_broadcast)))
+        self._tasks.append(asyncio.create_task(self._consume(handler)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        self.connected = False
+
+    async def _listen(self, is_relevant: Callable[[dict], bool], on_broadcast: Optional[Callable[[dict], None]]):
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                self.connected = True
+                Logger.debug(f"Connected to job queue broker {self.host}:{self.port}.")
+                self._wake.set()  # catch up with the jobs added while disconnected
+                while line := await reader.readline():
+                    try:
+                        msg = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if msg.get("type") == "broadcast":
+                        if on_broadcast:
+                            try:
+                                on_broadcast(msg)
+                            except Exception:
+                                Logger.error(traceback.format_exc())
+                    elif is_relevant(msg):
+                        self._wake.set()
+            except asyncio.CancelledError:
+                raise
+            except OSError as e:
+                Logger.debug(f"Job queue broker unavailable: {e}")
+            self.connected = False
+            self._writer = None
+            await asyncio.sleep(self.reconnect_interval)
+
+    async def _consume(self, handler: Callable[[], Awaitable[None]]):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await handler()
+            except Exception:
+                Logger.error(traceback.format_exc())
+
+    async def _publish(self, msg: dict) -> bool:
+        if not self.connected or not self._writer:
+            return False
+        try:
+            self._writer.write(json.dumps(msg) + b"\n")
+            await self._writer.drain()
+            return True
+        except OSError:
+            self.connected = False
+            return False
+
+    async def notify_job(self, target_client):
+        await self._publish({"type": "job", "target_client": target_client})
+
+    async def notify_done(self, task_id):
+        await self._publish({"type": "done", "task_id": task_id})
+
+    async def broadcast(self, msg):
+        return await self._publish({**msg, "type": "broadcast"})
+
+    def should_poll(self):
+        if not self.connected:
+            return True
+        now = time.monotonic()
+        if now - self._last_poll >= self.fallback_interval:
+            self._last_poll = now
+            return True
+        return False
+
+
+def get_transport() -> QueueTransport:
+    """
+    根据运行环境获取任务队列传输层。
+    """
+    if address := os.environ.get(QUEUE_BROKER_ENV):
+        return BrokerTransport(address)
+    return PollingTransport()
+
+
+class _BrokerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address):
+        super().__init__(server_address, _BrokerHandler)
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def broadcast(self, line: bytes):
+        with self.lock:  # serialize writes so that lines from different senders never interleave
+            for wfile in list(self.clients):
+                try:
+                    wfile.write(line)
+                    wfile.flush()
+                except OSError:
+                    self.clients.discard(wfile)
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with self.server.lock:
+            self.server.clients.add(self.wfile)
+        try:
+            for line in self.rfile:
+                self.server.broadcast(line)
+        except OSError:
+            pass
+        finally:
+            with self.server.lock:
+                self.server.clients.discard(self.wfile)
+
+
+_broker_server: Optional[_BrokerServer] = None
+
+
+def start_broker(host: str = "127.0.0.1", port: int = 0) -> str:
+    """
+    在后台线程中启动任务队列通知中转，并将地址写入环境变量供子进程使用。
+
+    :param host: 监听地址。
+    :param port: 监听端口，为 0 时自动分配。
+    :return: 通知中转地址。
+    """
+    global _broker_server
+    if not _broker_server:
+        _broker_server = _BrokerServer((host, port))
+        threading.Thread(target=_broker_server.serve_forever, name="JobQueueBroker", daemon=True).start()
+    address = f"{_broker_server.server_address[0]}:{_broker_server.server_address[1]}"
+    os.environ[QUEUE_BROKER_ENV] = address
+    return address
+
+
+__all__ = ["QueueTransport", "PollingTransport", "BrokerTransport", "get_transport", "start_broker"]
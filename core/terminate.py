@@ -4,7 +4,11 @@ from tortoise import Tortoise
 
 from core.builtins import MessageTaskManager, I18NContext
 from core.logger import Logger
+from core.queue import JobQueue
 from core.scheduler import Scheduler
+from core.utils.analytics import analytics_writer
+from core.utils.chart import chart_renderer
+from core.utils.http import close_clients
 
 
 async def cleanup_sessions():
@@ -15,6 +19,10 @@ async def cleanup_sessions():
             for z in get_wait_list[x][y]:
                 if get_wait_list[x][y][z]["active"]:
                     await z.send_message(I18NContext("core.message.restart.prompt"))
+    await JobQueue.stop_transport()
+    await analytics_writer.flush()
+    await close_clients()
+    chart_renderer.shutdown()
     await Tortoise.close_connections()
     Scheduler.shutdown()
 
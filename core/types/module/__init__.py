@@ -40,6 +40,7 @@ class Module:
     regex_list: RegexMatches = RegexMatches.init()
     schedule_list: ScheduleMatches = ScheduleMatches.init()
     hooks_list: HookMatches = HookMatches.init()
+    parse_plans: dict = field(init=False, factory=dict, repr=False, eq=False)
 
     @classmethod
     def assign(cls, **kwargs):
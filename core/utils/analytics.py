@@ -0,0 +1,86 @@
+import asyncio
+import traceback
+from collections import Counter
+from datetime import datetime, UTC
+from typing import List, Optional
+
+from core.database.models import AnalyticsData, AnalyticsRollup
+from core.logger import Logger
+
+
+class AnalyticsWriter:
+    """
+    统计数据写入缓冲，在内存中暂存记录并批量写入数据库。
+
+    :param batch_size: 暂存的记录达到此数量时立即写入。
+    :param max_pending: 最多暂存的记录数，超出时丢弃新的记录，避免数据库阻塞时占用过多内存。
+    """
+
+    def __init__(self, batch_size: int = 100, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: List[AnalyticsData] = []
+        self._rollups: Counter = Counter()
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, target_id: str, sender_id: Optional[str], command: str, module_name: str, module_type: str):
+        """
+        记录一条统计数据，不会等待数据库写入。
+
+        :param target_id: 会话 ID。
+        :param sender_id: 用户 ID。
+        :param command: 命令。
+        :param module_name: 模块名称。
+        :param module_type: 模块类型。
+        """
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(AnalyticsData(target_id=target_id,
+                                           sender_id=sender_id,
+                                           command=command,
+                                           module_name=module_name,
+                                           module_type=module_type,
+                                           timestamp=datetime.now(UTC)))
+        if len(self._pending) >= self.batch_size and (not self._flush_task or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """
+        将暂存的记录写入数据库。
+        """
+        async with self._lock:
+            if self.dropped:
+                Logger.warning(f"Analytics buffer is full, {self.dropped} records dropped.")
+                self.dropped = 0
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    await AnalyticsData.bulk_create(batch)
+                except Exception:
+                    Logger.error(traceback.format_exc())
+                    # 放回队列等待下次写入
+                    self._pending[:0] = batch[:max(0, self.max_pending - len(self._pending))]
+                    break
+
+                for data in batch:
+                    key = AnalyticsRollup.make_key(data.timestamp, data.module_name, data.module_type, data.target_id)
+                    self._rollups[tuple(key.values())] += 1
+            await self._flush_rollups()
+
+    async def _flush_rollups(self):
+        # 写入失败的汇总保留至下次写入，避免汇总表少于统计数据
+        for key, amount in list(self._rollups.items()):
+            bucket, module_name, module_type, target_prefix = key
+            try:
+                await AnalyticsRollup.bump(bucket, module_name, module_type, target_prefix, amount)
+            except Exception:
+                Logger.error(traceback.format_exc())
+                return
+            del self._rollups[key]
+
+
+analytics_writer = AnalyticsWriter()
@@ -1,7 +1,13 @@
+import asyncio
+import os
+import shutil
+import time
 import uuid
+from collections import OrderedDict
 from os.path import join
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
 
-from core.constants.path import cache_path
+from core.constants.path import cache_path, render_cache_path
 
 
 def random_cache_path() -> str:
@@ -11,4 +17,118 @@ def random_cache_path() -> str:
     return join(cache_path, str(uuid.uuid4()))
 
 
-__all__ = ["random_cache_path"]
+def purge_cache_path():
+    """
+    清空缓存目录，保留渲染缓存。
+    """
+    os.makedirs(cache_path, exist_ok=True)
+    for entry in os.scandir(cache_path):
+        if entry.path == render_cache_path:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.remove(entry.path)
+
+
+class TTLCache:
+    """
+    带有过期时间的 LRU 内存缓存。
+
+    :param maxsize: 最大缓存条目数，超出时淘汰最久未使用的条目。
+    :param ttl: 条目存活时间（秒）。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        获取缓存值，未命中或已过期时返回默认值。
+
+        :param key: 键名。
+        :param default: 默认值。
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        写入缓存值。
+
+        :param key: 键名。
+        :param value: 值。
+        :param ttl: 本条目的存活时间（秒），留空则使用默认值。
+        """
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        移除缓存值。
+
+        :param key: 键名。
+        :param default: 默认值。
+        """
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        """
+        清空缓存。
+        """
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, self) is not self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    合并相同键的并发调用，同一时间内相同键的调用只会实际执行一次，其余调用共享其结果。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行调用，若相同键的调用正在进行则等待其结果。
+
+        :param key: 键名。
+        :param func: 需要执行的异步函数。
+        """
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 避免无人等待时报告未获取的异常
+            raise
+        finally:
+            del self._inflight[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+
+__all__ = ["random_cache_path", "purge_cache_path", "TTLCache", "SingleFlight"]
@@ -0,0 +1,151 @@
+"""使用matplotlib面向对象接口在事件循环外绘制图表。"""
+
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence
+
+import orjson as json
+
+from core.utils.cache import TTLCache, random_cache_path
+
+
+def _new_figure(figsize=None):
+    # 不使用pyplot，避免共享全局状态
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _to_png(fig, **kwargs) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", **kwargs)
+    return buf.getvalue()
+
+
+def render_line_chart(data_x: Sequence[str], data_y: Sequence[int], xlabel: str, ylabel: str) -> bytes:
+    """
+    绘制折线图，并以红点标出最后一项。
+
+    :param data_x: 横轴数据。
+    :param data_y: 纵轴数据。
+    :param xlabel: 横轴标签。
+    :param ylabel: 纵轴标签。
+    :returns: PNG图片数据。
+    """
+    fig = _new_figure()
+    ax = fig.subplots()
+    ax.plot(data_x, data_y, "-o")
+    ax.plot(data_x[-1], data_y[-1], "-ro")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis="x", labelrotation=45, which="major", labelsize=10)
+    ax.yaxis.get_major_locator().set_params(integer=True)
+    for xitem, yitem in zip(data_x, data_y):
+        ax.annotate(yitem, (xitem, yitem), textcoords="offset points", xytext=(0, 10), ha="center")
+    return _to_png(fig)
+
+
+def render_barh_chart(labels: Sequence[str], values: Sequence[int], xlabel: str, ylabel: str) -> bytes:
+    """
+    绘制横向条形图，第一项位于顶部。
+
+    :param labels: 各项名称。
+    :param values: 各项数值。
+    :param xlabel: 横轴标签。
+    :param ylabel: 纵轴标签。
+    :returns: PNG图片数据。
+    """
+    fig = _new_figure(figsize=(10, max(6, len(labels) * 0.5)))
+    ax = fig.subplots()
+    ax.barh(labels, values, color="skyblue")
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.invert_yaxis()
+    for i, v in enumerate(values):
+        ax.text(v, i, str(v), color="black", va="center")
+    return _to_png(fig, bbox_inches="tight")
+
+
+def render_latex(formula: str) -> bytes:
+    """
+    将LaTeX公式渲染为透明背景的图片。
+
+    :param formula: LaTeX公式。
+    :returns: PNG图片数据。
+    """
+    fig = _new_figure()
+    ax = fig.subplots()
+    text = ax.text(0.5, 0.5, f"${formula}$", fontsize=20, ha="center", va="center")
+    ax.set_axis_off()
+    fig.canvas.draw()
+    bbox = text.get_window_extent(renderer=fig.canvas.get_renderer())
+
+    fig = _new_figure(figsize=(bbox.width / fig.dpi, bbox.height / fig.dpi))
+    ax = fig.subplots()
+    ax.text(0.5, 0.5, f"${formula}$", fontsize=20, ha="center", va="center")
+    ax.set_axis_off()
+    return _to_png(fig, dpi=300, bbox_inches="tight", transparent=True, pad_inches=0.1)
+
+
+class ChartRenderer:
+    """
+    图表渲染服务，在进程池中执行绘图函数并缓存结果。守护进程无法创建子进程，此时改为在单个线程中绘图。
+
+    :param max_workers: 进程池大小。
+    :param cache_size: 最多缓存的图片数。
+    :param cache_ttl: 图片缓存时间（秒）。
+    """
+
+    def __init__(self, max_workers: int = 2, cache_size: int = 128, cache_ttl: float = 86400):
+        self.max_workers = max_workers
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if not self._executor:
+            if multiprocessing.current_process().daemon:
+                # matplotlib的字体缓存不是线程安全的，只使用一个线程
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ChartRenderer")
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def render(self, func: Callable[..., bytes], *args: Any) -> str:
+        """
+        渲染图表，参数相同的图表会直接使用缓存。
+
+        :param func: 模块级的绘图函数，返回PNG图片数据。
+        :param args: 绘图函数的参数，需可序列化为JSON。
+        :returns: 图片路径。
+        """
+        key = hashlib.sha256(json.dumps([func.__module__, func.__qualname__, args])).hexdigest()
+        path = self._cache.get(key)
+        if path and os.path.exists(path):
+            return path
+        content = await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        path = f"{random_cache_path()}.png"
+        with open(path, "wb") as f:
+            f.write(content)
+        self._cache.set(key, path)
+        return path
+
+    def shutdown(self):
+        """
+        关闭进程池。
+        """
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+chart_renderer = ChartRenderer()
+
+
+__all__ = ["ChartRenderer", "chart_renderer", "render_line_chart", "render_barh_chart", "render_latex"]
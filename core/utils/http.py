@@ -3,13 +3,17 @@
 请勿在模块中导入`request`库，否则会导致阻塞问题。
 """
 
+import asyncio
+import importlib.util
 import os
 import re
 import socket
 import urllib.parse
 import uuid
+from contextlib import asynccontextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from http.cookies import SimpleCookie
-from typing import Any, Dict, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 import filetype as ft
 import httpx
@@ -19,10 +23,19 @@ from tenacity import retry, wait_fixed, stop_after_attempt
 from core.config import Config
 from core.constants.path import cache_path
 from core.logger import Logger
+from core.utils.cache import TTLCache
+from core.utils.http_cache import http_cache
 
 logging_resp = False
 debug = Config("debug", False)
 proxy = Config("proxy", cfg_type=str, secret=True)
+http2 = importlib.util.find_spec("h2") is not None
+max_connections_per_host = 10
+dns_negative_cache_ttl = 30
+
+_clients: Dict[Tuple[asyncio.AbstractEventLoop, Optional[str], bool], httpx.AsyncClient] = {}
+_dns_cache = TTLCache(maxsize=1024, ttl=300)
+_host_semaphores: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
 
 url_pattern = re.compile(
     r"\b(?:http[s]?:\/\/)?(?:[a-zA-Z0-9\-\:_@]+\.)+[a-zA-Z]{2,}(?:\/[a-zA-Z0-9-._~:\/?#[\]@!$&\'()*+,;=%]*)?\b"
@@ -33,18 +46,105 @@ _matcher_private_ips = re.compile(
 )
 
 
-def private_ip_check(url: str):
+async def resolve_host(hostname: str) -> List[str]:
+    """异步解析主机名，并缓存解析结果。
+
+    :param hostname: 需要解析的主机名。
+    :returns: 解析得到的所有IP地址。
+    """
+    cached = _dns_cache.get(hostname)
+    if cached is None:
+        try:
+            addr_info = await asyncio.get_running_loop().getaddrinfo(hostname, 80)
+            cached = list(dict.fromkeys(info[4][0] for info in addr_info))
+            _dns_cache.set(hostname, cached)
+        except socket.gaierror as e:
+            cached = e
+            _dns_cache.set(hostname, cached, ttl=dns_negative_cache_ttl)
+    if isinstance(cached, socket.gaierror):
+        raise cached
+    return cached
+
+
+async def private_ip_check(url: str):
     """检查是否为私有IP，若是则抛出ValueError异常。
 
     :param url: 需要检查的url。"""
     hostname = urllib.parse.urlparse(url).hostname
-    addr_info = socket.getaddrinfo(hostname, 80)
+    for addr in await resolve_host(hostname):
+        if _matcher_private_ips.match(addr):
+            raise ValueError(
+                f"Attempt of requesting private IP addresses is not allowed, requesting {hostname}."
+            )
 
-    addr = addr_info[0][4][0]
-    if _matcher_private_ips.match(addr):
-        raise ValueError(
-            f"Attempt of requesting private IP addresses is not allowed, requesting {hostname}."
+
+def get_client(use_proxy: bool = True, verify: Optional[bool] = None) -> httpx.AsyncClient:
+    """获取当前事件循环下共享的httpx客户端，复用连接池以避免重复握手。
+
+    共享客户端不会保存响应中的cookies，请求所需的http头与cookies请在每次请求时单独传入。
+
+    :param use_proxy: 是否使用配置文件中的代理。
+    :param verify: 是否验证SSL证书，默认在调试模式下不验证。
+    :returns: httpx客户端。
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, proxy if use_proxy else None, not debug if verify is None else verify)
+    client = _clients.get(key)
+    if not client or client.is_closed:
+        for k in [k for k in _clients if k[0].is_closed()]:
+            del _clients[k]
+        client = httpx.AsyncClient(
+            proxy=key[1],
+            verify=key[2],
+            http2=http2,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30),
         )
+        _clients[key] = client
+    return client
+
+
+@asynccontextmanager
+async def host_limit(url: str) -> AsyncIterator[None]:
+    """限制对同一主机的并发请求数。
+
+    :param url: 请求的URL。
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, urllib.parse.urlparse(url).netloc)
+    semaphore = _host_semaphores.get(key)
+    if not semaphore:
+        semaphore = _host_semaphores[key] = asyncio.Semaphore(max_connections_per_host)
+    async with semaphore:
+        yield
+
+
+async def close_clients():
+    """关闭所有共享的httpx客户端。"""
+    for client in list(_clients.values()):
+        if not client.is_closed:
+            await client.aclose()
+    _clients.clear()
+    _host_semaphores.clear()
+
+
+@asynccontextmanager
+async def _open_client(headers: Optional[Dict[str, Any]], cookies: Optional[Dict[str, Any]]) -> AsyncIterator[httpx.AsyncClient]:
+    if cookies:
+        # 带有cookies的请求使用独立的客户端，以便在重定向时继续携带cookies
+        async with httpx.AsyncClient(
+            headers=headers,
+            proxy=proxy,
+            verify=not debug
+        ) as client:
+            ck = SimpleCookie()
+            ck.load(cookies)
+            cookies_dict = {key: morsel.value for key, morsel in ck.items()}
+            client.cookies.update(cookies_dict)
+            Logger.debug(f"Using cookies: {cookies_dict}")
+            yield client
+    else:
+        yield get_client()
 
 
 async def get_url(
@@ -58,6 +158,7 @@ async def get_url(
     request_private_ip: bool = False,
     logging_err_resp: bool = True,
     cookies: Optional[Dict[str, Any]] = None,
+    cache_ttl: Optional[float] = None,
 ) -> Optional[Union[str, dict[str, Any], list[Any], bytes]]:
     """利用httpx获取指定URL的内容。
 
@@ -71,58 +172,66 @@ async def get_url(
     :param request_private_ip: 是否允许请求私有IP。
     :param logging_err_resp: 是否记录错误响应。
     :param cookies: 使用的cookies。
+    :param cache_ttl: 响应的缓存时间（秒），留空则不缓存。缓存过期后将使用条件请求重新验证。
     :returns: 指定URL的内容。（字符串）
     """
 
+    cache_key = http_cache.make_key(url, headers, params, cookies) if cache_ttl else None
+
+    async def request_(client, extra_headers=None):
+        req_headers = headers
+        if extra_headers:
+            req_headers = httpx.Headers(headers)
+            req_headers.update(extra_headers)
+        return await client.get(
+            url,
+            timeout=timeout,
+            headers=req_headers,
+            params=params,
+            follow_redirects=True,
+        )
+
     @retry(stop=stop_after_attempt(attempt), wait=wait_fixed(3), reraise=True)
     async def get_():
         Logger.debug(f"[GET] {url}")
 
-        if not Config("allow_request_private_ip", False) and not request_private_ip:
-            private_ip_check(url)
-
-        async with httpx.AsyncClient(
-            headers=headers,
-            proxy=proxy,
-            verify=not debug
-        ) as client:
-            if cookies:
-                ck = SimpleCookie()
-                ck.load(cookies)
-                cookies_dict = {key: morsel.value for key, morsel in ck.items()}
-                client.cookies.update(cookies_dict)
-                Logger.debug(f"Using cookies: {cookies_dict}")
-            try:
-                resp = await client.get(
-                    url,
-                    timeout=timeout,
-                    headers=headers,
-                    params=params,
-                    follow_redirects=True,
-                )
+        resp = await http_cache.get_fresh(url, cache_key) if cache_ttl else None
+        if not resp and not Config("allow_request_private_ip", False) and not request_private_ip:
+            await private_ip_check(url)
+
+        try:
+            if resp:
+                Logger.debug(f"[{resp.status_code}] {url} (cached)")
+            else:
+                async with _open_client(headers, cookies) as client, host_limit(url):
+                    if cache_ttl:
+                        resp = await http_cache.fetch(url, cache_key, cache_ttl,
+                                                      lambda extra_headers: request_(client, extra_headers))
+                    else:
+                        resp = await request_(client)
                 Logger.debug(f"[{resp.status_code}] {url}")
-                if logging_resp:
-                    Logger.debug(resp.text)
-                if status_code and resp.status_code != status_code:
-                    if not logging_resp and logging_err_resp:
-                        Logger.error(resp.text)
-                    raise ValueError(
-                        f"{str(resp.status_code)}[Ke:Image,path=https://http.cat/{str(resp.status_code)}.jpg]"
-                    )
-                if fmt:
-                    if hasattr(resp, fmt):
-                        attr = getattr(resp, fmt)
-                        if callable(attr):
-                            return attr()
-                        return attr
-                    raise ValueError(f"NoSuchMethod: {fmt}")
-                return resp.text
-            except (httpx.ConnectError, httpx.TimeoutException):
-                raise ValueError("Request timeout")
-            except Exception as e:
-                if logging_err_resp:
-                    Logger.error(f"Error while requesting {url}: \n{e}")
-                raise e
+            if logging_resp:
+                Logger.debug(resp.text)
+            if status_code and resp.status_code != status_code:
+                if not logging_resp and logging_err_resp:
+                    Logger.error(resp.text)
+                raise ValueError(
+                    f"{str(resp.status_code)}[Ke:Image,path=https://http.cat/{str(resp.status_code)}.jpg]"
+                )
+            if fmt:
+                if hasattr(resp, fmt):
+                    attr = getattr(resp, fmt)
+                    if callable(attr):
+                        return attr()
+                    return attr
+                raise ValueError(f"NoSuchMethod: {fmt}")
+            return resp.text
+        except (httpx.ConnectError, httpx.TimeoutException):
+            raise ValueError("Request timeout")
+        except Exception as e:
+            if logging_err_resp:
+                Logger.error(f"Error while requesting {url}: \n{e}")
+            raise e
 
     return await get_()
 
@@ -158,19 +267,9 @@ async def post_url(
     async def _post():
         Logger.debug(f"[POST] {url}")
         if not Config("allow_request_private_ip", False) and not request_private_ip:
-            private_ip_check(url)
+            await private_ip_check(url)
 
-        async with httpx.AsyncClient(
-            headers=headers,
-            proxy=proxy,
-            verify=not debug
-        ) as client:
-            if cookies:
-                ck = SimpleCookie()
-                ck.load(cookies)
-                cookies_dict = {key: morsel.value for key, morsel in ck.items()}
-                client.cookies.update(cookies_dict)
-                Logger.debug(f"Using cookies: {cookies_dict}")
+        async with _open_client(headers, cookies) as client, host_limit(url):
             try:
                 resp = await client.post(
                     url,
@@ -240,9 +339,6 @@ async def download(
 
     @retry(stop=stop_after_attempt(attempt), wait=wait_fixed(3), reraise=True)
     async def download_(filename=filename, path=path):
-        if not Config("allow_request_private_ip", False) and not request_private_ip:
-            private_ip_check(url)
-
         data = None
         if method.upper() == "GET":
             data = await get_url(
@@ -290,4 +386,4 @@ async def download(
 download_to_cache = download
 
 
-__all__ = ["get_url", "post_url", "download", "url_pattern"]
+__all__ = ["get_url", "post_url", "download", "url_pattern", "get_client", "close_clients"]
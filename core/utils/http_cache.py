@@ -0,0 +1,146 @@
+"""`get_url`使用的HTTP响应缓存，支持ETag/Last-Modified条件请求与并发请求合并。"""
+
+import hashlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+import orjson as json
+from aiofile import async_open
+
+from core.constants.path import cache_path
+from core.utils.cache import SingleFlight, TTLCache
+
+_stored_headers = ("content-type", "etag", "last-modified")
+
+
+class HTTPCache:
+    """
+    HTTP响应缓存，内存中保存最近使用的响应，并在缓存目录中保存副本。
+
+    :param path: 磁盘缓存目录。
+    :param maxsize: 内存中最多保存的响应数。
+    :param max_age: 过期响应用于条件请求的最长保留时间（秒）。
+    """
+
+    def __init__(self, path: str, maxsize: int = 256, max_age: float = 86400):
+        self.path = path
+        self.max_age = max_age
+        self.stats = {"hit": 0, "miss": 0, "revalidated": 0, "coalesced": 0}
+        self._memory = TTLCache(maxsize=maxsize, ttl=max_age)
+        self._inflight = SingleFlight()
+
+    @staticmethod
+    def make_key(url: str, headers: Any = None, params: Any = None, cookies: Any = None) -> str:
+        """
+        根据请求内容生成缓存键。
+        """
+        raw = json.dumps([url,
+                          sorted(httpx.Headers(headers).multi_items()) if headers else [],
+                          sorted(httpx.QueryParams(params).multi_items()) if params else [],
+                          str(cookies) if cookies else None])
+        return hashlib.sha256(raw).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    async def _load(self, key: str) -> Optional[dict]:
+        entry = self._memory.get(key)
+        if entry is None and os.path.exists(self._file(key)):
+            try:
+                async with async_open(self._file(key), "rb") as f:
+                    meta, _, content = (await f.read()).partition(b"\n")
+                entry = json.loads(meta)
+                entry["content"] = content
+                self._memory.set(key, entry)
+            except Exception:
+                return None
+        if entry and entry["stored"] + self.max_age < time.time():
+            return None
+        return entry
+
+    async def _save(self, key: str, entry: dict):
+        self._memory.set(key, entry)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            meta = {k: v for k, v in entry.items() if k != "content"}
+            async with async_open(self._file(key), "wb") as f:
+                await f.write(json.dumps(meta) + b"\n" + entry["content"])
+        except OSError:
+            pass
+
+    @staticmethod
+    def _to_response(url: str, entry: dict) -> httpx.Response:
+        return httpx.Response(entry["status_code"],
+                              headers=entry["headers"],
+                              content=entry["content"],
+                              request=httpx.Request("GET", url))
+
+    async def get_fresh(self, url: str, key: str) -> Optional[httpx.Response]:
+        """
+        获取未过期的缓存响应。
+
+        :param url: 请求的URL。
+        :param key: 缓存键。
+        :returns: 缓存的响应，若不存在或已过期则返回None。
+        """
+        entry = await self._load(key)
+        if entry and entry["expires"] > time.time():
+            self.stats["hit"] += 1
+            return self._to_response(url, entry)
+        return None
+
+    async def fetch(self,
+                    url: str,
+                    key: str,
+                    ttl: float,
+                    request: Callable[[Dict[str, str]], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        发起请求并缓存响应。相同的并发请求只会向上游发起一次，若存在过期的缓存则使用条件请求重新验证。
+
+        :param url: 请求的URL。
+        :param key: 缓存键。
+        :param ttl: 响应的缓存时间（秒）。
+        :param request: 发起请求的函数，参数为需要额外附加的http头。
+        :returns: 响应。
+        """
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+        return await self._inflight.do(key, lambda: self._fetch(url, key, ttl, request))
+
+    async def _fetch(self, url, key, ttl, request) -> httpx.Response:
+        entry = await self._load(key)
+        conditional_headers = {}
+        if entry:
+            if entry["headers"].get("etag"):
+                conditional_headers["If-None-Match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                conditional_headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+        resp = await request(conditional_headers)
+        now = time.time()
+        if resp.status_code == 304 and entry:
+            self.stats["revalidated"] += 1
+            entry = dict(entry, expires=now + ttl, stored=now)
+            await self._save(key, entry)
+            return self._to_response(url, entry)
+        self.stats["miss"] += 1
+        if resp.status_code == 200:
+            await self._save(key, {"status_code": resp.status_code,
+                                   "headers": {k: v for k, v in resp.headers.items() if k in _stored_headers},
+                                   "content": resp.content,
+                                   "expires": now + ttl,
+                                   "stored": now})
+        return resp
+
+    def clear(self):
+        """
+        清空内存中的缓存。
+        """
+        self._memory.clear()
+
+
+http_cache = HTTPCache(os.path.join(cache_path, "http"))
+
+
+__all__ = ["HTTPCache", "http_cache"]
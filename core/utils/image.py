@@ -1,12 +1,8 @@
-import base64
 import traceback
 from io import BytesIO
 from typing import List, Optional, Union
 
-import filetype as ft
-import orjson as json
 from PIL import Image as PILImage
-from aiofile import async_open
 from jinja2 import FileSystemLoader, Environment
 
 from core.builtins import Image, MessageChain, MessageSession
@@ -15,17 +11,16 @@ from core.constants.info import Info
 from core.constants.path import templates_path
 from core.logger import Logger
 from core.utils.cache import random_cache_path
-from core.utils.http import download
-from core.utils.web_render import webrender
+from core.utils.web_render import webrender_screenshot
 
 env = Environment(loader=FileSystemLoader(templates_path), autoescape=True)
 
 
 async def image_split(i: ImageElement) -> List[ImageElement]:
-    i = PILImage.open(await i.get())
-    iw, ih = i.size
+    img = PILImage.open(BytesIO(await i.get_bytes()))
+    iw, ih = img.size
     if ih <= 1500:
-        return [Image(i)]
+        return [i]
     _h = 0
     i_list = []
     for _ in range((ih // 1500) + 1):
@@ -33,7 +28,7 @@ async def image_split(i: ImageElement) -> List[ImageElement]:
             crop_h = ih
         else:
             crop_h = _h + 1500
-        i_list.append(Image(i.crop((0, _h, iw, crop_h))))
+        i_list.append(Image(img.crop((0, _h, iw, crop_h))))
         _h = crop_h
     return i_list
 
@@ -68,14 +63,10 @@ async def msgchain2image(message_chain: Union[List, MessageChain],
         if isinstance(m, PlainElement):
             lst.append("<div>" + m.text.replace("\n", "<br>") + "</div>")
         elif isinstance(m, ImageElement):
-            async with async_open(await m.get(), "rb") as fi:
-                data = await fi.read()
-                try:
-                    ftt = ft.match(data)
-                    lst.append(f"<img src=\"data:{ftt.mime};base64,{
-                               (base64.encodebytes(data)).decode("utf-8")}\" width=\"720\" />")
-                except Exception:
-                    Logger.error(traceback.format_exc())
+            try:
+                lst.append(f"<img src=\"{await m.get_base64(mime=True)}\" width=\"720\" />")
+            except Exception:
+                Logger.error(traceback.format_exc())
         elif isinstance(m, VoiceElement):
             lst.append("<div>[Voice]</div>")
         elif isinstance(m, EmbedElement):
@@ -86,49 +77,13 @@ async def msgchain2image(message_chain: Union[List, MessageChain],
     with open(fname, "w", encoding="utf-8") as fi:
         fi.write(html_content)
 
-    d = {"content": html_content, "element": ".botbox"}
-    html_ = json.dumps(d)
-
     Logger.info("[WebRender] Converting message chain...")
     try:
-        pic = await download(webrender("element_screenshot", use_local=use_local),
-                             status_code=200,
-                             headers={"Content-Type": "application/json"},
-                             method="POST",
-                             post_data=html_,
-                             attempt=1,
-                             timeout=30,
-                             request_private_ip=True
-                             )
+        return await webrender_screenshot("element_screenshot",
+                                          {"content": html_content, "element": ".botbox"},
+                                          use_local=use_local)
     except Exception:
-        if use_local:
-            try:
-                pic = await download(webrender("element_screenshot", use_local=False),
-                                     status_code=200,
-                                     headers={"Content-Type": "application/json"},
-                                     method="POST",
-                                     post_data=html_,
-                                     attempt=1,
-                                     timeout=30,
-                                     request_private_ip=True
-                                     )
-            except Exception:
-                Logger.error("[WebRender] Generation Failed.")
-                return False
-        else:
-            Logger.error("[WebRender] Generation Failed.")
-            return False
-
-    with open(pic, "rb") as read:
-        load_img = json.loads(read.read())
-    img_lst = []
-    for x in load_img:
-        b = base64.b64decode(x)
-        bio = BytesIO(b)
-        bimg = PILImage.open(bio)
-        img_lst.append(bimg)
-
-    return img_lst
+        return False
 
 
 async def svg_render(file_path: str, use_local: bool = True) -> Union[List[PILImage.Image], bool]:
@@ -152,46 +107,9 @@ async def svg_render(file_path: str, use_local: bool = True) -> Union[List[PILIm
     with open(fname, "w", encoding="utf-8") as fi:
         fi.write(html_content)
 
-    d = {"content": html_content, "element": ".botbox", "counttime": False}
-    html_ = json.dumps(d)
-
     try:
-        pic = await download(webrender("element_screenshot", use_local=use_local),
-                             status_code=200,
-                             headers={"Content-Type": "application/json"},
-                             method="POST",
-                             post_data=html_,
-                             attempt=1,
-                             timeout=30,
-                             request_private_ip=True
-                             )
+        return await webrender_screenshot("element_screenshot",
+                                          {"content": html_content, "element": ".botbox", "counttime": False},
+                                          use_local=use_local)
     except Exception:
-        if use_local:
-            try:
-                pic = await download(webrender("element_screenshot", use_local=False),
-                                     status_code=200,
-                                     headers={"Content-Type": "application/json"},
-                                     method="POST",
-                                     post_data=html_,
-                                     attempt=1,
-                                     timeout=30,
-                                     request_private_ip=True
-                                     )
-            except Exception:
-                Logger.error("[WebRender] Generation Failed.")
-                return False
-        else:
-            Logger.error("[WebRender] Generation Failed.")
-            return False
-
-    with open(pic, "rb") as read:
-        load_img = json.loads(read.read())
-
-    img_lst = []
-    for x in load_img:
-        b = base64.b64decode(x)
-        bio = BytesIO(b)
-        bimg = PILImage.open(bio)
-        img_lst.append(bimg)
-
-    return img_lst
+        return False
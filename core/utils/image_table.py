@@ -1,11 +1,8 @@
-import base64
 import re
 import traceback
 from html import escape
-from io import BytesIO
 from typing import Any, List, Union
 
-import orjson as json
 from PIL import Image as PILImage
 from tabulate import tabulate
 
@@ -13,8 +10,7 @@ from core.constants.info import Info
 from core.joke import shuffle_joke as joke
 from core.logger import Logger
 from core.utils.cache import random_cache_path
-from core.utils.http import download
-from core.utils.web_render import webrender
+from core.utils.web_render import webrender_screenshot
 
 
 class ImageTable:
@@ -47,7 +43,6 @@ async def image_table_render(
         return False
     if not Info.web_render_local_status:
         use_local = False
-    pic = False
 
     try:
         tblst = []
@@ -91,46 +86,10 @@ async def image_table_render(
             with open(fname, "w", encoding="utf-8") as fi:
                 fi.write(tblst + css)
 
-        try:
-            pic = await download(
-                webrender(use_local=use_local),
-                method="POST",
-                post_data=json.dumps(html),
-                request_private_ip=True,
-                headers={
-                    "Content-Type": "application/json",
-                },
-            )
-        except Exception:
-            if use_local:
-                try:
-                    pic = await download(
-                        webrender(use_local=False),
-                        method="POST",
-                        post_data=json.dumps(html),
-                        request_private_ip=True,
-                        headers={
-                            "Content-Type": "application/json",
-                        },
-                    )
-                except Exception:
-                    Logger.error("Generation failed.")
-                    return False
-            else:
-                Logger.error("Generation failed.")
-                return False
+        return await webrender_screenshot("", html, use_local=use_local)
     except Exception:
         Logger.error(traceback.format_exc())
         return False
-    with open(pic, "rb") as read:
-        load_img = json.loads(read.read())
-    img_lst = []
-    for x in load_img:
-        b = base64.b64decode(x)
-        bio = BytesIO(b)
-        bimg = PILImage.open(bio)
-        img_lst.append(bimg)
-    return img_lst
 
 
 __all__ = ["ImageTable", "image_table_render"]
@@ -15,6 +15,8 @@ from core.constants.info import Info
 from core.constants.path import bots_info_path
 from core.logger import Logger
 
+RUNNING_BOTS_ENV = "AKARI_RUNNING_BOTS"
+
 
 def get_bot_names(attribute_name, console_name) -> List[str]:
     names = []
@@ -68,6 +70,20 @@ def get_all_clients_name() -> List[str]:
     return get_bot_names("client_name", console_client_name)
 
 
+def get_running_clients_name() -> List[str]:
+    """
+    获取由启动器启动的客户端名称，单独运行时返回空列表。
+    """
+    names = []
+    for bot_name in filter(None, os.environ.get(RUNNING_BOTS_ENV, "").split(",")):
+        try:
+            module = importlib.import_module(f"bots.{bot_name}.info")
+            names.append(module.client_name)
+        except Exception:
+            traceback.print_exc()
+    return names
+
+
 def get_all_sender_prefix() -> List[str]:
     """
     获取所有发送者前缀。
@@ -84,6 +100,7 @@ def get_all_target_prefix() -> List[str]:
 
 __all__ = [
     "get_all_clients_name",
+    "get_running_clients_name",
     "get_all_sender_prefix",
     "get_all_target_prefix",
     "Info",
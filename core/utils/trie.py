@@ -0,0 +1,78 @@
+from typing import Any, Iterable, Iterator, Optional, Union
+
+_END = object()
+
+
+class PrefixTrie:
+    """
+    前缀树，用于在与键数量无关的时间内找出某字符串的所有前缀键。
+
+    :param items: 初始键，可为键的可迭代对象或键值映射。
+    """
+
+    def __init__(self, items: Optional[Union[Iterable[str], dict[str, Any]]] = None):
+        self._root: dict = {}
+        self._size = 0
+        if isinstance(items, dict):
+            for key, value in items.items():
+                self.add(key, value)
+        elif items:
+            for key in items:
+                self.add(key)
+
+    def add(self, key: str, value: Any = None, replace: bool = True):
+        """
+        添加键。
+
+        :param key: 键名。
+        :param value: 值，留空则使用键名本身。
+        :param replace: 键已存在时是否覆盖原值。
+        """
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            self._size += 1
+        elif not replace:
+            return
+        node[_END] = key if value is None else value
+
+    def prefixes_of(self, text: str) -> Iterator[tuple[str, Any]]:
+        """
+        按长度从短到长遍历所有为该字符串前缀的键。
+
+        :param text: 待匹配的字符串。
+        :return: (键, 值) 的迭代器。
+        """
+        node = self._root
+        if _END in node:
+            yield "", node[_END]
+        for i, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                return
+            if _END in node:
+                yield text[:i + 1], node[_END]
+
+    def shortest_prefix_of(self, text: str) -> Optional[str]:
+        """
+        获取为该字符串前缀的最短键。
+        """
+        for key, _ in self.prefixes_of(text):
+            return key
+        return None
+
+    def longest_prefix_of(self, text: str) -> Optional[str]:
+        """
+        获取为该字符串前缀的最长键。
+        """
+        result = None
+        for key, _ in self.prefixes_of(text):
+            result = key
+        return result
+
+    def __len__(self) -> int:
+        return self._size
+
+
+__all__ = ["PrefixTrie"]
@@ -1,15 +1,29 @@
+import asyncio
+import base64
+import hashlib
+import os
+import shutil
+import time
 import traceback
-from typing import Tuple, Optional
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, List, Tuple, Optional
 from urllib.parse import quote
 
+import orjson as json
+from PIL import Image as PILImage
+
 from core.config import Config
 from core.constants.info import Info
+from core.constants.path import render_cache_path
 from core.logger import Logger
-from core.utils.http import get_url
+from core.utils.http import get_url, post_url
 
 web_render = Config("web_render", cfg_type=str, secret=True, get_url=True)
 web_render_local = Config("web_render_local", cfg_type=str, get_url=True)
 
+ping_url = "http://www.bing.com"
+
 
 def webrender(
     method: str = "",
@@ -37,32 +51,316 @@ def webrender(
     return url
 
 
-async def check_web_render() -> Tuple[bool, bool]:
-    web_render_status = False
-    web_render_local_status = False
-    if not web_render_local:
-        if not web_render:
-            Logger.warning("[WebRender] WebRender is not configured.")
-        else:
-            web_render_status = True
-    else:
-        web_render_status = True
-        web_render_local_status = True
-    ping_url = "http://www.bing.com"
-    if web_render_status:
+class RenderCache:
+    """
+    WebRender截图的磁盘缓存，以请求内容的哈希为键，超出容量时淘汰最久未使用的条目。
+
+    :param path: 缓存目录。
+    :param max_size: 缓存的最大总字节数。
+    :param rescan_interval: 重新统计缓存目录的间隔（秒），用于计入其他进程写入的文件。
+    """
+
+    def __init__(self, path: str, max_size: int = 256 * 1024 * 1024, rescan_interval: float = 60):
+        self.path = path
+        self.max_size = max_size
+        self.rescan_interval = rescan_interval
+        self.stats = {"hit": 0, "miss": 0}
+        self._index: Optional[OrderedDict[str, int]] = None
+        self._size = 0
+        self._scanned_at = 0.0
+
+    @staticmethod
+    def make_key(method: str, data: Dict[str, Any], ttl: Optional[int] = None) -> str:
+        """
+        根据请求内容生成缓存键。
+
+        :param method: WebRender API 方法。
+        :param data: 请求内容。
+        :param ttl: 若指定，则缓存键每隔此秒数变化一次，用于内容可能变化的网页截图。
+        """
+        window = int(time.time() // ttl) if ttl else None
+        return hashlib.sha256(json.dumps([method, data, window], option=json.OPT_SORT_KEYS)).hexdigest()
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            if os.path.exists(self.path):
+                for namespace in os.scandir(self.path):
+                    if namespace.is_dir():
+                        for entry in os.scandir(namespace.path):
+                            if entry.name.endswith(".tmp"):
+                                continue
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, os.path.join(namespace.name, entry.name), stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((name, size) for _, name, size in entries)
+            self._size = sum(self._index.values())
+            self._scanned_at = time.time()
+        return self._index
+
+    def _drop(self, name: str):
+        self._size -= self._load_index().pop(name, 0)
+
+    def _lookup(self, name: str) -> bool:
+        index = self._load_index()
+        if name in index:
+            return True
+        # 可能由其他进程写入
         try:
-            Logger.info("[WebRender] Checking WebRender status...")
-            await get_url(
-                webrender("source", ping_url, _ignore_status=True),
-                200,
-                request_private_ip=True,
-            )
-            Logger.success("[WebRender] WebRender is working as expected.")
-        except Exception:
-            Logger.error("[WebRender] WebRender is not working as expected.")
+            size = os.stat(os.path.join(self.path, name)).st_size
+        except OSError:
+            return False
+        index[name] = size
+        self._size += size
+        return True
+
+    def get(self, key: str, namespace: str = "default") -> Optional[bytes]:
+        """
+        获取缓存的截图。
+
+        :param key: 缓存键。
+        :param namespace: 命名空间。
+        """
+        name = os.path.join(namespace, key)
+        index = self._load_index()
+        if self._lookup(name):
+            file = os.path.join(self.path, name)
+            try:
+                with open(file, "rb") as f:
+                    content = f.read()
+                os.utime(file)
+                index.move_to_end(name)
+                self.stats["hit"] += 1
+                return content
+            except OSError:
+                self._drop(name)
+        self.stats["miss"] += 1
+        return None
+
+    def set(self, key: str, content: bytes, namespace: str = "default"):
+        """
+        缓存截图。
+
+        :param key: 缓存键。
+        :param content: WebRender返回的内容。
+        :param namespace: 命名空间。
+        """
+        name = os.path.join(namespace, key)
+        file = os.path.join(self.path, name)
+        index = self._load_index()
+        try:
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            with open(f"{file}.tmp", "wb") as f:
+                f.write(content)
+            os.replace(f"{file}.tmp", file)
+        except OSError:
             Logger.error(traceback.format_exc())
-            web_render_status = False
+            return
+        self._drop(name)
+        index[name] = len(content)
+        self._size += len(content)
+        if self._size > self.max_size or time.time() - self._scanned_at > self.rescan_interval:
+            # 缓存目录由多个进程共用，按目录中的实际文件重新统计
+            self._index = None
+            index = self._load_index()
+        while self._size > self.max_size and index:
+            old, _ = next(iter(index.items()))
+            self._drop(old)
+            try:
+                os.remove(os.path.join(self.path, old))
+            except OSError:
+                pass
+
+    def clear(self, namespace: Optional[str] = None):
+        """
+        清除缓存。
+
+        :param namespace: 要清除的命名空间，若不指定则清除全部缓存。
+        """
+        index = self._load_index()
+        for name in [n for n in index if namespace is None or n.startswith(namespace + os.sep)]:
+            self._drop(name)
+        shutil.rmtree(os.path.join(self.path, namespace) if namespace else self.path, ignore_errors=True)
+
+
+render_cache = RenderCache(render_cache_path)
+
+
+class WebRenderClient:
+    """
+    WebRender客户端，限制每个WebRender的并发请求数，记录延迟与错误，并在本地WebRender不可用时自动改用远程WebRender。
+    连续失败达到阈值的WebRender会被标记为不可用，直到后台检查确认其恢复。
+
+    :param max_concurrency: 每个WebRender的最大并发请求数。
+    :param failure_threshold: 连续失败多少次后标记为不可用。
+    :param probe_timeout: 检查WebRender状态时的超时时间（秒）。
+    """
+
+    endpoints = ("local", "remote")
+
+    def __init__(self, max_concurrency: int = 4, failure_threshold: int = 3, probe_timeout: float = 10):
+        self.failure_threshold = failure_threshold
+        self.probe_timeout = probe_timeout
+        self.stats = {endpoint: {"healthy": True,
+                                 "requests": 0,
+                                 "errors": 0,
+                                 "consecutive_errors": 0,
+                                 "avg_latency": 0.0,
+                                 "last_error": None} for endpoint in self.endpoints}
+        self._semaphores = {endpoint: asyncio.Semaphore(max_concurrency) for endpoint in self.endpoints}
+
+    @staticmethod
+    def _base_url(endpoint: str) -> Optional[str]:
+        return web_render_local if endpoint == "local" else web_render
+
+    def set_health(self, endpoint: str, healthy: bool):
+        """
+        设置WebRender的可用状态，并同步至 `Info.web_render_status` 与 `Info.web_render_local_status`。
+
+        :param endpoint: local 或 remote。
+        :param healthy: 是否可用。
+        """
+        stats = self.stats[endpoint]
+        if not self._base_url(endpoint):
+            # 未配置的WebRender保持初始状态，其可用性由下方的配置检查决定
+            healthy = stats["healthy"]
+        if stats["healthy"] != healthy:
+            if healthy:
+                Logger.success(f"[WebRender] {endpoint.capitalize()} WebRender is back online.")
+            else:
+                Logger.warning(f"[WebRender] {endpoint.capitalize()} WebRender is marked as unavailable.")
+        stats["healthy"] = healthy
+        if healthy:
+            stats["consecutive_errors"] = 0
+        local_ok = bool(web_render_local) and self.stats["local"]["healthy"]
+        remote_ok = bool(web_render) and self.stats["remote"]["healthy"]
+        Info.web_render_local_status = local_ok
+        Info.web_render_status = local_ok or remote_ok
+
+    def _record(self, endpoint: str, latency: float, error: Optional[Exception] = None):
+        stats = self.stats[endpoint]
+        stats["requests"] += 1
+        stats["avg_latency"] = latency if stats["requests"] == 1 else stats["avg_latency"] * 0.8 + latency * 0.2
+        if error is None:
+            stats["consecutive_errors"] = 0
+            return
+        stats["errors"] += 1
+        stats["last_error"] = str(error)
+        if str(error).startswith("4"):
+            # 请求内容有误（如找不到元素），与WebRender本身的可用性无关
+            return
+        stats["consecutive_errors"] += 1
+        if stats["consecutive_errors"] >= self.failure_threshold:
+            self.set_health(endpoint, False)
+
+    async def request(self, method: str, data: Dict[str, Any], use_local: bool = True, timeout: float = 30) -> bytes:
+        """
+        向WebRender发送请求，本地WebRender失败时改用远程WebRender。
+
+        :param method: API 方法。
+        :param data: 请求内容。
+        :param use_local: 是否优先使用本地 WebRender。
+        :param timeout: 超时时间（秒）。
+        :returns: WebRender返回的内容。
+        """
+        endpoints = [e for e in self.endpoints
+                     if self._base_url(e) and self.stats[e]["healthy"] and (use_local or e != "local")]
+        if not endpoints:
+            raise ValueError("WebRender is not available")
+        post_data = json.dumps(data)
+        error = None
+        for endpoint in endpoints:
+            async with self._semaphores[endpoint]:
+                start = time.perf_counter()
+                try:
+                    content = await post_url(self._base_url(endpoint) + method,
+                                             data=post_data,
+                                             status_code=200,
+                                             headers={"Content-Type": "application/json"},
+                                             fmt="content",
+                                             attempt=1,
+                                             timeout=timeout,
+                                             request_private_ip=True)
+                except Exception as e:
+                    self._record(endpoint, time.perf_counter() - start, e)
+                    error = e
+                    continue
+            self._record(endpoint, time.perf_counter() - start)
+            return content
+        Logger.error("[WebRender] Generation Failed.")
+        raise error
+
+    async def probe(self, force: bool = False) -> Tuple[bool, bool]:
+        """
+        检查WebRender是否可用。
+
+        :param force: 是否检查所有WebRender，否则只检查被标记为不可用的WebRender。
+        :returns: WebRender是否可用，以及本地WebRender是否可用。
+        """
+        for endpoint in self.endpoints:
+            base_url = self._base_url(endpoint)
+            if not base_url or (self.stats[endpoint]["healthy"] and not force):
+                continue
+            try:
+                await get_url(f"{base_url}source?url={quote(ping_url)}",
+                              200,
+                              timeout=self.probe_timeout,
+                              attempt=1,
+                              request_private_ip=True,
+                              logging_err_resp=False)
+                self.set_health(endpoint, True)
+            except Exception:
+                if force:
+                    Logger.error(traceback.format_exc())
+                self.set_health(endpoint, False)
+        if not web_render_local and not web_render:
+            Info.web_render_status = Info.web_render_local_status = False
+        return Info.web_render_status, Info.web_render_local_status
+
+
+web_render_client = WebRenderClient()
+
+
+async def webrender_screenshot(method: str,
+                               data: Dict[str, Any],
+                               use_local: bool = True,
+                               cache_namespace: Optional[str] = "default",
+                               cache_ttl: Optional[int] = None) -> List[PILImage.Image]:
+    """向WebRender请求截图，本地WebRender失败时改用远程WebRender。相同内容的截图会从缓存中读取。
+
+    :param method: API 方法。
+    :param data: 请求内容。
+    :param use_local: 是否使用本地 WebRender。
+    :param cache_namespace: 缓存的命名空间，若为None则不使用缓存。
+    :param cache_ttl: 缓存时间（秒），用于内容可能变化的网页截图，HTML内容的截图无需指定。
+    :returns: 截图的PIL对象。
+    """
+    key = render_cache.make_key(method, data, cache_ttl) if cache_namespace else None
+    content = render_cache.get(key, cache_namespace) if key else None
+    if content is None:
+        content = await web_render_client.request(method, data, use_local=use_local)
+        if key:
+            render_cache.set(key, content, cache_namespace)
+    return [PILImage.open(BytesIO(base64.b64decode(x))) for x in json.loads(content)]
+
+
+async def check_web_render() -> Tuple[bool, bool]:
+    if not web_render_local and not web_render:
+        Logger.warning("[WebRender] WebRender is not configured.")
+        return False, False
+    Logger.info("[WebRender] Checking WebRender status...")
+    web_render_status, web_render_local_status = await web_render_client.probe(force=True)
+    if web_render_status:
+        Logger.success("[WebRender] WebRender is working as expected.")
+    else:
+        Logger.error("[WebRender] WebRender is not working as expected.")
     return web_render_status, web_render_local_status
 
 
-__all__ = ["webrender", "check_web_render"]
+__all__ = ["webrender",
+           "webrender_screenshot",
+           "check_web_render",
+           "RenderCache",
+           "render_cache",
+           "WebRenderClient",
+           "web_render_client"]
@@ -0,0 +1,55 @@
+"""
+对比线性扫描与前缀树在 500 个模块下匹配命令首词的耗时。
+
+python -m example.benchmark_command_match
+"""
+
+import random
+import string
+import timeit
+
+from core.utils.trie import PrefixTrie
+
+random.seed(0)
+modules = sorted({"".join(random.choices(string.ascii_lowercase, k=random.randint(2, 10))) for _ in range(500)})
+aliases = {f"{m[:1]}{i}": f"{m} sub{i}" for i, m in enumerate(modules)}
+commands = [f"{random.choice(modules)} arg1 arg2" for _ in range(1000)] + ["hello world, not a command"] * 1000
+
+
+def linear(command):
+    cm = ""
+    for module_name in modules:
+        if command.startswith(module_name):
+            cm = module_name
+            break
+    alias_list = []
+    for alias in aliases:
+        if not cm:
+            if command.startswith(alias) and not command.startswith(aliases[alias]):
+                alias_list.append(alias)
+        elif alias.startswith(cm) and command.startswith(alias):
+            alias_list.append(alias)
+    return cm, max(alias_list, key=len) if alias_list else None
+
+
+module_trie = PrefixTrie(modules)
+alias_trie = PrefixTrie(aliases)
+
+
+def trie(command):
+    cm = module_trie.shortest_prefix_of(command) or ""
+    result = None
+    for alias, replacement in alias_trie.prefixes_of(command):
+        if cm:
+            if alias.startswith(cm):
+                result = alias
+        elif not command.startswith(replacement):
+            result = alias
+    return cm, result
+
+
+assert [linear(c) for c in commands] == [trie(c) for c in commands]
+
+for name, func in (("linear", linear), ("trie", trie)):
+    t = min(timeit.repeat(lambda: [func(c) for c in commands], number=10, repeat=3))
+    print(f"{name}: {t / (10 * len(commands)) * 1e6:.2f} us/command")
@@ -0,0 +1,43 @@
+"""
+对比每次解析前深拷贝模块（旧行为）与使用缓存的解析计划时 CommandParser 的耗时。
+
+python -m example.benchmark_command_parser
+"""
+
+import copy
+import timeit
+
+from core.builtins import command_prefix
+from core.parser.args import parse_template
+from core.parser.command import CommandParser
+from core.types import Module
+from core.types.module.component_meta import CommandMeta
+
+
+async def _func(msg):
+    pass
+
+
+module = Module.assign(bind_prefix="bench", alias=None, recommend_modules=None, developers=None)
+for i in range(60):
+    module.command_list.add(CommandMeta(function=_func,
+                                        help_doc=parse_template([f"sub{i} (add|del) <name> [-f <value>] {{desc {i}}}"]),
+                                        options_desc={"-f": f"flag {i}"}))
+command = "~bench sub42 add foo -f bar"
+pristine = copy.deepcopy(module)  # 缓存的解析计划无法被深拷贝，需在生成前保留副本
+
+
+def before():
+    copied = copy.deepcopy(pristine)
+    return CommandParser(copied, command_prefixes=command_prefix, bind_prefix="bench").parse(command)
+
+
+def after():
+    return CommandParser(module, command_prefixes=command_prefix, bind_prefix="bench").parse(command)
+
+
+assert before()[1] == after()[1]
+
+for name, func in (("deepcopy", before), ("parse plan", after)):
+    t = min(timeit.repeat(func, number=200, repeat=3))
+    print(f"{name}: {t / 200 * 1e3:.3f} ms/command")
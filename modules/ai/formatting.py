@@ -1,10 +1,9 @@
 import re
 from typing import Dict, List
 
-import matplotlib.pyplot as plt
 import orjson as json
 
-from core.utils.cache import random_cache_path
+from core.utils.chart import chart_renderer, render_latex
 from core.utils.http import post_url
 from core.utils.image_table import ImageTable, image_table_render
 
@@ -59,26 +58,8 @@ def parse_markdown(md: str) -> List[Dict[str, str]]:
     return blocks
 
 
-def generate_latex(formula: str):
-    fig, ax = plt.subplots()
-    text = ax.text(0.5, 0.5, f"${formula}$", fontsize=20, ha="center", va="center")
-    ax.set_axis_off()
-
-    fig.canvas.draw()
-    bbox = text.get_window_extent(renderer=fig.canvas.get_renderer())
-
-    width, height = bbox.width / fig.dpi, bbox.height / fig.dpi
-    plt.close(fig)
-
-    fig, ax = plt.subplots(figsize=(width, height))
-    ax.text(0.5, 0.5, f"${formula}$", fontsize=20, ha="center", va="center")
-    ax.set_axis_off()
-
-    path = f"{random_cache_path()}.png"
-    plt.savefig(path, dpi=300, bbox_inches="tight", transparent=True, pad_inches=0.1)
-    plt.close()
-
-    return path
+async def generate_latex(formula: str):
+    return await chart_renderer.render(render_latex, formula)
 
 
 async def generate_code_snippet(code: str, language: str):
@@ -55,7 +55,7 @@ async def ask_llm(prompt: str,
         elif block["type"] == "latex":
             content = block["content"]
             try:
-                path = generate_latex(content)
+                path = await generate_latex(content)
                 chain.append(Image(path))
             except Exception:
                 chain.append(I18NContext("ai.message.text2img.error", text=content))
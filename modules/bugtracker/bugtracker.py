@@ -1,14 +1,10 @@
-import base64
-from io import BytesIO
-
 import orjson as json
-from PIL import Image as PILImage
 
 from core.builtins import I18NContext, Plain
 from core.constants.info import Info
 from core.logger import Logger
-from core.utils.http import download, post_url, get_url
-from core.utils.web_render import webrender
+from core.utils.http import post_url, get_url
+from core.utils.web_render import webrender_screenshot
 
 elements = ["div[class^='MuiContainer-root']"]
 
@@ -23,32 +19,11 @@ async def make_screenshot(page_link, use_local=True):
         use_local = False
     Logger.info("[WebRender] Generating element screenshot...")
     try:
-        img = await download(
-            webrender("element_screenshot", use_local=use_local),
-            status_code=200,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-            post_data=json.dumps({"url": page_link, "element": elements_}),
-            attempt=1,
-            timeout=30,
-            request_private_ip=True,
-        )
-        if img:
-            with open(img) as read:
-                load_img = json.loads(read.read())
-            img_lst = []
-            for x in load_img:
-                b = base64.b64decode(x)
-                bio = BytesIO(b)
-                bimg = PILImage.open(bio)
-                img_lst.append(bimg)
-            return img_lst
-        Logger.error("[WebRender] Generation Failed.")
-        return False
+        return await webrender_screenshot("element_screenshot",
+                                          {"url": page_link, "element": elements_},
+                                          use_local=use_local,
+                                          cache_namespace=None)
     except Exception:
-        if use_local:
-            return await make_screenshot(page_link, use_local=False)
-        Logger.error("[WebRender] Generation Failed.")
         return False
 
 
@@ -1,15 +1,14 @@
 import traceback
 from datetime import datetime, timedelta, UTC
 
-import matplotlib.pyplot as plt
 from dateutil.relativedelta import relativedelta
 
 from core.builtins import Bot, Image, I18NContext
 from core.component import module
 from core.config import Config
-from core.database.models import AnalyticsData
+from core.database.models import AnalyticsData, AnalyticsRollup
 from core.logger import Logger
-from core.utils.cache import random_cache_path
+from core.utils.chart import chart_renderer, render_barh_chart, render_line_chart
 
 
 async def get_first_record(msg: Bot.MessageSession):
@@ -26,11 +25,11 @@ async def _(msg: Bot.MessageSession):
     if Config("enable_analytics", False):
         try:
             first_record = await get_first_record(msg)
-            get_counts = await AnalyticsData.all().count()
+            get_counts = await AnalyticsRollup.get_count_by_times()
 
-            new = datetime.now().replace(hour=0, minute=0, second=0) + timedelta(days=1)
-            old = datetime.now().replace(hour=0, minute=0, second=0)
-            get_counts_today = await AnalyticsData.get_count_by_times(new, old)
+            new = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            old = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            get_counts_today = await AnalyticsRollup.get_count_by_times(new, old)
 
             await msg.finish(I18NContext(
                 "core.message.analytics.counts",
@@ -62,43 +61,18 @@ async def _(msg: Bot.MessageSession):
                     module=module_,
                     first_record=first_record,
                 )
-            data_ = {}
-            for d in range(30):
-                new = (
-                    datetime.now().replace(hour=0, minute=0, second=0)
-                    + timedelta(days=1)
-                    - timedelta(days=30 - d - 1)
-                )
-                old = (
-                    datetime.now().replace(hour=0, minute=0, second=0)
-                    + timedelta(days=1)
-                    - timedelta(days=30 - d)
-                )
-                get_ = await AnalyticsData.get_count_by_times(new, old, module_)
-                data_[old.day] = get_
+            new = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            old = new - timedelta(days=30)
+            data_ = {(old + timedelta(days=d)).day: 0 for d in range(30)}
+            buckets = await AnalyticsRollup.get_grouped_count("bucket", new, old, module_)
+            for bucket, count in buckets.items():
+                data_[bucket.day] += count
             data_x = []
             data_y = []
             for x in data_:
                 data_x.append(str(x))
                 data_y.append(data_[x])
-            plt.plot(data_x, data_y, "-o")
-            plt.plot(data_x[-1], data_y[-1], "-ro")
-            plt.xlabel("Days")
-            plt.ylabel("Counts")
-            plt.tick_params(axis="x", labelrotation=45, which="major", labelsize=10)
-
-            plt.gca().yaxis.get_major_locator().set_params(integer=True)
-            for xitem, yitem in zip(data_x, data_y):
-                plt.annotate(
-                    yitem,
-                    (xitem, yitem),
-                    textcoords="offset points",
-                    xytext=(0, 10),
-                    ha="center",
-                )
-            path = f"{random_cache_path()}.png"
-            plt.savefig(path)
-            plt.close()
+            path = await chart_renderer.render(render_line_chart, data_x, data_y, "Days", "Counts")
             await msg.finish([result, Image(path)])
         except AttributeError as e:
             if str(e).find("NoneType") != -1:
@@ -125,43 +99,18 @@ async def _(msg: Bot.MessageSession):
                     module=module_,
                     first_record=first_record,
                 )
-            data_ = {}
-            for m in range(12):
-                new = (
-                    datetime.now().replace(day=1, hour=0, minute=0, second=0)
-                    + relativedelta(months=1)
-                    - relativedelta(months=12 - m - 1)
-                )
-                old = (
-                    datetime.now().replace(day=1, hour=0, minute=0, second=0)
-                    + relativedelta(months=1)
-                    - relativedelta(months=12 - m)
-                )
-                get_ = await AnalyticsData.get_count_by_times(new, old, module_)
-                data_[old.month] = get_
+            new = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) + relativedelta(months=1)
+            old = new - relativedelta(months=12)
+            data_ = {(old + relativedelta(months=m)).month: 0 for m in range(12)}
+            buckets = await AnalyticsRollup.get_grouped_count("bucket", new, old, module_)
+            for bucket, count in buckets.items():
+                data_[bucket.month] += count
             data_x = []
             data_y = []
             for x in data_:
                 data_x.append(str(x))
                 data_y.append(data_[x])
-            plt.plot(data_x, data_y, "-o")
-            plt.plot(data_x[-1], data_y[-1], "-ro")
-            plt.xlabel("Months")
-            plt.ylabel("Counts")
-            plt.tick_params(axis="x", labelrotation=45, which="major", labelsize=10)
-
-            plt.gca().yaxis.get_major_locator().set_params(integer=True)
-            for xitem, yitem in zip(data_x, data_y):
-                plt.annotate(
-                    yitem,
-                    (xitem, yitem),
-                    textcoords="offset points",
-                    xytext=(0, 10),
-                    ha="center",
-                )
-            path = f"{random_cache_path()}.png"
-            plt.savefig(path)
-            plt.close()
+            path = await chart_renderer.render(render_line_chart, data_x, data_y, "Months", "Counts")
             await msg.finish([result, Image(path)])
         except AttributeError as e:
             if str(e).find("NoneType") != -1:
@@ -184,18 +133,7 @@ async def _(msg: Bot.MessageSession, rank: int = None):
 
             module_names = [item[0] for item in top_modules]
             module_counts = [item[1] for item in top_modules]
-            plt.figure(figsize=(10, max(6, len(module_names) * 0.5)))
-            plt.barh(module_names, module_counts, color="skyblue")
-            plt.xlabel("Counts")
-            plt.ylabel("Modules")
-            plt.gca().invert_yaxis()
-
-            for i, v in enumerate(module_counts):
-                plt.text(v, i, str(v), color="black", va="center")
-
-            path = f"{random_cache_path()}.png"
-            plt.savefig(path, bbox_inches="tight")
-            plt.close()
+            path = await chart_renderer.render(render_barh_chart, module_names, module_counts, "Counts", "Modules")
 
             await msg.finish([Image(path)])
         except AttributeError as e:
@@ -1,12 +1,8 @@
-import base64
 import re
 import traceback
 from html import escape
-from io import BytesIO
 
-import orjson as json
 from jinja2 import FileSystemLoader, Environment
-from PIL import Image as PILImage
 
 from core.builtins import Bot, I18NContext, Image, Plain, base_superuser_list
 from core.component import module
@@ -18,8 +14,7 @@ from core.loader import ModulesManager, current_unloaded_modules, err_modules
 from core.logger import Logger
 from core.parser.command import CommandParser
 from core.utils.cache import random_cache_path
-from core.utils.http import download
-from core.utils.web_render import webrender
+from core.utils.web_render import webrender_screenshot
 
 env = Environment(loader=FileSystemLoader(templates_path), autoescape=True)
 help_url = Config("help_url", help_url_default)
@@ -130,43 +125,12 @@ async def _(msg: Bot.MessageSession, module: str):
                         with open(fname, "w", encoding="utf-8") as fi:
                             fi.write(html_content)
 
-                        d = {"content": html_content, "element": ".botbox"}
-                        html_ = json.dumps(d)
                         Logger.info("[WebRender] Generating help document...")
-                        try:
-                            pic = await download(webrender("element_screenshot", use_local=use_local),
-                                                 status_code=200,
-                                                 headers={"Content-Type": "application/json"},
-                                                 method="POST",
-                                                 post_data=html_,
-                                                 attempt=1,
-                                                 timeout=30,
-                                                 request_private_ip=True
-                                                 )
-                        except Exception as e:
-                            if use_local:
-                                try:
-                                    pic = await download(webrender("element_screenshot", use_local=False),
-                                                         status_code=200,
-                                                         method="POST",
-                                                         headers={"Content-Type": "application/json"},
-                                                         post_data=html_,
-                                                         request_private_ip=True
-                                                         )
-                                except Exception as e:
-                                    Logger.error("[WebRender] Generation Failed.")
-                                    raise e
-                            else:
-                                Logger.error("[WebRender] Generation Failed.")
-                                raise e
-                        with open(pic, "rb") as read:
-                            load_img = json.loads(read.read())
-                        img_lst = []
-                        for x in load_img:
-                            b = base64.b64decode(x)
-                            bio = BytesIO(b)
-                            bimg = PILImage.open(bio)
-                            img_lst.append(Image(bimg))
+                        imgs = await webrender_screenshot("element_screenshot",
+                                                          {"content": html_content, "element": ".botbox"},
+                                                          use_local=use_local,
+                                                          cache_namespace="help")
+                        img_lst = [Image(img) for img in imgs]
                         await msg.finish(img_lst + [Plain(wiki_msg.strip())])
                     except Exception:
                         Logger.error(traceback.format_exc())
@@ -334,41 +298,11 @@ async def help_generator(msg: Bot.MessageSession,
     with open(fname, "w", encoding="utf-8") as fi:
         fi.write(html_content)
 
-    d = {"content": html_content, "element": ".botbox"}
-    html_ = json.dumps(d)
     Logger.info("[WebRender] Generating module list...")
     try:
-        pic = await download(webrender("element_screenshot", use_local=use_local),
-                             status_code=200,
-                             headers={"Content-Type": "application/json"},
-                             method="POST",
-                             post_data=html_,
-                             attempt=1,
-                             timeout=30,
-                             request_private_ip=True
-                             )
+        return await webrender_screenshot("element_screenshot",
+                                          {"content": html_content, "element": ".botbox"},
+                                          use_local=use_local,
+                                          cache_namespace="help")
     except Exception:
-        if use_local:
-            try:
-                pic = await download(webrender("element_screenshot", use_local=False),
-                                     status_code=200,
-                                     method="POST",
-                                     headers={"Content-Type": "application/json"},
-                                     post_data=html_,
-                                     request_private_ip=True
-                                     )
-            except Exception:
-                Logger.error("[WebRender] Generation Failed.")
-                return False
-        else:
-            Logger.error("[WebRender] Generation Failed.")
-            return False
-    with open(pic, "rb") as read:
-        load_img = json.loads(read.read())
-    img_lst = []
-    for x in load_img:
-        b = base64.b64decode(x)
-        bio = BytesIO(b)
-        bimg = PILImage.open(bio)
-        img_lst.append(bimg)
-    return img_lst
+        return False
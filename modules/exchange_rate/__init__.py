@@ -41,7 +41,7 @@ async def _(msg: Bot.MessageSession, base: str, target: str):
 
 async def exchange(msg: Bot.MessageSession, base_currency, target_currency, amount):
     url = f"https://v6.exchangerate-api.com/v6/{api_key}/codes"
-    data = await get_url(url, 200, fmt="json")
+    data = await get_url(url, 200, fmt="json", cache_ttl=86400)
     supported_currencies = data["supported_codes"]
     unsupported_currencies = []
     if data and data["result"] == "success":
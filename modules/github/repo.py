@@ -8,7 +8,7 @@ from modules.github.utils import time_diff, dirty_check, dark_check
 
 async def repo(msg: Bot.MessageSession, name: str, pat: str):
     try:
-        result = await get_url("https://api.github.com/repos/" + name, 200, fmt="json", headers=[("Authorization", f"Bearer {pat}")] if pat else [])
+        result = await get_url("https://api.github.com/repos/" + name, 200, fmt="json", headers=[("Authorization", f"Bearer {pat}")] if pat else [], cache_ttl=300)
         rlicense = "Unknown"
         if "license" in result and result["license"]:
             if "spdx_id" in result["license"]:
@@ -14,7 +14,7 @@ async def mcjv(msg: Bot.MessageSession):
     try:
         data = json.loads(
             await get_url(
-                "https://piston-meta.mojang.com/mc/game/version_manifest.json", 200
+                "https://piston-meta.mojang.com/mc/game/version_manifest.json", 200, cache_ttl=60
             )
         )
         release = data["latest"]["release"]
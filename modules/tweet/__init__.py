@@ -1,16 +1,12 @@
-import base64
-from io import BytesIO
-
 import orjson as json
-from PIL import Image as PILImage
 
 from core.builtins import Bot
 from core.builtins.message import I18NContext, Image, Url
 from core.component import module
 from core.dirty_check import check_bool, rickroll
-from core.utils.http import download, get_url
+from core.utils.http import get_url
 from core.utils.text import isint
-from core.utils.web_render import webrender
+from core.utils.web_render import webrender, webrender_screenshot
 
 t = module(
     "tweet",
@@ -39,8 +35,7 @@ async def _(msg: Bot.MessageSession):
 
 
 async def get_tweet(msg: Bot.MessageSession, tweet_id: int):
-    web_render = webrender("element_screenshot")
-    if not web_render:
+    if not webrender("element_screenshot"):
         await msg.finish(I18NContext("error.config.webrender.invalid"))
 
     try:
@@ -92,30 +87,13 @@ async def get_tweet(msg: Bot.MessageSession, tweet_id: int):
         }
     """
 
-    pic = await download(
-        web_render,
-        method="POST",
-        headers={
-            "Content-Type": "application/json",
-        },
-        post_data=json.dumps(
-            {
-                "url": f"https://react-tweet-next.vercel.app/light/{tweet_id}",
-                "css": css,
-                "mw": False,
-                "element": "article",
-            }
-        ),
-        request_private_ip=True,
-    )
-    with open(pic, "rb") as read:
-        load_img = json.loads(read.read())
-    img_lst = []
-    for x in load_img:
-        b = base64.b64decode(x)
-        bio = BytesIO(b)
-        bimg = PILImage.open(bio)
-        img_lst.append(Image(bimg))
+    imgs = await webrender_screenshot("element_screenshot",
+                                      {"url": f"https://react-tweet-next.vercel.app/light/{tweet_id}",
+                                       "css": css,
+                                       "mw": False,
+                                       "element": "article"},
+                                      cache_namespace=None)
+    img_lst = [Image(img) for img in imgs]
     img_lst.append(
         Url(
             f"https://x.com/{res_json["data"]["user"]["screen_name"]}/status/{tweet_id}"
@@ -1,6 +1,7 @@
 from core.builtins import Bot, I18NContext, Image
 from core.component import module
 from core.constants.info import Info
+from core.queue import JobQueue
 from core.utils.image_table import image_table_render, ImageTable
 from .database.models import WikiAllowList, WikiBlockList
 from .utils.wikilib import WikiLib
@@ -25,6 +26,8 @@ async def _(msg: Bot.MessageSession, apilink: str):
         else:
             res = await WikiBlockList.add(apilink)
             list_name = msg.locale.t("wiki.message.wiki_audit.list_name.blocklist")
+        if res:
+            await JobQueue.trigger_hook_all("wiki.invalidate_cache", wiki_info=True)
         if not res:
             await msg.finish(
                 msg.locale.t(
@@ -65,8 +68,10 @@ async def _(msg: Bot.MessageSession, apilink: str):
             )
         list_name = msg.locale.t("wiki.message.wiki_audit.list_name.allowlist")
     else:
-        res = WikiBlockList.remove(apilink)
+        res = await WikiBlockList.remove(apilink)
         list_name = msg.locale.t("wiki.message.wiki_audit.list_name.blocklist")
+    if res:
+        await JobQueue.trigger_hook_all("wiki.invalidate_cache", wiki_info=True)
     if not res:
         await msg.finish(
             msg.locale.t(
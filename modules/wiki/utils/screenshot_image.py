@@ -1,24 +1,22 @@
-import base64
 import os
 import re
 import traceback
 import uuid
-from io import BytesIO
 from typing import Union, List
 from urllib.parse import urljoin
 
 import httpx
-import orjson as json
 from PIL import Image as PILImage
 from bs4 import BeautifulSoup, Comment
 
 from core.constants.info import Info
 from core.constants.path import cache_path
 from core.logger import Logger
-from core.utils.http import download
-from core.utils.web_render import webrender
+from core.utils.web_render import webrender_screenshot
 from .mapping import infobox_elements
 
+screenshot_cache_ttl = 600
+
 
 async def generate_screenshot_v2(
     page_link: str,
@@ -35,68 +33,27 @@ async def generate_screenshot_v2(
         return False
     if not Info.web_render_local_status:
         use_local = False
-    if not section:
-        if allow_special_page and content_mode:
-            elements_.insert(0, ".mw-body-content")
-        if allow_special_page and not content_mode:
-            elements_.insert(0, ".diff")
-        Logger.info("[WebRender] Generating element screenshot...")
-        try:
-            img = await download(
-                webrender("element_screenshot", use_local=use_local),
-                status_code=200,
-                headers={"Content-Type": "application/json"},
-                method="POST",
-                post_data=json.dumps({"url": page_link, "element": elements_}),
-                attempt=1,
-                timeout=30,
-                request_private_ip=True,
-            )
-        except Exception:
-            if use_local:
-                return await generate_screenshot_v2(
-                    page_link,
-                    section,
-                    allow_special_page,
-                    content_mode,
-                    use_local=False,
-                )
-            Logger.error("[WebRender] Generation Failed.")
-            return False
-    else:
+    try:
+        if not section:
+            if allow_special_page and content_mode:
+                elements_.insert(0, ".mw-body-content")
+            if allow_special_page and not content_mode:
+                elements_.insert(0, ".diff")
+            Logger.info("[WebRender] Generating element screenshot...")
+            return await webrender_screenshot("element_screenshot",
+                                              {"url": page_link, "element": elements_},
+                                              use_local=use_local,
+                                              cache_namespace="wiki",
+                                              cache_ttl=screenshot_cache_ttl)
         Logger.info("[WebRender] Generating section screenshot...")
-        try:
-            section = section.replace(" ", "_")
-            img = await download(
-                webrender("section_screenshot", use_local=use_local),
-                status_code=200,
-                headers={"Content-Type": "application/json"},
-                method="POST",
-                post_data=json.dumps({"url": page_link, "section": section}),
-                attempt=1,
-                timeout=30,
-                request_private_ip=True,
-            )
-        except Exception:
-            if use_local:
-                return await generate_screenshot_v2(
-                    page_link,
-                    section,
-                    allow_special_page,
-                    content_mode,
-                    use_local=False,
-                )
-            Logger.error("[WebRender] Generation Failed.")
-            return False
-    with open(img) as read:
-        load_img = json.loads(read.read())
-    img_lst = []
-    for x in load_img:
-        b = base64.b64decode(x)
-        bio = BytesIO(b)
-        bimg = PILImage.open(bio)
-        img_lst.append(bimg)
-    return img_lst
+        section = section.replace(" ", "_")
+        return await webrender_screenshot("section_screenshot",
+                                          {"url": page_link, "section": section},
+                                          use_local=use_local,
+                                          cache_namespace="wiki",
+                                          cache_ttl=screenshot_cache_ttl)
+    except Exception:
+        return False
 
 
 async def generate_screenshot_v1(
@@ -330,48 +287,7 @@ async def generate_screenshot_v1(
             html = {"content": read_file.read(), "width": w, "mw": True}
 
         Logger.info("Start rendering...")
-        img_lst = []
-        try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(
-                    webrender(),
-                    headers={
-                        "Content-Type": "application/json",
-                    },
-                    data=json.dumps(html),
-                )
-                if resp.status_code != 200:
-                    Logger.error(f"Failed to render: {resp.text}")
-                    return False
-                imgs_data = json.loads(resp.text)
-                for img in imgs_data:
-                    b = base64.b64decode(img)
-                    bio = BytesIO(b)
-                    bimg = PILImage.open(bio)
-                    img_lst.append(bimg)
-
-        except httpx.RequestError as e:
-            Logger.error(f"Request error: {e}")
-            if use_local:
-                async with httpx.AsyncClient() as client:
-                    resp = await client.post(
-                        webrender(use_local=False),
-                        headers={
-                            "Content-Type": "application/json",
-                        },
-                        data=json.dumps(html),
-                    )
-                    if resp.status_code != 200:
-                        Logger.error(f"Failed to render: {resp.text}")
-                        return False
-                    imgs_data = json.loads(resp.text)
-                    for img in imgs_data:
-                        b = base64.b64decode(img)
-                        bio = BytesIO(b)
-                        bimg = PILImage.open(bio)
-                        img_lst.append(bimg)
-
-        return img_lst
+        return await webrender_screenshot("", html, use_local=use_local, cache_namespace="wiki")
     except Exception:
         Logger.error(traceback.format_exc())
         return False
@@ -4,7 +4,7 @@ import re
 import traceback
 import urllib.parse
 from copy import deepcopy
-from typing import Union, Dict, List
+from typing import Union, Dict, List, Optional
 
 import orjson as json
 from attrs import define
@@ -17,6 +17,7 @@ from core.constants.exceptions import AbuseWarning, NoReportException
 from core.dirty_check import check
 from core.i18n import Locale
 from core.logger import Logger
+from core.utils.cache import SingleFlight, TTLCache
 from core.utils.http import get_url
 from core.utils.web_render import webrender
 from modules.wiki.utils.bot import BotAccount
@@ -26,6 +27,17 @@ from .mapping import *
 
 default_locale = Config("default_locale", cfg_type=str)
 enable_tos = Config("enable_tos", True)
+api_cache_ttl = 60
+
+_api_cache = TTLCache(maxsize=4096, ttl=api_cache_ttl)
+_api_cache_titles = TTLCache(maxsize=16384, ttl=api_cache_ttl)
+_api_inflight = SingleFlight()
+siteinfo_ttl = 43200
+
+_wiki_info_cache = TTLCache(maxsize=512, ttl=3600)
+_wiki_info_netloc = TTLCache(maxsize=512, ttl=3600)
+_siteinfo_inflight = SingleFlight()
+_siteinfo_refresh_tasks = set()
 
 
 class InvalidWikiError(Exception):
@@ -114,11 +126,12 @@ class WikiLib:
         self.headers = headers
         self.locale = Locale(locale)
 
-    async def get_json_from_api(self, api, _no_login=False, **kwargs) -> dict:
+    async def get_json_from_api(self, api, _no_login=False, _cache_ttl: Optional[float] = None, **kwargs) -> dict:
         cookies = None
         Logger.debug(BotAccount.cookies)
         if api in BotAccount.cookies and not _no_login:
             cookies = BotAccount.cookies[api]
+        base_api = api
         if api in redirect_list:
             api = redirect_list[api]
         if kwargs:
@@ -133,22 +146,67 @@ class WikiLib:
                 request_local = True
                 break
 
-        try:
-            return await get_url(
-                api,
-                status_code=200,
-                headers=self.headers,
-                fmt="json",
-                request_private_ip=request_local,
-                cookies=cookies,
-            )
-
-        except Exception as e:
-            if api.find("moegirl.org.cn") != -1:
-                raise InvalidWikiError(
-                    self.locale.t("wiki.message.utils.wikilib.get_failed.moegirl")
+        async def request():
+            try:
+                return await get_url(
+                    api,
+                    status_code=200,
+                    headers=self.headers,
+                    fmt="json",
+                    request_private_ip=request_local,
+                    cookies=cookies,
                 )
-            raise NoReportException(str(e))
+
+            except Exception as e:
+                if api.find("moegirl.org.cn") != -1:
+                    raise InvalidWikiError(
+                        self.locale.t("wiki.message.utils.wikilib.get_failed.moegirl")
+                    )
+                raise NoReportException(str(e))
+
+        if not _cache_ttl:
+            return await request()
+        headers = tuple(sorted((str(k).lower(), str(v)) for k, v in (self.headers or {}).items()))
+        cache_key = (api, headers, cookies is not None)
+        result = _api_cache.get(cache_key)
+        if result is None:
+            result = await _api_inflight.do(cache_key, request)
+            if isinstance(result, dict) and "error" not in result:
+                _api_cache.set(cache_key, result, ttl=_cache_ttl)
+                for title in self._get_queried_titles(kwargs, result):
+                    keys = _api_cache_titles.get((base_api, title), set())
+                    keys.add(cache_key)
+                    _api_cache_titles.set((base_api, title), keys)
+        return result
+
+    @staticmethod
+    def _get_queried_titles(kwargs: dict, result: dict) -> set:
+        titles = set()
+        for k in ("titles", "page"):
+            if k in kwargs:
+                titles.update(str(kwargs[k]).split("|"))
+        query = result.get("query", {})
+        for k in ("redirects", "normalized"):
+            for r in query.get(k, []):
+                titles.update((r["from"], r["to"]))
+        for page in query.get("pages", {}).values():
+            if "title" in page:
+                titles.add(page["title"])
+        if "parse" in result and "title" in result["parse"]:
+            titles.add(result["parse"]["title"])
+        return {t.replace("_", " ") for t in titles}
+
+    @staticmethod
+    def invalidate_cache(api: str, titles: List[str]):
+        """
+        使与指定页面相关的API缓存失效。
+
+        :param api: wiki的API链接。
+        :param titles: 页面标题列表。
+        """
+        for title in titles:
+            for key in _api_cache_titles.pop((api, title.replace("_", " ")), ()):
+                _api_cache.pop(key)
 
     async def rearrange_siteinfo(
         self, info: Union[dict, str, bytes], wiki_api_link
@@ -268,23 +326,23 @@ class WikiLib:
                 return WikiStatus(available=False, value=False, message=message)
         if wiki_api_link in redirect_list:
             wiki_api_link = redirect_list[wiki_api_link]
-        get_cache_info = await WikiSiteInfo.get_or_none(api_link=wiki_api_link)
-        if get_cache_info:
-            if get_cache_info.site_info and datetime.datetime.now().timestamp() - get_cache_info.timestamp.timestamp() < 43200:
-                return WikiStatus(
-                    available=True,
-                    value=await self.rearrange_siteinfo(get_cache_info.site_info, wiki_api_link),
-                    message="",
-                )
-        else:
-            get_cache_info = await WikiSiteInfo.create(api_link=wiki_api_link)
+        cached = _wiki_info_cache.get(wiki_api_link)
+        if not cached:
+            get_cache_info = await WikiSiteInfo.get_or_none(api_link=wiki_api_link)
+            if get_cache_info and get_cache_info.site_info:
+                cached = (await self.rearrange_siteinfo(get_cache_info.site_info, wiki_api_link),
+                          get_cache_info.timestamp.timestamp())
+                self._cache_wiki_info(cached[0], cached[1])
+        if cached:
+            info, timestamp = cached
+            if datetime.datetime.now().timestamp() - timestamp >= siteinfo_ttl:
+                # 先返回过期的站点信息，同时在后台刷新
+                task = asyncio.create_task(self._refresh_siteinfo(wiki_api_link))
+                _siteinfo_refresh_tasks.add(task)
+                task.add_done_callback(_siteinfo_refresh_tasks.discard)
+            return WikiStatus(available=True, value=info, message="")
         try:
-            get_json = await self.get_json_from_api(
-                wiki_api_link,
-                action="query",
-                meta="siteinfo",
-                siprop="general|namespaces|namespacealiases|interwikimap|extensions",
-            )
+            info = await _siteinfo_inflight.do(wiki_api_link, lambda: self._fetch_siteinfo(wiki_api_link))
         except Exception as e:
             if Config("debug", False):
                 Logger.error(traceback.format_exc())
@@ -296,9 +354,6 @@ class WikiLib:
                     "wiki.message.utils.wikilib.get_failed.moegirl"
                 )
             return WikiStatus(available=False, value=False, message=message)
-        get_cache_info.site_info = get_json
-        await get_cache_info.save()
-        info = await self.rearrange_siteinfo(get_json, wiki_api_link)
         return WikiStatus(
             available=True,
             value=info,
@@ -309,17 +364,58 @@ class WikiLib:
             ),
         )
 
+    async def _fetch_siteinfo(self, wiki_api_link: str) -> WikiInfo:
+        """从API获取站点信息，并写入数据库与内存缓存。"""
+        get_json = await self.get_json_from_api(
+            wiki_api_link,
+            action="query",
+            meta="siteinfo",
+            siprop="general|namespaces|namespacealiases|interwikimap|extensions",
+        )
+        now = datetime.datetime.now()
+        get_cache_info, _ = await WikiSiteInfo.get_or_create(api_link=wiki_api_link)
+        get_cache_info.site_info = get_json
+        get_cache_info.timestamp = now
+        await get_cache_info.save()
+        info = await self.rearrange_siteinfo(get_json, wiki_api_link)
+        self._cache_wiki_info(info, now.timestamp())
+        return info
+
+    async def _refresh_siteinfo(self, wiki_api_link: str):
+        if wiki_api_link in _siteinfo_inflight:
+            return
+        try:
+            await _siteinfo_inflight.do(wiki_api_link, lambda: self._fetch_siteinfo(wiki_api_link))
+        except Exception:
+            if Config("debug", False):
+                Logger.error(traceback.format_exc())
+
+    @staticmethod
+    def _cache_wiki_info(info: WikiInfo, timestamp: float):
+        _wiki_info_cache.set(info.api, (info, timestamp))
+        _wiki_info_netloc.set(urllib.parse.urlparse(info.api).netloc, info.api)
+
+    @staticmethod
+    def invalidate_wiki_info():
+        """清空内存中缓存的站点信息。"""
+        _wiki_info_cache.clear()
+        _wiki_info_netloc.clear()
+
     async def check_wiki_info_from_database_cache(self):
         """检查wiki信息是否已记录在数据库缓存（由于部分wiki通过path区分语言，此处仅模糊查询域名部分，返回结果可能不准确）"""
         parse_url = urllib.parse.urlparse(self.url)
+        if (api_link := _wiki_info_netloc.get(parse_url.netloc)) and (cached := _wiki_info_cache.get(api_link)):
+            return WikiStatus(available=True, value=cached[0], message="")
         get = await WikiSiteInfo.get_like_this(parse_url.netloc)
         if get:
             api_link = get.api_link
             if api_link in redirect_list:
                 api_link = redirect_list[api_link]
+            info = await self.rearrange_siteinfo(get.site_info, api_link)
+            self._cache_wiki_info(info, get.timestamp.timestamp())
             return WikiStatus(
                 available=True,
-                value=await self.rearrange_siteinfo(get.site_info, api_link),
+                value=info,
                 message="",
             )
         return WikiStatus(available=False, value=False, message="")
@@ -334,10 +430,10 @@ class WikiLib:
                     wiki_info.message if wiki_info.message != "" else ""
                 )
 
-    async def get_json(self, _no_login=False, **kwargs) -> dict:
+    async def get_json(self, _no_login=False, _cache_ttl: Optional[float] = None, **kwargs) -> dict:
         await self.fixup_wiki_info()
         api = self.wiki_info.api
-        return await self.get_json_from_api(api, _no_login=_no_login, **kwargs)
+        return await self.get_json_from_api(api, _no_login=_no_login, _cache_ttl=_cache_ttl, **kwargs)
 
     async def return_api(self, _no_login=False, _no_format=False, **kwargs) -> str:
         await self.fixup_wiki_info()
@@ -396,7 +492,7 @@ class WikiLib:
 
     async def get_html_to_text(self, page_name, section=None):
         await self.fixup_wiki_info()
-        get_parse = await self.get_json(action="parse", page=page_name, prop="text")
+        get_parse = await self.get_json(action="parse", page=page_name, prop="text", _cache_ttl=api_cache_ttl)
         h = html2text.HTML2Text()
         h.ignore_links = True
         h.ignore_images = True
@@ -425,7 +521,7 @@ class WikiLib:
         await self.fixup_wiki_info()
         try:
             load_desc = await self.get_json(
-                action="parse", page=page_name, prop="wikitext"
+                action="parse", page=page_name, prop="wikitext", _cache_ttl=api_cache_ttl
             )
             desc = load_desc["parse"]["wikitext"]["*"]
         except Exception:
@@ -452,6 +548,7 @@ class WikiLib:
             srwhat=srwhat,
             srlimit=limit,
             srenablerewrites=True,
+            _cache_ttl=api_cache_ttl,
         )
         pagenames = []
         for x in get_page["query"]["search"]:
@@ -476,7 +573,7 @@ class WikiLib:
 
     async def get_page_body_class(self, page_name):
         await self.fixup_wiki_info()
-        get_parse = await self.get_json(action="parse", page=page_name, prop="headhtml")
+        get_parse = await self.get_json(action="parse", page=page_name, prop="headhtml", _cache_ttl=api_cache_ttl)
         parse_head_html = BeautifulSoup(
             get_parse["parse"]["headhtml"]["*"], "html.parser"
         )
@@ -658,7 +755,7 @@ class WikiLib:
                     "exchars": "200",
                 }
             )
-        get_page = await self.get_json(**query_string)
+        get_page = await self.get_json(**query_string, _cache_ttl=api_cache_ttl)
         query = get_page.get("query")
         if not query:
             return PageInfo(
@@ -843,7 +940,7 @@ class WikiLib:
                             "page": page_info.title,
                             "prop": "sections",
                         }
-                        parse_section = await self.get_json(**parse_section_string)
+                        parse_section = await self.get_json(**parse_section_string, _cache_ttl=api_cache_ttl)
                         section_list = []
                         if "parse" in parse_section:
                             sections = parse_section["parse"]["sections"]
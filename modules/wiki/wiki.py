@@ -718,3 +718,11 @@ async def query_pages(
             "wait_list": wait_list,
             "wait_msg_list": wait_msg_list,
         }
+
+
+@wiki.hook("invalidate_cache")
+async def _(fetch: Bot.FetchTarget, ctx: Bot.ModuleHookContext):
+    for api, titles in ctx.args.get("titles", {}).items():
+        WikiLib.invalidate_cache(api, titles)
+    if ctx.args.get("wiki_info"):
+        WikiLib.invalidate_wiki_info()
@@ -1,5 +1,8 @@
+import asyncio
 import re
 import traceback
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 from core.logger import Logger
 from core.queue import JobQueue
@@ -9,113 +12,117 @@ from modules.wiki.utils.wikilib import WikiLib
 from modules.wikilog.database.models import WikiLogTargetSetInfo
 from modules.wikilog.utils import convert_data_to_text
 
-fetch_cache = {}
+poll_concurrency = 8
+
+# (wiki, use_bot, log_type, rcshow) -> 轮询状态，相同 wiki 的订阅共享同一次请求
+poll_state: Dict[tuple, dict] = {}
+
+
+@lru_cache(maxsize=1024)
+def _compile_filters(filters: Tuple[str, ...]) -> Optional[List[re.Pattern]]:
+    if "*" in filters or not filters:
+        return None
+    compiled = []
+    for f in filters:
+        try:
+            compiled.append(re.compile(f))
+        except re.error:
+            Logger.error(f"Invalid wikilog filter: {f}")
+    return compiled
+
+
+def _match_filters(filters: List[str], identify: str) -> bool:
+    compiled = _compile_filters(tuple(filters))
+    return compiled is None or any(fc.search(identify) for fc in compiled)
+
+
+async def _poll(key: tuple, semaphore: asyncio.Semaphore):
+    wiki, use_bot, log_type, rcshow = key
+    state = poll_state.setdefault(key, {"seen": TempList(300), "last": None, "fetched": False, "subscribers": set()})
+    async with semaphore:
+        query_wiki = WikiLib(wiki)
+        await query_wiki.fixup_wiki_info()
+        Logger.debug(f"Polling {log_type} of {query_wiki.wiki_info.api}...")
+        if log_type == "AbuseLog":
+            params = {"list": "abuselog",
+                      "aflprop": "user|title|action|result|filter|timestamp",
+                      "afllimit": 30}
+            if state["last"]:
+                params["aflend"] = state["last"]
+        else:
+            params = {"list": "recentchanges",
+                      "rcprop": "title|user|timestamp|loginfo|comment|redirect|flags|sizes|ids",
+                      "rclimit": 100,
+                      "rcshow": "|".join(rcshow)}
+            if state["last"]:
+                params["rcend"] = state["last"]
+        query = await query_wiki.get_json(action="query", _no_login=not use_bot, **params)
+    if "error" in query:
+        return None
+    new_items = []
+    for y in query["query"][log_type.lower()]:
+        if "actionhidden" in y:
+            continue
+        identify = convert_data_to_text(y)
+        if identify not in state["seen"]:
+            state["seen"].append(identify)
+            new_items.append((identify, y))
+        if y.get("timestamp") and (not state["last"] or y["timestamp"] > state["last"]):
+            state["last"] = y["timestamp"]
+    first_fetch = not state["fetched"]
+    state["fetched"] = True
+    return query_wiki.wiki_info.api, [] if first_fetch else new_items
 
 
 @Scheduler.scheduled_job(IntervalTrigger(seconds=60))
 async def wiki_log():
     fetches = await WikiLogTargetSetInfo.return_all_data()
     matched_logs = {}
+    changed_titles = {}
+    subscriptions = {}
     Logger.debug(fetches)
     for id_ in fetches:
-        Logger.debug(f"Checking fetch {id_}...")
-        if id_ not in fetch_cache:
-            fetch_cache[id_] = {}
-        if id_ not in matched_logs:
-            matched_logs[id_] = {}
+        matched_logs[id_] = {}
         for wiki in fetches[id_]:
-            Logger.debug(f"Checking fetch {id_} {wiki}...")
-            if wiki not in fetch_cache[id_]:
-                fetch_cache[id_][wiki] = {
-                    "AbuseLog": TempList(300),
-                    "RecentChanges": TempList(300),
-                }
-            if wiki not in matched_logs[id_]:
-                matched_logs[id_][wiki] = {"AbuseLog": [], "RecentChanges": []}
+            matched_logs[id_][wiki] = {"AbuseLog": [], "RecentChanges": []}
             use_bot = fetches[id_][wiki]["use_bot"]
-            query_wiki = WikiLib(wiki)
-            await query_wiki.fixup_wiki_info()
-            Logger.debug(query_wiki.wiki_info.api)
             if fetches[id_][wiki]["AbuseLog"]["enable"]:
-                try:
-                    query = await query_wiki.get_json(
-                        action="query",
-                        list="abuselog",
-                        aflprop="user|title|action|result|filter|timestamp",
-                        _no_login=not use_bot,
-                        afllimit=30,
-                    )
-                    if "error" not in query:
-                        first_fetch = False
-                        if not fetch_cache[id_][wiki]["AbuseLog"]:
-                            first_fetch = True
-                        for y in query["query"]["abuselog"]:
-                            identify = convert_data_to_text(y)
-                            if identify not in fetch_cache[id_][wiki]["AbuseLog"]:
-                                fetch_cache[id_][wiki]["AbuseLog"].append(identify)
-                                if not first_fetch:
-                                    matched_f = False
-                                    if (
-                                        "*" in fetches[id_][wiki]["AbuseLog"]["filters"]
-                                        or not fetches[id_][wiki]["AbuseLog"]["filters"]
-                                    ):
-                                        matched_f = True
-                                    else:
-                                        for f in fetches[id_][wiki]["AbuseLog"][
-                                            "filters"
-                                        ]:
-                                            fc = re.compile(f)
-                                            if fc.search(identify):
-                                                matched_f = True
-                                                break
-                                    if matched_f:
-                                        matched_logs[id_][wiki]["AbuseLog"].append(y)
-                except Exception:
-                    Logger.error(traceback.format_exc())
+                subscriptions.setdefault((wiki, use_bot, "AbuseLog", ()), []).append(
+                    (id_, wiki, fetches[id_][wiki]["AbuseLog"]["filters"]))
             if fetches[id_][wiki]["RecentChanges"]["enable"]:
-                try:
-                    query = await query_wiki.get_json(
-                        action="query",
-                        list="recentchanges",
-                        rcprop="title|user|timestamp|loginfo|comment|redirect|flags|sizes|ids",
-                        _no_login=not use_bot,
-                        rclimit=100,
-                        rcshow="|".join(fetches[id_][wiki]["RecentChanges"]["rcshow"]),
-                    )
-                    if "error" not in query:
-                        first_fetch = False
-                        if not fetch_cache[id_][wiki]["RecentChanges"]:
-                            first_fetch = True
-                        for y in query["query"]["recentchanges"]:
-                            if "actionhidden" in y:
-                                continue
-                            identify = convert_data_to_text(y)
-                            if identify not in fetch_cache[id_][wiki]["RecentChanges"]:
-                                fetch_cache[id_][wiki]["RecentChanges"].append(identify)
-                                if not first_fetch:
-                                    matched_f = False
-                                    if (
-                                        "*"
-                                        in fetches[id_][wiki]["RecentChanges"][
-                                            "filters"
-                                        ]
-                                        or not fetches[id_][wiki]["RecentChanges"][
-                                            "filters"
-                                        ]
-                                    ):
-                                        matched_f = True
-                                    else:
-                                        for f in fetches[id_][wiki]["RecentChanges"][
-                                            "filters"
-                                        ]:
-                                            fc = re.compile(f)
-                                            if fc.search(identify):
-                                                matched_f = True
-                                                break
-                                    if matched_f:
-                                        matched_logs[id_][wiki]["RecentChanges"].append(
-                                            y
-                                        )
-                except Exception:
-                    Logger.error(traceback.format_exc())
+                rcshow = tuple(fetches[id_][wiki]["RecentChanges"]["rcshow"])
+                subscriptions.setdefault((wiki, use_bot, "RecentChanges", rcshow), []).append(
+                    (id_, wiki, fetches[id_][wiki]["RecentChanges"]["filters"]))
+    for key in list(poll_state):
+        if key not in subscriptions:
+            del poll_state[key]
+
+    keys = list(subscriptions)
+    semaphore = asyncio.Semaphore(poll_concurrency)
+    results = await asyncio.gather(*[_poll(key, semaphore) for key in keys], return_exceptions=True)
+    for key, result in zip(keys, results):
+        if isinstance(result, Exception):
+            Logger.error("".join(traceback.format_exception(result)))
+            continue
+        if not result:
+            continue
+        api, new_items = result
+        log_type = key[2]
+        if log_type == "RecentChanges":
+            for _, y in new_items:
+                if "title" in y:
+                    changed_titles.setdefault(api, set()).add(y["title"])
+        state = poll_state[key]
+        for id_, wiki, filters in subscriptions[key]:
+            if id_ in state["subscribers"]:
+                for identify, y in new_items:
+                    if _match_filters(filters, identify):
+                        matched_logs[id_][wiki][log_type].append(y)
+            state["subscribers"].add(id_)
+
     await JobQueue.trigger_hook_all("wikilog.matched", matched_logs=matched_logs)
+    if changed_titles:
+        changed_titles = {api: list(titles) for api, titles in changed_titles.items()}
+        for api, titles in changed_titles.items():
+            WikiLib.invalidate_cache(api, titles)
+        await JobQueue.trigger_hook_all("wiki.invalidate_cache", titles=changed_titles)